@@ -4,10 +4,9 @@ FastAPI Application - Crypto RAG API
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.api.routes import router
+from backend.api.routes import router, get_ingestor, get_job_manager
 from backend.config.settings import settings
 from backend.services.auto_ingest import auto_ingest
-from backend.services.ingestor import ContentIngestor
 
 # Create application with configuration from YAML
 app = FastAPI(
@@ -39,7 +38,10 @@ async def root():
         "version": settings.API_VERSION,
         "status": "running",
         "stack": {
-            "embeddings": "OpenAI text-embedding-ada-002",
+            "embeddings": (
+                f"OpenAI {settings.EMBEDDING_MODEL}" if settings.EMBEDDING_PROVIDER == "openai"
+                else settings.EMBEDDING_PROVIDER
+            ),
             "generation": f"Google {settings.GEMINI_MODEL}",
             "vectordb": "Qdrant",
             "cache": "Redis"
@@ -52,21 +54,15 @@ async def root():
 async def startup_event():
     """Initialize system on startup - fully automatic"""
     print("Configuration loaded successfully")
-    print(f"AI Stack: {settings.EMBEDDING_MODEL} + {settings.GEMINI_MODEL}")
+    print(f"AI Stack: {settings.EMBEDDING_PROVIDER} embeddings + {settings.GEMINI_MODEL}")
     print(f"API Server: {settings.API_HOST}:{settings.API_PORT}")
     
     # Auto-initialization: Check if we need initial ingestion
-    ingestor = ContentIngestor()
+    ingestor = get_ingestor()
     if not ingestor.has_vectors():
-        print("No vectors found - performing initial ingestion...")
-        try:
-            result = ingestor.process_all(force_refresh=False)
-            if result["success"]:
-                print(f"Initial ingestion complete: {result['vectors_created']} vectors created")
-            else:
-                print("Initial ingestion failed - check your data directory")
-        except Exception as e:
-            print(f"Initial ingestion error: {e}")
+        # Runs in the ingestion worker, the API starts serving right away
+        job = get_job_manager().submit()
+        print(f"No vectors found - initial ingestion queued as job {job.job_id}")
     else:
         print("Vectors found - skipping initial ingestion")
     
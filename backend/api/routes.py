@@ -1,16 +1,19 @@
 """
 API Routes - Organized Endpoints
 """
+import json
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional
 
 from backend.models.schemas import (
-    QueryRequest, QueryResponse, 
-    IngestRequest, IngestResponse, 
+    QueryRequest, QueryResponse, SearchFilters,
+    IngestRequest, IngestResponse, IngestJobResponse, IngestProgress,
     HealthResponse
 )
 from backend.services.ingestor import ContentIngestor
+from backend.services.jobs import IngestJob, IngestJobManager, JobConflictError
 from backend.services.rag_engine import RAGEngine
 from backend.services.cache import cache
 from backend.services.auto_ingest import auto_ingest
@@ -22,6 +25,7 @@ router = APIRouter()
 # Global instances (singleton pattern)
 _ingestor = None
 _rag_engine = None
+_job_manager = None
 
 def get_ingestor() -> ContentIngestor:
     """Singleton pattern for the ingestor"""
@@ -37,28 +41,70 @@ def get_rag_engine() -> RAGEngine:
         _rag_engine = RAGEngine()
     return _rag_engine
 
-@router.post("/ingest", response_model=IngestResponse)
-async def ingest_content(request: IngestRequest, background_tasks: BackgroundTasks):
+def get_job_manager() -> IngestJobManager:
+    """Singleton pattern for the ingestion job queue"""
+    global _job_manager
+    if _job_manager is None:
+        # The ingestor is created lazily in the job worker, not on the event loop
+        _job_manager = IngestJobManager(get_ingestor)
+    return _job_manager
+
+# New files found by the watcher are queued as jobs on the same ingestor
+auto_ingest.job_manager_factory = get_job_manager
+
+def _job_response(job: IngestJob) -> IngestJobResponse:
+    """API view of an ingestion job"""
+    result = None
+    if job.result is not None:
+        result = IngestResponse(
+            success=job.result["success"],
+            files_processed=job.result.get("files_processed", 0),
+            vectors_created=job.result.get("vectors_created", 0),
+            files_skipped=job.result.get("files_skipped", 0),
+            vectors_deleted=job.result.get("vectors_deleted", 0),
+            message=job.result["message"]
+        )
+    
+    return IngestJobResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        created_at=datetime.fromtimestamp(job.created_at),
+        started_at=datetime.fromtimestamp(job.started_at) if job.started_at else None,
+        finished_at=datetime.fromtimestamp(job.finished_at) if job.finished_at else None,
+        progress=IngestProgress(**job.progress()),
+        result=result,
+        error=job.error
+    )
+
+@router.post("/ingest", response_model=IngestJobResponse, status_code=202)
+async def ingest_content(request: IngestRequest):
     """
-    Ingest JSON content into Qdrant
-    Executes in background to not block
+    Queue ingestion of JSON content into Qdrant
+    Returns a job ID immediately, poll /ingest/jobs/{job_id} for progress
     """
     try:
-        ingestor = get_ingestor()
-        
-        # Execute ingestion (can be slow)
-        result = ingestor.process_all(force_refresh=request.force_refresh)
-        
-        return IngestResponse(
-            success=result["success"],
-            files_processed=result.get("files_processed", 0),
-            vectors_created=result.get("vectors_created", 0),
-            message=result["message"]
-        )
-        
+        job = get_job_manager().submit(force_refresh=request.force_refresh)
+        return _job_response(job)
+    
+    except JobConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ingestion error: {str(e)}")
 
+@router.get("/ingest/jobs", response_model=List[IngestJobResponse])
+async def list_ingest_jobs():
+    """Recent ingestion jobs, newest first"""
+    return [_job_response(job) for job in get_job_manager().list()]
+
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str):
+    """Status, progress and result of an ingestion job"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job: {job_id}")
+    return _job_response(job)
+
 @router.post("/query", response_model=QueryResponse)
 async def query_rag(request: QueryRequest):
     """
@@ -69,9 +115,10 @@ async def query_rag(request: QueryRequest):
         rag_engine = get_rag_engine()
         
         # Process query
-        result = rag_engine.answer_question(
+        result = await rag_engine.answer_question(
             query=request.question,
-            max_results=request.max_results
+            max_results=request.max_results,
+            filters=SearchFilters(**request.model_dump(include=set(SearchFilters.model_fields)))
         )
         
         return QueryResponse(
@@ -79,12 +126,35 @@ async def query_rag(request: QueryRequest):
             sources=result["sources"],
             confidence=result["confidence"],
             response_time=result["response_time"],
+            prompt_tokens=result.get("prompt_tokens", 0),
             cached=result.get("cached", False)
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Query error: {str(e)}")
 
+@router.post("/query/stream")
+async def query_rag_stream(request: QueryRequest):
+    """
+    Ask the RAG system a question, answer streamed as Server-Sent Events
+    Events: sources (first), token (repeated), done (full result) or error
+    """
+    rag_engine = get_rag_engine()
+    filters = SearchFilters(**request.model_dump(include=set(SearchFilters.model_fields)))
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event, data in rag_engine.stream_answer(request.question, request.max_results, filters):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'message': f'Query error: {e}'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
@@ -97,29 +167,23 @@ async def health_check():
         articles_count = 0
         try:
             rag_engine = get_rag_engine()
-            stats = rag_engine.get_collection_stats()
+            stats = await rag_engine.get_collection_stats()
             qdrant_connected = stats["status"] == "healthy"
             articles_count = stats["total_vectors"]
         except Exception:
             pass
         
         # Test Redis (basic)
-        redis_connected = False
-        try:
-            import redis
-            r = redis.from_url(settings.REDIS_URL, socket_timeout=1)
-            r.ping()
-            redis_connected = True
-        except Exception:
-            pass
+        redis_connected = await cache.is_connected()
         
-        # Test OpenAI
+        # Test OpenAI (only required by the openai embedding provider)
         openai_configured = bool(settings.OPENAI_API_KEY)
+        embeddings_ready = openai_configured or settings.EMBEDDING_PROVIDER != "openai"
         
         # General status
         status = "healthy" if all([
             qdrant_connected, 
-            openai_configured
+            embeddings_ready
         ]) else "partial"
         
         return HealthResponse(
@@ -139,7 +203,7 @@ async def get_stats():
     """Quick system statistics"""
     try:
         rag_engine = get_rag_engine()
-        stats = rag_engine.get_collection_stats()
+        stats = await rag_engine.get_collection_stats()
         
         # Count crawled files
         crawled_files = len(list(settings.CRAWLED_DIR.glob("*.json")))
@@ -152,23 +216,27 @@ async def get_stats():
             "embedding_model": settings.EMBEDDING_MODEL,
             "generation_model": settings.GEMINI_MODEL,
             "ai_stack": {
-                "embeddings": "OpenAI",
+                "embeddings": rag_engine.embedder.describe(),
                 "generation": "Google Gemini"
-            }
+            },
+            "query_batching": rag_engine.query_batcher.stats() if rag_engine.query_batcher is not None else None
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stats error: {str(e)}")
 
 @router.get("/search")
-async def search_content(q: str, limit: int = 5):
+async def search_content(q: str, limit: int = 5, date_from: Optional[datetime] = None,
+                         date_to: Optional[datetime] = None, section: Optional[str] = None,
+                         source: Optional[str] = None):
     """
     Simple endpoint for vector search without LLM
     Useful for debugging
     """
     try:
         rag_engine = get_rag_engine()
-        results = rag_engine.search_similar(q, max_results=limit)
+        filters = SearchFilters(date_from=date_from, date_to=date_to, section=section, source=source)
+        results = await rag_engine.search_similar(q, max_results=limit, filters=filters)
         
         return {
             "query": q,
@@ -202,13 +270,20 @@ async def auto_ingest_status():
     """Get auto-ingest status"""
     return {
         "running": auto_ingest.is_running(),
-        "processed_files": len(auto_ingest.processed_files)
+        "processed_files": len(auto_ingest.processed_files),
+        "last_job_id": auto_ingest.last_job_id
     }
 
 @router.get("/cache/status")
 async def cache_status():
-    """Get cache connection status"""
+    """Get cache connection status, answer cache hit rate, coalesced queries and corpus generation"""
+    rag_engine = get_rag_engine()
+    answer_cache, single_flight = rag_engine.answer_cache, rag_engine.single_flight
+    corpus_changes = rag_engine.corpus_changes
     return {
-        "connected": cache.is_connected(),
-        "redis_url": settings.REDIS_URL
+        "connected": await cache.is_connected(),
+        "redis_url": settings.REDIS_URL,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "single_flight": single_flight.stats() if single_flight is not None else None,
+        "corpus": corpus_changes.stats() if corpus_changes is not None else None
     }
\ No newline at end of file
@@ -42,6 +42,9 @@ class Settings:
         self.DATA_DIR = self.PROJECT_ROOT / paths.get('data_dir')
         self.CRAWLED_DIR = self.PROJECT_ROOT / paths.get('crawled_dir')
         self.CRAWLED_DIR.mkdir(parents=True, exist_ok=True)
+        self.STATE_DIR = self.PROJECT_ROOT / paths.get('state_dir')
+        self.QDRANT_PATH = self.PROJECT_ROOT / paths.get('qdrant_dir')
+        self.EMBEDDINGS_DIR = self.PROJECT_ROOT / paths.get('embeddings_dir')
         
         # API Keys
         self.OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -49,8 +52,11 @@ class Settings:
         
         # External services
         services = self.config.get('services', {})
+        self.QDRANT_MODE = services.get('qdrant_mode')
         self.QDRANT_URL = services.get('qdrant_url')
         self.REDIS_URL = services.get('redis_url')
+        self.QDRANT_GRPC_PORT = services.get('qdrant_grpc_port')
+        self.QDRANT_PREFER_GRPC = services.get('qdrant_prefer_grpc')
         
         # API Server
         api = self.config.get('api', {})
@@ -71,9 +77,20 @@ class Settings:
         openai_cfg = ai.get('openai', {})
         google_cfg = ai.get('google', {})
         
+        self.EMBEDDING_PROVIDER = ai.get('embeddings', {}).get('provider')
+        self.EMBEDDING_STORE_ENABLED = ai.get('embeddings', {}).get('store')
+        query_batching = ai.get('embeddings', {}).get('query_batching', {})
+        self.QUERY_BATCH_ENABLED = query_batching.get('enabled')
+        self.QUERY_BATCH_WINDOW_MS = query_batching.get('window_ms')
+        self.QUERY_BATCH_MAX_SIZE = query_batching.get('max_batch')
         self.EMBEDDING_MODEL = openai_cfg.get('embedding_model')
         self.OPENAI_TIMEOUT = openai_cfg.get('timeout')
         self.MAX_EMBEDDING_BATCH = openai_cfg.get('max_embedding_batch')
+        self.MAX_EMBEDDING_BATCH_TOKENS = openai_cfg.get('max_batch_tokens')
+        self.MAX_EMBEDDING_INPUT_TOKENS = openai_cfg.get('max_input_tokens')
+        self.EMBEDDING_WORKERS = openai_cfg.get('embedding_workers')
+        self.EMBEDDING_MAX_RETRIES = openai_cfg.get('max_retries')
+        self.EMBEDDING_RETRY_BACKOFF = openai_cfg.get('retry_backoff')
         
         self.GEMINI_MODEL = google_cfg.get('model')
         self.MAX_TOKENS = google_cfg.get('max_tokens')
@@ -81,27 +98,85 @@ class Settings:
         self.GOOGLE_TIMEOUT = google_cfg.get('timeout')
         
         # Qdrant
+        self.VECTOR_BACKEND = self.config.get('vectordb', {}).get('backend')
+        self.NUMPY_MAX_VECTORS = self.config.get('vectordb', {}).get('numpy', {}).get('max_vectors')
         qdrant = self.config.get('vectordb', {}).get('qdrant', {})
         self.COLLECTION_NAME = qdrant.get('collection_name')
         self.VECTOR_SIZE = qdrant.get('vector_size')
         self.DISTANCE_METRIC = qdrant.get('distance_metric')
         self.QDRANT_TIMEOUT = qdrant.get('timeout')
+        self.COLLECTION_KEEP_VERSIONS = qdrant.get('keep_versions')
+        upload = qdrant.get('upload', {})
+        self.UPLOAD_BATCH_SIZE = upload.get('batch_size')
+        self.UPLOAD_WORKERS = upload.get('workers')
+        self.UPLOAD_WAIT = upload.get('wait')
+        quantization = qdrant.get('quantization', {})
+        self.QUANTIZATION_MODE = quantization.get('mode')
+        self.QUANTIZATION_QUANTILE = quantization.get('quantile')
+        self.QUANTIZATION_ALWAYS_RAM = quantization.get('always_ram')
+        self.QUANTIZATION_ON_DISK = quantization.get('on_disk')
+        self.QUANTIZATION_OVERSAMPLING = quantization.get('oversampling')
+        self.QUANTIZATION_RESCORE = quantization.get('rescore')
         
         # Redis
         redis_cfg = self.config.get('cache', {}).get('redis', {})
         self.CACHE_TTL = redis_cfg.get('ttl')
         self.REDIS_TIMEOUT = redis_cfg.get('timeout')
+        semantic_cache = self.config.get('cache', {}).get('semantic', {})
+        self.SEMANTIC_CACHE_ENABLED = semantic_cache.get('enabled')
+        self.SEMANTIC_CACHE_THRESHOLD = semantic_cache.get('threshold')
+        self.SEMANTIC_CACHE_MAX_ENTRIES = semantic_cache.get('max_entries')
+        self.SEMANTIC_CACHE_PROTECTED_TERMS = semantic_cache.get('protected_terms')
+        single_flight = self.config.get('cache', {}).get('single_flight', {})
+        self.SINGLE_FLIGHT_ENABLED = single_flight.get('enabled')
+        self.SINGLE_FLIGHT_DISTRIBUTED = single_flight.get('distributed')
+        self.SINGLE_FLIGHT_LOCK_TIMEOUT = single_flight.get('lock_timeout')
+        invalidation = self.config.get('cache', {}).get('invalidation', {})
+        self.ANSWER_INVALIDATION_ENABLED = invalidation.get('enabled')
         
         # Processing
         processing = self.config.get('processing', {})
         chunking = processing.get('chunking', {})
+        boilerplate = processing.get('boilerplate', {})
+        dedup = processing.get('dedup', {})
+        loading = processing.get('loading', {})
+        streaming = processing.get('streaming', {})
         search = processing.get('search', {})
         
         self.CHUNK_SIZE = chunking.get('chunk_size')
         self.CHUNK_OVERLAP = chunking.get('chunk_overlap')
         self.MIN_CHUNK_SIZE = chunking.get('min_chunk_size')
+        self.BOILERPLATE_ENABLED = boilerplate.get('enabled')
+        self.BOILERPLATE_MIN_DOCS = boilerplate.get('min_docs')
+        self.BOILERPLATE_MIN_RATIO = boilerplate.get('min_ratio')
+        self.DEDUP_ENABLED = dedup.get('enabled')
+        self.DEDUP_ARTICLE_THRESHOLD = dedup.get('article_threshold')
+        self.DEDUP_TITLE_THRESHOLD = dedup.get('title_threshold')
+        self.DEDUP_NUM_PERM = dedup.get('num_perm')
+        self.DEDUP_BANDS = dedup.get('bands')
+        self.DEDUP_SHINGLE_SIZE = dedup.get('shingle_size')
+        self.DEDUP_CHUNK_MAX_DISTANCE = dedup.get('chunk_max_distance')
+        self.LOAD_WORKERS = loading.get('workers')
+        self.LOAD_BATCH_SIZE = loading.get('batch_size')
+        self.STREAM_QUEUE_SIZE = streaming.get('queue_size')
+        self.STREAM_EMBED_BATCH = streaming.get('embed_batch')
         self.MAX_SEARCH_RESULTS = search.get('max_results')
         self.SCORE_THRESHOLD = search.get('score_threshold')
+        hybrid = search.get('hybrid', {})
+        self.HYBRID_ENABLED = hybrid.get('enabled')
+        self.HYBRID_CANDIDATES = hybrid.get('candidates')
+        self.HYBRID_RRF_K = hybrid.get('rrf_k')
+        self.HYBRID_BM25_K1 = hybrid.get('bm25_k1')
+        self.HYBRID_BM25_B = hybrid.get('bm25_b')
+        diversity = search.get('diversity', {})
+        self.MMR_ENABLED = diversity.get('enabled')
+        self.MMR_CANDIDATES = diversity.get('candidates')
+        self.MMR_LAMBDA = diversity.get('lambda')
+        self.MMR_MAX_PER_SOURCE = diversity.get('max_per_source')
+        context = search.get('context', {})
+        self.CONTEXT_MAX_TOKENS = context.get('max_tokens')
+        self.CONTEXT_MAX_CHUNK_TOKENS = context.get('max_chunk_tokens')
+        self.CONTEXT_QUERY_WEIGHT = context.get('query_weight')
     
 
 # Global instance
@@ -4,7 +4,17 @@ from typing import List, Optional
 from datetime import datetime
 
 # Request Models
-class QueryRequest(BaseModel):
+class SearchFilters(BaseModel):
+    """Optional payload filters for vector search"""
+    date_from: Optional[datetime] = Field(default=None)
+    date_to: Optional[datetime] = Field(default=None)
+    section: Optional[str] = Field(default=None)
+    source: Optional[str] = Field(default=None)
+
+    def is_empty(self) -> bool:
+        return not any(self.model_dump().values())
+
+class QueryRequest(SearchFilters):
     """Request to query the RAG"""
     question: str = Field(..., min_length=3, max_length=2000)
     max_results: int = Field(default=5, ge=1, le=20)
@@ -20,6 +30,7 @@ class QueryResponse(BaseModel):
     sources: List[str]
     confidence: float = Field(..., ge=0.0, le=1.0)
     response_time: float
+    prompt_tokens: int = Field(default=0)
     cached: bool = Field(default=False)
 
 class IngestResponse(BaseModel):
@@ -27,8 +38,31 @@ class IngestResponse(BaseModel):
     success: bool
     files_processed: int
     vectors_created: int
+    files_skipped: int = Field(default=0)
+    vectors_deleted: int = Field(default=0)
     message: str
 
+class IngestProgress(BaseModel):
+    """Progress counters of an ingestion job"""
+    files_total: int
+    files_done: int
+    chunks: int
+    vectors: int
+    vectors_per_second: float
+    eta_seconds: Optional[float] = None
+
+class IngestJobResponse(BaseModel):
+    """Status of an ingestion job"""
+    job_id: str
+    kind: str
+    status: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: IngestProgress
+    result: Optional[IngestResponse] = None
+    error: Optional[str] = None
+
 class HealthResponse(BaseModel):
     """Response from the health check"""
     status: str
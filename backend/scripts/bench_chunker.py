@@ -0,0 +1,55 @@
+"""
+Benchmark the token chunker on the crawled corpus
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to the path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from backend.config.settings import settings
+from backend.models.schemas import Article
+from backend.services.chunker import TokenChunker
+from backend.services.tokens import count_tokens
+
+def main():
+    """Chunk every crawled article and report throughput"""
+    parser = argparse.ArgumentParser(description="Benchmark content chunking")
+    parser.add_argument("--rounds", type=int, default=20, help="Passes over the corpus")
+    args = parser.parse_args()
+    
+    articles = []
+    for json_file in sorted(settings.CRAWLED_DIR.glob("*.json")):
+        try:
+            articles.append(Article.model_validate_json(json_file.read_text(encoding='utf-8')))
+        except Exception:
+            pass
+    
+    if not articles:
+        print(f"❌ No articles found in {settings.CRAWLED_DIR}")
+        return 1
+    
+    chunker = TokenChunker()
+    chunks = [chunk for article in articles for chunk in chunker.chunk(article)]
+    
+    start = time.perf_counter()
+    total_chunks = 0
+    for _ in range(args.rounds):
+        for article in articles:
+            total_chunks += len(chunker.chunk(article))
+    elapsed = time.perf_counter() - start
+    
+    sizes = sorted(count_tokens(chunk.text) for chunk in chunks)
+    print(f"Articles: {len(articles)}  Chunks: {len(chunks)}  "
+          f"(chunk_size={chunker.chunk_size}, overlap={chunker.chunk_overlap}, min={chunker.min_chunk_size})")
+    print(f"Tokens per chunk: min {sizes[0]}  median {sizes[len(sizes) // 2]}  max {sizes[-1]}")
+    print(f"Throughput: {total_chunks / elapsed:,.0f} chunks/s  "
+          f"{len(articles) * args.rounds / elapsed:,.0f} articles/s")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
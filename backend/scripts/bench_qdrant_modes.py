@@ -0,0 +1,111 @@
+"""
+Benchmark Qdrant deployments: server vs embedded (path, :memory:) vs the in-process NumPy index
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from backend.config.settings import settings
+from backend.scripts.bench_quantization import load_vectors
+from backend.services.qdrant import LocalQdrantClient, vector_params
+from backend.services.uploader import BulkUploader
+from backend.services.vector_index import NumpyVectorIndex
+
+def open_client(mode: str, directory: Path):
+    """Qdrant client of one deployment mode (None if the server is unreachable)"""
+    if mode == "server":
+        client = QdrantClient(url=settings.QDRANT_URL, grpc_port=settings.QDRANT_GRPC_PORT,
+                              prefer_grpc=settings.QDRANT_PREFER_GRPC, timeout=settings.QDRANT_TIMEOUT)
+        try:
+            client.get_collections()
+        except Exception:
+            return None
+        return client
+    if mode == "path":
+        return LocalQdrantClient(QdrantClient(path=str(directory / "qdrant")))
+    return LocalQdrantClient(QdrantClient(location=":memory:"))
+
+def run_qdrant(client, points, queries, top_k: int):
+    """Ingest seconds and per-query latencies in one temporary collection"""
+    collection_name = "bench_qdrant_modes"
+    client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name, vectors_config=vector_params(on_disk=False))
+    try:
+        start = time.perf_counter()
+        BulkUploader(client).upload(collection_name, points)
+        ingest_seconds = time.perf_counter() - start
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            client.search(collection_name, query.tolist(), limit=top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        client.delete_collection(collection_name)
+    return ingest_seconds, latencies
+
+def run_numpy(directory: Path, points, queries, top_k: int):
+    """Same measurement on the NumPy index"""
+    index = NumpyVectorIndex(directory / "numpy", settings.VECTOR_SIZE, writer=True)
+    start = time.perf_counter()
+    for offset in range(0, len(points), settings.UPLOAD_BATCH_SIZE):
+        index.upsert(points[offset:offset + settings.UPLOAD_BATCH_SIZE])
+    ingest_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return ingest_seconds, latencies
+
+def main():
+    """Ingest the same vectors in every mode, then compare query latency"""
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant server vs embedded modes")
+    parser.add_argument("--points", type=int, default=5000, help="Vectors to ingest")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per mode")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--modes", nargs="+", default=["server", "path", "memory", "numpy"],
+                        choices=["server", "path", "memory", "numpy"])
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.points, settings.VECTOR_SIZE)
+    rng = np.random.default_rng(7)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    points = [
+        PointStruct(id=i, vector=vector.tolist(), payload={"text": f"chunk {i}", "section": "bench"})
+        for i, vector in enumerate(vectors)
+    ]
+    print(f"Points: {len(points)}  Dimension: {settings.VECTOR_SIZE}  Queries: {args.queries}  top-k: {args.top_k}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            if mode == "numpy":
+                ingest_seconds, latencies = run_numpy(Path(tmp), points, queries, args.top_k)
+            else:
+                client = open_client(mode, Path(tmp))
+                if client is None:
+                    print(f"{mode:<7} skipped (no Qdrant server at {settings.QDRANT_URL})")
+                    continue
+                try:
+                    ingest_seconds, latencies = run_qdrant(client, points, queries, args.top_k)
+                finally:
+                    client.close()
+            print(f"{mode:<7} ingest {len(points) / ingest_seconds:>9.0f} points/s  "
+                  f"p50 {np.percentile(latencies, 50):>7.2f} ms  p99 {np.percentile(latencies, 99):>7.2f} ms")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark Qdrant quantization modes: RAM, search latency and recall vs the float32 baseline
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to the path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from qdrant_client.models import PointStruct, SearchParams
+
+from backend.config.settings import settings
+from backend.services.embedding_store import EmbeddingStore, store_dir_name
+from backend.services.embeddings import get_embedding_provider
+from backend.services.qdrant import create_qdrant_client, quantization_config, search_params, vector_params
+from backend.services.uploader import BulkUploader
+
+# Bytes per vector kept in RAM by each quantization mode
+_QUANTIZED_BYTES = {"none": 0, "scalar": 1.0, "binary": 1 / 8}
+
+def load_vectors(points: int, dimension: int) -> np.ndarray:
+    """Real embeddings from the local store, topped up with clustered synthetic vectors"""
+    vectors = np.empty((0, dimension), dtype=np.float32)
+    try:
+        directory = settings.EMBEDDINGS_DIR / store_dir_name(get_embedding_provider().describe())
+        if directory.exists():
+            vectors = np.array(EmbeddingStore(directory, dimension).all_vectors()[:points])
+    except Exception:
+        pass
+
+    missing = points - len(vectors)
+    if missing > 0:
+        rng = np.random.default_rng(42)
+        centers = rng.standard_normal((64, dimension)).astype(np.float32)
+        synthetic = centers[rng.integers(0, 64, missing)] + 0.5 * rng.standard_normal((missing, dimension)).astype(np.float32)
+        vectors = np.vstack([vectors, synthetic])
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def estimated_ram_mb(mode: str, points: int, dimension: int, on_disk: bool) -> float:
+    """Vector RAM of a collection (originals unless on disk + quantized copies)"""
+    per_vector = (0 if on_disk else dimension * 4) + dimension * _QUANTIZED_BYTES[mode]
+    return points * per_vector / 1024 / 1024
+
+def wait_until_indexed(client, collection_name: str, timeout: float = 300) -> None:
+    """Block until the optimizer has finished building the collection"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection_name).status.value == "green":
+            return
+        time.sleep(0.5)
+
+def main():
+    """Build one temporary collection per mode and compare them"""
+    parser = argparse.ArgumentParser(description="Benchmark quantization modes")
+    parser.add_argument("--points", type=int, default=20000, help="Vectors per collection")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per mode")
+    parser.add_argument("--top-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--modes", nargs="+", default=["none", "scalar", "binary"],
+                        choices=["none", "scalar", "binary"])
+    parser.add_argument("--on-disk", action="store_true", help="Keep original vectors on disk")
+    args = parser.parse_args()
+
+    client = create_qdrant_client()
+    dimension = settings.VECTOR_SIZE
+    vectors = load_vectors(args.points, dimension)
+    rng = np.random.default_rng(7)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype(np.float32)
+    points = [PointStruct(id=i, vector=vector.tolist()) for i, vector in enumerate(vectors)]
+
+    print(f"Points: {len(vectors)}  Dimension: {dimension}  Queries: {args.queries}  top-k: {args.top_k}")
+    print(f"Oversampling: {settings.QUANTIZATION_OVERSAMPLING}  Rescore: {settings.QUANTIZATION_RESCORE}  "
+          f"Originals on disk: {args.on_disk}")
+
+    truth = None
+    try:
+        for mode in ["none"] + [m for m in args.modes if m != "none"]:
+            collection_name = f"bench_quantization_{mode}"
+            client.delete_collection(collection_name)
+            client.create_collection(
+                collection_name=collection_name,
+                vectors_config=vector_params(on_disk=args.on_disk),
+                quantization_config=quantization_config(mode)
+            )
+            BulkUploader(client).upload(collection_name, points)
+            wait_until_indexed(client, collection_name)
+
+            if truth is None:
+                # Exact float32 search is the reference every mode is measured against
+                truth = [
+                    {hit.id for hit in client.search(collection_name, query.tolist(), limit=args.top_k,
+                                                     search_params=SearchParams(exact=True))}
+                    for query in queries
+                ]
+
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                hits = client.search(collection_name, query.tolist(), limit=args.top_k,
+                                     search_params=search_params(mode))
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len({hit.id for hit in hits} & expected) / len(expected))
+
+            if mode in args.modes:
+                print(f"{mode:<7} RAM ~{estimated_ram_mb(mode, len(vectors), dimension, args.on_disk):>8.1f} MB  "
+                      f"p50 {np.percentile(latencies, 50):>6.2f} ms  p99 {np.percentile(latencies, 99):>6.2f} ms  "
+                      f"recall@{args.top_k} {np.mean(recalls):.3f}")
+    finally:
+        for mode in set(args.modes) | {"none"}:
+            client.delete_collection(f"bench_quantization_{mode}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
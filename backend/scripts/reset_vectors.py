@@ -1,5 +1,5 @@
 """
-Reset vectors in Qdrant collection
+Reset vectors in Qdrant collection (blue/green: queries keep working during the rebuild)
 """
 
 import sys
@@ -20,6 +20,9 @@ def main():
         
         if result["success"]:
             print(f"✅ Reset complete: {result['vectors_created']} vectors from {result['files_processed']} files")
+            print(f"   Reused {result['embeddings_reused']} stored embeddings, "
+                  f"embedded {result['vectors_created'] - result['embeddings_reused']} new chunks")
+            print(f"   Serving {result['collection']}, removed old versions: {result['versions_deleted'] or 'none'}")
         else:
             print(f"❌ Reset failed: {result['message']}")
             return 1
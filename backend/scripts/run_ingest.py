@@ -2,6 +2,7 @@
 Script to run content ingestion
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -9,19 +10,36 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from backend.services.ingestor import ContentIngestor
+from backend.services.parallel_loader import ParallelLoader
 from backend.config.settings import settings
 
 def main():
     """Run complete ingestion"""
+    parser = argparse.ArgumentParser(description="Ingest crawled articles into Qdrant")
+    parser.add_argument("--stream", action="store_true",
+                        help="Overlap load/embed/upsert stages with bounded memory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes parsing and chunking JSON (0 = one per CPU, default from config)")
+    args = parser.parse_args()
+    
     print("Starting content ingestion...")
     print(f"Data directory: {settings.CRAWLED_DIR}")
     
     try:
         ingestor = ContentIngestor()
-        result = ingestor.process_all(force_refresh=False)
+        if args.workers is not None:
+            ingestor.loader = ParallelLoader(workers=args.workers)
+        result = ingestor.process_all(force_refresh=False, stream=args.stream)
         
         if result["success"]:
             print(f"✅ Success: {result['vectors_created']} vectors from {result['files_processed']} files")
+            upload = result.get("upload")
+            if upload:
+                print(f"   upload   {upload['points']:>6} points {upload['points_per_second']:>8} points/s  "
+                      f"({upload['batches']} batches, {upload['failed_batches']} failed)")
+            for stage, stats in result.get("stages", {}).items():
+                print(f"   {stage:<8} {stats['items_out']:>6} items  "
+                      f"{stats['items_per_second']:>8} items/s  busy {stats['busy_seconds']}s")
         else:
             print(f"❌ Failed: {result['message']}")
             return 1
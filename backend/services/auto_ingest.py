@@ -3,16 +3,18 @@ Auto-Ingestion System - File watcher for automatic processing
 """
 
 from pathlib import Path
-from typing import Set
+from typing import Callable, Optional, Set
 from threading import Thread, Event
-from backend.services.ingestor import ContentIngestor
+from backend.services.jobs import IngestJobManager
 from backend.config.settings import settings
 
 class AutoIngest:
-    """Automatic file watcher and processor"""
+    """Automatic file watcher, queueing new files on the shared ingestion job manager"""
     
-    def __init__(self):
-        self.ingestor = ContentIngestor()
+    def __init__(self, job_manager_factory: Optional[Callable[[], IngestJobManager]] = None):
+        # Set by the API: watcher runs never overlap with /ingest jobs on the same ingestor
+        self.job_manager_factory = job_manager_factory
+        self.last_job_id: Optional[str] = None
         self.processed_files: Set[str] = set()
         self.stop_event = Event()
         self.running = False
@@ -41,7 +43,7 @@ class AutoIngest:
         
         try:
             # Process ONLY the specific new files
-            self.ingestor.process_specific_files(new_files)
+            self.last_job_id = self.job_manager_factory().submit(files=new_files).job_id
         except Exception:
             pass
     
@@ -0,0 +1,184 @@
+"""
+Boilerplate Filter - Corpus statistics of repeated lines and sentences (SQLite)
+"""
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Set
+
+from backend.config.settings import settings
+from backend.services.chunker import split_sentences
+
+_DIGITS = re.compile(r"\d+")
+_SPACES = re.compile(r"\s+")
+
+def _key(kind: str, text: str) -> str:
+    """Normalized key of a line or sentence (numbers don't matter)"""
+    normalized = _SPACES.sub(" ", _DIGITS.sub("0", text.lower())).strip()
+    return f"{kind}:{hashlib.md5(normalized.encode('utf-8')).hexdigest()}"
+
+def content_keys(content: str) -> Set[str]:
+    """Line and sentence shingles of a document"""
+    keys = set()
+    for line in content.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        keys.add(_key("l", line))
+        sentences = split_sentences(line)
+        if len(sentences) > 1:
+            keys.update(_key("s", sentence) for sentence in sentences)
+    return keys
+
+def strip_boilerplate(content: str, is_boilerplate: Callable[[str], bool]) -> str:
+    """Remove lines and sentences whose key is boilerplate"""
+    kept: List[str] = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or is_boilerplate(_key("l", line)):
+            continue
+        sentences = split_sentences(line)
+        if len(sentences) > 1:
+            sentences = [s for s in sentences if not is_boilerplate(_key("s", s))]
+            line = " ".join(sentences)
+        if line:
+            kept.append(line)
+    return "\n".join(kept)
+
+class BoilerplateFilter:
+    """Learn text repeated across many documents and strip it before chunking"""
+
+    def __init__(self, db_path: Path, min_docs: int = None, min_ratio: float = None):
+        self.min_docs = min_docs or settings.BOILERPLATE_MIN_DOCS
+        self.min_ratio = min_ratio or settings.BOILERPLATE_MIN_RATIO
+
+        self.db_path = Path(db_path)
+        if str(self.db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_tables()
+
+        # Document frequencies are small, keep them in memory
+        self._doc_freq: Dict[str, int] = dict(self._conn.execute("SELECT key, df FROM frequencies"))
+        self._doc_count = self._conn.execute("SELECT COUNT(DISTINCT name) FROM documents").fetchone()[0]
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    PRIMARY KEY (name, key)
+                );
+                CREATE TABLE IF NOT EXISTS frequencies (
+                    key TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS applied (
+                    key TEXT PRIMARY KEY
+                );
+            """)
+
+    def _apply(self, name: str, keys: Set[str]) -> None:
+        """Replace the keys of a document, updating frequencies (lock held)"""
+        old_keys = {row[0] for row in self._conn.execute(
+            "SELECT key FROM documents WHERE name = ?", (name,)
+        )}
+        if old_keys == keys:
+            return
+        if not old_keys and keys:
+            self._doc_count += 1
+        elif old_keys and not keys:
+            self._doc_count -= 1
+
+        for key in old_keys - keys:
+            self._doc_freq[key] = self._doc_freq.get(key, 1) - 1
+        for key in keys - old_keys:
+            self._doc_freq[key] = self._doc_freq.get(key, 0) + 1
+        changed = old_keys ^ keys
+
+        with self._conn:
+            self._conn.execute("DELETE FROM documents WHERE name = ?", (name,))
+            self._conn.executemany(
+                "INSERT INTO documents (name, key) VALUES (?, ?)", [(name, key) for key in keys]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO frequencies (key, df) VALUES (?, ?)",
+                [(key, self._doc_freq[key]) for key in changed if self._doc_freq[key] > 0]
+            )
+            self._conn.executemany(
+                "DELETE FROM frequencies WHERE key = ?",
+                [(key,) for key in changed if self._doc_freq[key] <= 0]
+            )
+        for key in changed:
+            if self._doc_freq[key] <= 0:
+                del self._doc_freq[key]
+
+    def observe(self, name: str, content: str) -> None:
+        """Add (or update) a document in the frequency table"""
+        self.observe_keys(name, content_keys(content))
+
+    def observe_keys(self, name: str, keys: Set[str]) -> None:
+        """Same as observe, with keys already extracted (e.g. by a worker process)"""
+        with self._lock:
+            self._apply(name, keys)
+
+    def remove(self, name: str) -> None:
+        """Drop a document from the frequency table"""
+        with self._lock:
+            self._apply(name, set())
+
+    def is_boilerplate(self, key: str) -> bool:
+        """Repeated in enough documents to be page furniture"""
+        df = self._doc_freq.get(key, 0)
+        return df >= self.min_docs and df >= self.min_ratio * self._doc_count
+
+    def clean(self, content: str) -> str:
+        """Remove boilerplate lines and sentences"""
+        return strip_boilerplate(content, self.is_boilerplate)
+
+    def boilerplate_keys(self) -> Set[str]:
+        """Snapshot of the keys currently considered boilerplate"""
+        with self._lock:
+            return {key for key in self._doc_freq if self.is_boilerplate(key)}
+
+    def stale_documents(self) -> Set[str]:
+        """Documents holding keys promoted or demoted since the last mark_applied (their chunks are outdated)"""
+        with self._lock:
+            applied = {row[0] for row in self._conn.execute("SELECT key FROM applied")}
+            changed = list(applied ^ {key for key in self._doc_freq if self.is_boilerplate(key)})
+            names: Set[str] = set()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(changed), 500):
+                batch = changed[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                names.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT name FROM documents WHERE key IN ({placeholders})", batch
+                ))
+        return names
+
+    def mark_applied(self, keys: Set[str]) -> None:
+        """Record the boilerplate keys the indexed documents were cleaned against"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM applied")
+            self._conn.executemany("INSERT INTO applied (key) VALUES (?)", [(key,) for key in keys])
+
+    def clear(self) -> None:
+        """Forget everything (full rebuild)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM frequencies")
+            self._conn.execute("DELETE FROM applied")
+            self._doc_freq.clear()
+            self._doc_count = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Documents observed and keys currently considered boilerplate"""
+        with self._lock:
+            boilerplate = sum(1 for key in self._doc_freq if self.is_boilerplate(key))
+        return {"documents": self._doc_count, "keys": len(self._doc_freq), "boilerplate_keys": boilerplate}
@@ -1,15 +1,23 @@
 """
-Redis Cache System - Simple and efficient
+Redis Cache System - Simple and efficient (redis.asyncio, never blocks the event loop)
 """
 
 import json
 import hashlib
 from typing import Optional, Dict, Any, List
-import redis
+import redis.asyncio as redis
 from backend.config.settings import settings
 
+# Delete the lock only if it still holds our token (it may have expired and been retaken)
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 class RAGCache:
-    """Simple Redis cache for RAG operations"""
+    """Simple async Redis cache for RAG operations"""
     
     def __init__(self):
         self.redis_client = redis.from_url(
@@ -23,11 +31,11 @@ class RAGCache:
         content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
         return f"{prefix}:{content_hash}"
     
-    def cache_query_result(self, query: str, result: Dict[str, Any]) -> None:
+    async def cache_query_result(self, query: str, result: Dict[str, Any]) -> None:
         """Cache complete query result"""
         try:
             key = self._generate_key("query", query)
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 key, 
                 settings.CACHE_TTL, 
                 json.dumps(result)
@@ -35,22 +43,22 @@ class RAGCache:
         except Exception:
             pass
     
-    def get_cached_query_result(self, query: str) -> Optional[Dict[str, Any]]:
+    async def get_cached_query_result(self, query: str) -> Optional[Dict[str, Any]]:
         """Get cached query result"""
         try:
             key = self._generate_key("query", query)
-            cached = self.redis_client.get(key)
+            cached = await self.redis_client.get(key)
             if cached:
                 return json.loads(cached)
         except Exception:
             pass
         return None
     
-    def cache_embedding(self, text: str, embedding: List[float]) -> None:
+    async def cache_embedding(self, text: str, embedding: List[float]) -> None:
         """Cache text embedding"""
         try:
             key = self._generate_key("embedding", text)
-            self.redis_client.setex(
+            await self.redis_client.setex(
                 key,
                 86400,  # 24 hours
                 json.dumps(embedding)
@@ -58,21 +66,37 @@ class RAGCache:
         except Exception:
             pass
     
-    def get_cached_embedding(self, text: str) -> Optional[List[float]]:
+    async def get_cached_embedding(self, text: str) -> Optional[List[float]]:
         """Get cached embedding"""
         try:
             key = self._generate_key("embedding", text)
-            cached = self.redis_client.get(key)
+            cached = await self.redis_client.get(key)
             if cached:
                 return json.loads(cached)
         except Exception:
             pass
         return None
     
-    def is_connected(self) -> bool:
+    async def acquire_lock(self, name: str, token: str, ttl: float) -> bool:
+        """Take a lock shared by all workers (True when Redis is unreachable)"""
+        try:
+            key = self._generate_key("lock", name)
+            return bool(await self.redis_client.set(key, token, nx=True, px=int(ttl * 1000)))
+        except Exception:
+            return True
+
+    async def release_lock(self, name: str, token: str) -> None:
+        """Release a lock, only if it is still ours"""
+        try:
+            key = self._generate_key("lock", name)
+            await self.redis_client.eval(_RELEASE_LOCK, 1, key, token)
+        except Exception:
+            pass
+
+    async def is_connected(self) -> bool:
         """Check Redis connection"""
         try:
-            self.redis_client.ping()
+            await self.redis_client.ping()
             return True
         except Exception:
             return False
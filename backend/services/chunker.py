@@ -0,0 +1,175 @@
+"""
+Token Chunker - Sentence/line aware chunks measured in tokens
+"""
+
+import re
+from typing import List, NamedTuple
+
+from backend.config.settings import settings
+from backend.models.schemas import Article, Chunk
+from backend.services.tokens import count_tokens
+
+# Joining two pieces of text costs at most this many tokens over the sum of their counts
+_SEPARATOR_TOKENS = 1
+
+# Sentence end followed by something that starts a new sentence
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?…])["”’)\]]?\s+(?=["“‘(\[]?[A-Z0-9$])')
+
+def split_sentences(line: str) -> List[str]:
+    """Split one line into sentences"""
+    return [sentence.strip() for sentence in _SENTENCE_SPLIT.split(line) if sentence.strip()]
+
+class _Unit(NamedTuple):
+    """Smallest piece of text a chunk is built from"""
+    text: str
+    tokens: int
+    new_line: bool
+
+class TokenChunker:
+    """Pack sentences into chunks of CHUNK_SIZE tokens with CHUNK_OVERLAP tokens of overlap"""
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None, min_chunk_size: int = None):
+        self.chunk_size = chunk_size or settings.CHUNK_SIZE
+        self.chunk_overlap = settings.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        self.min_chunk_size = settings.MIN_CHUNK_SIZE if min_chunk_size is None else min_chunk_size
+
+    def _split_long(self, sentence: str, new_line: bool) -> List[_Unit]:
+        """Split a sentence longer than chunk_size on word boundaries"""
+        units = []
+        words: List[str] = []
+        tokens = 0
+        for word in sentence.split():
+            word_tokens = count_tokens(word)
+            if words:
+                # Running upper bound, measured exactly only near the limit
+                bound = tokens + _SEPARATOR_TOKENS + word_tokens
+                if bound > self.chunk_size:
+                    bound = count_tokens(" ".join(words + [word]))
+                if bound > self.chunk_size:
+                    text = " ".join(words)
+                    units.append(_Unit(text, count_tokens(text), new_line and not units))
+                    words, bound = [], word_tokens
+            else:
+                bound = word_tokens
+            words.append(word)
+            tokens = bound
+        if words:
+            text = " ".join(words)
+            units.append(_Unit(text, count_tokens(text), new_line and not units))
+        return units
+
+    def split_units(self, content: str) -> List[_Unit]:
+        """Split content into lines, then sentences"""
+        units = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            for index, sentence in enumerate(split_sentences(line)):
+                tokens = count_tokens(sentence)
+                if tokens > self.chunk_size:
+                    units.extend(self._split_long(sentence, index == 0))
+                else:
+                    units.append(_Unit(sentence, tokens, index == 0))
+        return units
+
+    def _join(self, units: List[_Unit]) -> str:
+        """Rebuild text keeping line breaks between lines"""
+        parts = []
+        for i, unit in enumerate(units):
+            if i:
+                parts.append("\n" if unit.new_line else " ")
+            parts.append(unit.text)
+        return "".join(parts)
+
+    def _tokens(self, units: List[_Unit]) -> int:
+        """Tokens of the joined units (separators can add a few over the sum of the units)"""
+        return count_tokens(self._join(units))
+
+    def _tail(self, unit: _Unit, budget: int) -> List[_Unit]:
+        """Last words of a unit fitting in budget tokens"""
+        words = unit.text.split()
+        start, tokens = len(words), 0
+        while start:
+            word_tokens = count_tokens(words[start - 1]) + (_SEPARATOR_TOKENS if tokens else 0)
+            if tokens + word_tokens > budget:
+                break
+            start -= 1
+            tokens += word_tokens
+        if start == len(words):
+            return []
+        text = " ".join(words[start:])
+        return [_Unit(text, count_tokens(text), False)]
+
+    def chunk_text(self, content: str) -> List[str]:
+        """Split text into token-bounded, overlapping chunks"""
+        groups: List[List[_Unit]] = []
+        overlaps: List[int] = []
+        current: List[_Unit] = []
+        # Upper bound on the tokens of the joined current units
+        current_tokens = 0
+        current_overlap = 0
+
+        for unit in self.split_units(content):
+            # Running bound, re-measured exactly only when it reaches chunk_size
+            tokens = current_tokens + _SEPARATOR_TOKENS + unit.tokens if current else unit.tokens
+            if current and tokens > self.chunk_size:
+                tokens = self._tokens(current + [unit])
+            if current and tokens > self.chunk_size:
+                groups.append(current)
+                overlaps.append(current_overlap)
+
+                # Carry the tail of the previous chunk as overlap, within what the next unit leaves free
+                room = min(self.chunk_overlap, self.chunk_size - unit.tokens)
+                carried: List[_Unit] = []
+                carried_tokens = 0
+                for previous in reversed(current):
+                    if carried_tokens + previous.tokens > room:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous.tokens
+                if not carried and room > 0:
+                    # Boundary sentence longer than the overlap: carry its last words
+                    carried = self._tail(current[-1], room)
+                tokens = sum(previous.tokens + _SEPARATOR_TOKENS for previous in carried) + unit.tokens
+                if tokens > self.chunk_size:
+                    tokens = self._tokens(carried + [unit])
+                while carried and tokens > self.chunk_size:
+                    carried.pop(0)
+                    tokens = self._tokens(carried + [unit])
+
+                current, current_overlap = carried, len(carried)
+
+            current.append(unit)
+            current_tokens = tokens
+
+        if current:
+            groups.append(current)
+            overlaps.append(current_overlap)
+
+        # Merge a too small tail into the previous chunk when the result stays within chunk_size
+        if len(groups) > 1:
+            tail = groups[-1][overlaps[-1]:]
+            tail_tokens = sum(unit.tokens for unit in tail)
+            if tail_tokens < self.min_chunk_size and self._tokens(groups[-2] + tail) <= self.chunk_size:
+                groups[-2] = groups[-2] + tail
+                groups.pop()
+
+        return [self._join(group) for group in groups]
+
+    def chunk(self, article: Article) -> List[Chunk]:
+        """Split an article into chunks"""
+        texts = self.chunk_text(article.content)
+        return [
+            Chunk(
+                text=text,
+                source=article.url,
+                chunk_id=chunk_id,
+                metadata={
+                    "title": article.title,
+                    "timestamp": article.timestamp,
+                    "chunk_of": len(texts)
+                }
+            )
+            for chunk_id, text in enumerate(texts)
+        ]
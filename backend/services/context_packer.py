@@ -0,0 +1,94 @@
+"""
+Context Packer - Fits retrieved chunks in a token budget: ranked, cut to query-relevant sentences, deduplicated
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+
+from backend.config.settings import settings
+from backend.services.chunker import split_sentences
+from backend.services.lexical_index import tokenize
+from backend.services.tokens import count_tokens
+
+@dataclass
+class PackedContext:
+    """Prompt context and the chunks it cites, in citation order"""
+    text: str = ""
+    chunks: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    trimmed: int = 0  # chunks cut down to their most relevant sentences
+    duplicates: int = 0  # sentences dropped because an earlier chunk had them
+
+def _overlap(terms: Set[str], text: str) -> float:
+    """Share of query terms found in text"""
+    if not terms:
+        return 0.0
+    return len(terms.intersection(tokenize(text))) / len(terms)
+
+def _sentence_key(sentence: str) -> str:
+    """Case and whitespace insensitive form for duplicate detection"""
+    return " ".join(sentence.lower().split())
+
+class ContextPacker:
+    """Builds the context block of the prompt within max_tokens"""
+
+    def __init__(self, max_tokens: int = None, max_chunk_tokens: int = None, query_weight: float = None):
+        self.max_tokens = settings.CONTEXT_MAX_TOKENS if max_tokens is None else max_tokens
+        self.max_chunk_tokens = settings.CONTEXT_MAX_CHUNK_TOKENS if max_chunk_tokens is None else max_chunk_tokens
+        self.query_weight = settings.CONTEXT_QUERY_WEIGHT if query_weight is None else query_weight
+
+    def rank(self, terms: Set[str], chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chunks by search score plus query term overlap, best first"""
+        return sorted(
+            chunks, key=lambda chunk: -(chunk.get("score", 0.0) + self.query_weight * _overlap(terms, chunk["text"]))
+        )
+
+    def _select(self, sentences: List[str], terms: Set[str], budget: int) -> List[int]:
+        """Indices of the most query-relevant sentences fitting in budget, in text order"""
+        order = sorted(range(len(sentences)), key=lambda i: (-_overlap(terms, sentences[i]), i))
+        kept, used = [], 0
+        for i in order:
+            tokens = count_tokens(sentences[i])
+            if used + tokens <= budget:
+                kept.append(i)
+                used += tokens
+        return sorted(kept)
+
+    def pack(self, query: str, chunks: List[Dict[str, Any]]) -> PackedContext:
+        """Add chunks best first until the budget is spent"""
+        terms = set(tokenize(query))
+        packed = PackedContext()
+        seen: Set[str] = set()
+        blocks: List[str] = []
+        remaining = self.max_tokens or float("inf")
+
+        for chunk in self.rank(terms, chunks):
+            sentences = [sentence for line in chunk["text"].splitlines() for sentence in split_sentences(line)]
+            fresh = [sentence for sentence in sentences if _sentence_key(sentence) not in seen]
+            packed.duplicates += len(sentences) - len(fresh)
+            if not fresh:
+                continue
+
+            header = f"[Source {len(packed.chunks) + 1}] {chunk.get('title', '')}"
+            budget = min(self.max_chunk_tokens or float("inf"), remaining - count_tokens(header) - 1)
+            body = chunk["text"].strip() if len(fresh) == len(sentences) else " ".join(fresh)
+            if count_tokens(body) > budget:
+                keep = self._select(fresh, terms, budget) if budget > 0 else []
+                if not keep:
+                    continue
+                fresh = [fresh[i] for i in keep]
+                body = " ".join(fresh)
+                packed.trimmed += 1
+
+            block = f"{header}\n{body}"
+            tokens = count_tokens(block)
+            if tokens > remaining:
+                continue
+            remaining -= tokens
+            seen.update(_sentence_key(sentence) for sentence in fresh)
+            blocks.append(block)
+            packed.chunks.append(chunk)
+
+        packed.text = "\n\n".join(blocks)
+        packed.tokens = count_tokens(packed.text)
+        return packed
@@ -0,0 +1,202 @@
+"""
+Corpus Change Log - Chunks added and removed per ingest batch, numbered by a corpus generation (SQLite)
+Cached answers record the generation they were built at and are checked against later changes
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.services.qdrant import point_key
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    """Normalized float32 vector"""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def answer_dependencies(generation: int, context_chunks: List[Dict[str, Any]],
+                        retrieved: List[Dict[str, Any]], max_results: int) -> Dict[str, Any]:
+    """What an answer depends on: the chunks and sources it cited, and the score a new chunk needs to matter"""
+    # A full result list is only displaced by a better chunk, a short one by anything above the threshold
+    scores = [chunk.get("score", 0.0) for chunk in retrieved]
+    min_score = min(scores) if len(scores) >= max_results else settings.SCORE_THRESHOLD
+    return {
+        "generation": generation,
+        "chunks": [chunk["id"] for chunk in context_chunks if chunk.get("id")],
+        "sources": [s for s in dict.fromkeys(chunk.get("source", "") for chunk in context_chunks) if s],
+        "min_score": float(min_score or 0.0)
+    }
+
+class CorpusChangeLog:
+    """Written by ingestion, read by the API: which answers a change can affect"""
+
+    def __init__(self, db_path: Path, dimension: int = None):
+        self.dimension = dimension or settings.VECTOR_SIZE
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_tables()
+        # In-memory copy of the changes after floor, refreshed by generation
+        self._generation = 0
+        self._floor = 0
+        self._removed: Dict[str, int] = {}
+        self._sources: Dict[str, int] = {}
+        self._added_generations = np.zeros(0, dtype=np.int64)
+        self._added_vectors = np.zeros((0, self.dimension), dtype=np.float32)
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS changes (
+                    generation INTEGER,
+                    recorded_at REAL,
+                    point_id TEXT,
+                    source TEXT,
+                    removed INTEGER,
+                    vector BLOB
+                );
+                CREATE INDEX IF NOT EXISTS idx_changes_generation ON changes(generation);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                );
+            """)
+
+    def _meta(self, key: str) -> int:
+        """Counter stored in the meta table (0 if unset)"""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key: str, value: int) -> None:
+        """Store a counter"""
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def record(self, added: Iterable[Any] = (), removed: Iterable[str] = ()) -> int:
+        """Log stored points (with vectors) and deleted point IDs as one new generation"""
+        now = time.time()
+        with self._lock, self._conn:
+            generation = self._meta("generation") + 1
+            rows = [
+                (generation, now, point_key(point.id), (point.payload or {}).get("source", ""), 0,
+                 _unit(point.vector).tobytes())
+                for point in added
+            ]
+            rows += [(generation, now, point_id, None, 1, None) for point_id in removed]
+            if not rows:
+                return generation - 1
+            self._conn.executemany(
+                "INSERT INTO changes (generation, recorded_at, point_id, source, removed, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._set_meta("generation", generation)
+
+            # Answers older than the cache TTL are gone, and so is the need for their history
+            expired = self._conn.execute(
+                "SELECT MAX(generation) FROM changes WHERE recorded_at < ?", (now - settings.CACHE_TTL,)
+            ).fetchone()[0]
+            if expired:
+                self._conn.execute("DELETE FROM changes WHERE generation <= ?", (expired,))
+                self._set_meta("floor", max(self._meta("floor"), expired))
+        return generation
+
+    def clear(self) -> None:
+        """Corpus replaced (rebuild, reset): every earlier answer is stale"""
+        with self._lock, self._conn:
+            generation = self._meta("generation") + 1
+            self._conn.execute("DELETE FROM changes")
+            self._set_meta("generation", generation)
+            self._set_meta("floor", generation)
+
+    def refresh(self) -> int:
+        """Load changes logged since the last refresh, return the current generation"""
+        with self._lock:
+            generation, floor = self._meta("generation"), self._meta("floor")
+            if generation == self._generation and floor == self._floor:
+                return generation
+            # Incremental unless history was cut below what we hold (then start over from the floor)
+            incremental = floor == self._floor
+            since = self._generation if incremental else floor
+            rows = self._conn.execute(
+                "SELECT generation, point_id, source, removed, vector FROM changes "
+                "WHERE generation > ? AND generation <= ? ORDER BY generation",
+                (since, generation)
+            ).fetchall()
+
+            removed = dict(self._removed) if incremental else {}
+            sources = dict(self._sources) if incremental else {}
+            added_generations = [self._added_generations] if incremental else []
+            added_vectors = [self._added_vectors] if incremental else []
+            new_generations, new_vectors = [], []
+            for row_generation, point_id, source, is_removed, vector in rows:
+                if is_removed:
+                    removed[point_id] = row_generation
+                    continue
+                if source:
+                    sources[source] = row_generation
+                vector = np.frombuffer(vector, dtype=np.float32)
+                if len(vector) == self.dimension:
+                    new_generations.append(row_generation)
+                    new_vectors.append(vector)
+            added_generations.append(np.asarray(new_generations, dtype=np.int64))
+            added_vectors.append(np.asarray(new_vectors, dtype=np.float32).reshape(-1, self.dimension))
+
+            # Readers on the event loop see either the old or the new copy
+            self._removed, self._sources = removed, sources
+            self._added_generations = np.concatenate(added_generations)
+            self._added_vectors = np.concatenate(added_vectors)
+            self._generation, self._floor = generation, floor
+        return generation
+
+    @property
+    def generation(self) -> int:
+        """Corpus generation as of the last refresh"""
+        return self._generation
+
+    def is_fresh(self, dependencies: Dict[str, Any], query_embedding: Sequence[float] = None) -> bool:
+        """No change since the answer was built touches its chunks, its sources or its topic"""
+        generation = dependencies.get("generation", 0)
+        if generation < self._floor:
+            return False
+        if generation >= self._generation:
+            return True
+        if any(self._removed.get(point_id, 0) > generation for point_id in dependencies.get("chunks", [])):
+            return False
+        if any(self._sources.get(source, 0) > generation for source in dependencies.get("sources", [])):
+            return False
+
+        newer = self._added_generations > generation
+        if not newer.any():
+            return True
+        if not query_embedding or len(query_embedding) != self.dimension:
+            # Topic unknown: new chunks may matter
+            return False
+        # A new chunk as close to the question as the weakest chunk used would have been retrieved
+        similarities = self._added_vectors[newer] @ _unit(query_embedding)
+        return not (similarities >= dependencies.get("min_score", 0.0)).any()
+
+    def needs_query(self, dependencies: Dict[str, Any]) -> bool:
+        """Checking freshness requires the question embedding (chunks were added since)"""
+        generation = dependencies.get("generation", 0)
+        return self._floor <= generation < self._generation and bool((self._added_generations > generation).any())
+
+    def stats(self) -> Dict[str, int]:
+        """Generation and changes held in memory"""
+        return {
+            "generation": self._generation,
+            "floor": self._floor,
+            "added": len(self._added_generations),
+            "removed": len(self._removed)
+        }
@@ -0,0 +1,286 @@
+"""
+Near-Duplicate Index - MinHash/LSH for articles, SimHash for chunks (SQLite)
+"""
+
+import hashlib
+import re
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config.settings import settings
+
+_WORD = re.compile(r"\w+")
+_SIMHASH_BANDS = 4
+_MASK_64 = (1 << 64) - 1
+
+def _words(text: str) -> List[str]:
+    """Normalized word tokens"""
+    return _WORD.findall(text.lower())
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def _to_signed(value: int) -> int:
+    """Fit an unsigned 64-bit value into an SQLite INTEGER"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word unigrams and bigrams"""
+    words = _words(text)
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    hashes = np.array([_hash64(feature) for feature in features], dtype=np.uint64)
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.astype(np.int64).sum(axis=0) * 2 - len(features)
+    return int(sum(1 << i for i in np.flatnonzero(votes > 0)))
+
+def _band_values(fingerprint: int) -> List[int]:
+    """16-bit bands of a SimHash fingerprint"""
+    return [(fingerprint >> (16 * i)) & 0xFFFF for i in range(_SIMHASH_BANDS)]
+
+class ChunkGroups:
+    """Chunks planned during one run (not stored yet), so near-duplicates among them share one point"""
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = settings.DEDUP_CHUNK_MAX_DISTANCE if max_distance is None else max_distance
+        self._buckets: Dict[Tuple[int, int], List[Tuple[str, int]]] = {}
+        self._canonical: Dict[str, str] = {}
+
+    def seen(self, point_id: str) -> bool:
+        """Point ID already planned earlier in the run"""
+        return point_id in self._canonical
+
+    def canonical(self, point_id: str, text: str) -> str:
+        """Point ID of the first near-duplicate seen in the run (the chunk's own ID if none)"""
+        if point_id in self._canonical:
+            return self._canonical[point_id]
+        fingerprint = simhash(text)
+        bands = list(enumerate(_band_values(fingerprint)))
+        best, best_distance = point_id, self.max_distance + 1
+        for band in bands:
+            for candidate_id, candidate in self._buckets.get(band, ()):
+                distance = bin(candidate ^ fingerprint).count("1")
+                if distance < best_distance:
+                    best, best_distance = candidate_id, distance
+        self._canonical[point_id] = best
+        if best == point_id:
+            for band in bands:
+                self._buckets.setdefault(band, []).append((point_id, fingerprint))
+        return best
+
+class NearDuplicateIndex:
+    """Detect duplicate articles and chunks across sections and runs"""
+
+    def __init__(self, db_path: Path, num_perm: int = None, bands: int = None,
+                 threshold: float = None, title_threshold: float = None,
+                 shingle_size: int = None, chunk_max_distance: int = None):
+        self.num_perm = num_perm or settings.DEDUP_NUM_PERM
+        self.bands = bands or settings.DEDUP_BANDS
+        self.threshold = threshold or settings.DEDUP_ARTICLE_THRESHOLD
+        self.title_threshold = settings.DEDUP_TITLE_THRESHOLD if title_threshold is None else title_threshold
+        self.shingle_size = shingle_size or settings.DEDUP_SHINGLE_SIZE
+        self.chunk_max_distance = settings.DEDUP_CHUNK_MAX_DISTANCE if chunk_max_distance is None else chunk_max_distance
+        self.rows = self.num_perm // self.bands
+
+        # Fixed seed so signatures stay comparable across runs
+        rng = np.random.default_rng(1_000_003)
+        self._a = rng.integers(1, 2 ** 63, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=self.num_perm, dtype=np.uint64)
+
+        self.db_path = Path(db_path)
+        if str(self.db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        bands = ", ".join(f"b{i} INTEGER" for i in range(_SIMHASH_BANDS))
+        band_indexes = "\n".join(
+            f"CREATE INDEX IF NOT EXISTS idx_chunks_b{i} ON chunks (b{i});" for i in range(_SIMHASH_BANDS)
+        )
+        with self._lock, self._conn:
+            self._conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS articles (
+                    name TEXT PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    canonical TEXT,
+                    signature BLOB
+                );
+                CREATE TABLE IF NOT EXISTS article_bands (
+                    band INTEGER,
+                    bucket TEXT,
+                    name TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_article_bands ON article_bands (band, bucket);
+                CREATE INDEX IF NOT EXISTS idx_article_bands_name ON article_bands (name);
+                CREATE TABLE IF NOT EXISTS chunks (
+                    point_id TEXT PRIMARY KEY,
+                    fingerprint INTEGER,
+                    {bands}
+                );
+                {band_indexes}
+            """)
+
+    # Articles (MinHash + LSH)
+
+    def signature(self, content: str) -> np.ndarray:
+        """MinHash signature over word shingles"""
+        words = _words(content)
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        hashes = np.array([_hash64(shingle) for shingle in shingles], dtype=np.uint64)
+        # Multiply-shift hashing, one permutation per column (uint64 wraps on purpose)
+        with np.errstate(over='ignore'):
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _buckets(self, signature: np.ndarray) -> List[str]:
+        """LSH band keys"""
+        return [
+            hashlib.md5(signature[band * self.rows:(band + 1) * self.rows].tobytes()).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    def _title_similarity(self, first: str, second: str) -> float:
+        """Jaccard similarity of title words"""
+        first_words, second_words = set(_words(first)), set(_words(second))
+        if not first_words or not second_words:
+            return 0.0
+        return len(first_words & second_words) / len(first_words | second_words)
+
+    def find_duplicate(self, name: str, title: str, content: str) -> Optional[str]:
+        """Canonical file of an indexed near-duplicate article (None if unique)"""
+        signature = self.signature(content)
+        buckets = self._buckets(signature)
+        with self._lock:
+            candidates = set()
+            for band, bucket in enumerate(buckets):
+                rows = self._conn.execute(
+                    "SELECT name FROM article_bands WHERE band = ? AND bucket = ?", (band, bucket)
+                ).fetchall()
+                candidates.update(row[0] for row in rows)
+            candidates.discard(name)
+
+            # Verify candidates with the estimated Jaccard similarity
+            best, best_score = None, self.threshold
+            for candidate in candidates:
+                row = self._conn.execute(
+                    "SELECT title, signature FROM articles WHERE name = ?", (candidate,)
+                ).fetchone()
+                if row is None:
+                    continue
+                # Shared page furniture alone must not merge different stories
+                if self._title_similarity(title, row[0]) < self.title_threshold:
+                    continue
+                score = float(np.mean(np.frombuffer(row[1], dtype=np.uint32) == signature))
+                if score >= best_score:
+                    best, best_score = candidate, score
+        return best
+
+    def add_article(self, name: str, url: str, title: str, content: str, canonical: str = None) -> None:
+        """Index an article (canonical is set when it is an alias)"""
+        signature = self.signature(content)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM article_bands WHERE name = ?", (name,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (name, url, title, canonical, signature) VALUES (?, ?, ?, ?, ?)",
+                (name, url, title, canonical, signature.tobytes())
+            )
+            # Only canonical copies are candidates for future matches
+            if canonical is None:
+                self._conn.executemany(
+                    "INSERT INTO article_bands (band, bucket, name) VALUES (?, ?, ?)",
+                    [(band, bucket, name) for band, bucket in enumerate(self._buckets(signature))]
+                )
+
+    def alias_urls(self, name: str) -> List[str]:
+        """URLs of the aliases of a canonical article (excluding its own URL)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT a.url FROM articles a JOIN articles c ON c.name = a.canonical "
+                "WHERE a.canonical = ? AND a.url != c.url ORDER BY a.url", (name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def alias_names(self, name: str) -> List[str]:
+        """Files kept only as aliases of a canonical article"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM articles WHERE canonical = ? ORDER BY name", (name,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def canonical_of(self, name: str) -> Optional[str]:
+        """Canonical article of an alias (None if the article is canonical or unknown)"""
+        with self._lock:
+            row = self._conn.execute("SELECT canonical FROM articles WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def remove_article(self, name: str) -> List[str]:
+        """Forget an article, returning the aliases that pointed to it"""
+        with self._lock, self._conn:
+            aliases = [row[0] for row in self._conn.execute(
+                "SELECT name FROM articles WHERE canonical = ?", (name,)
+            )]
+            self._conn.execute("DELETE FROM articles WHERE name = ? OR canonical = ?", (name, name))
+            self._conn.execute("DELETE FROM article_bands WHERE name = ?", (name,))
+        return aliases
+
+    # Chunks (SimHash)
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        """16-bit bands: fingerprints within 3 bits share at least one band"""
+        return _band_values(fingerprint)
+
+    def find_duplicate_chunk(self, text: str) -> Optional[str]:
+        """Point ID of an indexed near-duplicate chunk (None if unique)"""
+        fingerprint = simhash(text)
+        bands = self._band_values(fingerprint)
+        where = " OR ".join(f"b{i} = ?" for i in range(_SIMHASH_BANDS))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT point_id, fingerprint FROM chunks WHERE {where}", bands
+            ).fetchall()
+        best, best_distance = None, self.chunk_max_distance + 1
+        for point_id, candidate in rows:
+            distance = bin((candidate & _MASK_64) ^ fingerprint).count("1")
+            if distance < best_distance:
+                best, best_distance = point_id, distance
+        return best
+
+    def chunk_groups(self) -> "ChunkGroups":
+        """Tracker of near-duplicate chunks within one ingestion run"""
+        return ChunkGroups(self.chunk_max_distance)
+
+    def add_chunks(self, chunks: Dict[str, str]) -> None:
+        """Index stored chunks (point ID → text)"""
+        rows = []
+        for point_id, text in chunks.items():
+            fingerprint = simhash(text)
+            rows.append((point_id, _to_signed(fingerprint), *self._band_values(fingerprint)))
+        placeholders = ", ".join("?" * (2 + _SIMHASH_BANDS))
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT OR REPLACE INTO chunks VALUES ({placeholders})", rows)
+
+    def remove_chunks(self, point_ids: Iterable[str]) -> None:
+        """Forget deleted chunks"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE point_id = ?", [(point_id,) for point_id in point_ids]
+            )
+
+    def clear(self) -> None:
+        """Forget everything (full rebuild)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM articles")
+            self._conn.execute("DELETE FROM article_bands")
+            self._conn.execute("DELETE FROM chunks")
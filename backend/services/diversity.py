@@ -0,0 +1,49 @@
+"""
+Result Diversity - Maximal marginal relevance with per-source caps over retrieved chunk vectors
+"""
+
+from collections import Counter
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from backend.config.settings import settings
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    """Row-normalized copy (zero rows stay zero)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def mmr_select(query_vector: Sequence[float], vectors: Sequence[Sequence[float]], limit: int,
+               diversity_lambda: float = None, sources: Sequence[str] = None,
+               max_per_source: Optional[int] = None) -> List[int]:
+    """Indices of relevant but non-redundant candidates, in pick order (sources capped at max_per_source)"""
+    diversity_lambda = settings.MMR_LAMBDA if diversity_lambda is None else diversity_lambda
+    if max_per_source is None:
+        max_per_source = settings.MMR_MAX_PER_SOURCE
+    candidates = _unit_rows(np.asarray(vectors, dtype=np.float32))
+    if not len(candidates):
+        return []
+    relevance = candidates @ _unit_rows(np.asarray(query_vector, dtype=np.float32))
+    # One matrix product up front, the greedy loop below is only vector ops
+    similarity = candidates @ candidates.T
+    sources = np.asarray(list(sources) if sources is not None else [""] * len(candidates), dtype=object)
+
+    available = np.ones(len(candidates), dtype=bool)
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+    per_source: Counter = Counter()
+    selected: List[int] = []
+    while len(selected) < limit and available.any():
+        scores = diversity_lambda * relevance - (1 - diversity_lambda) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        # Similarity to the closest pick so far (dissimilar chunks are not rewarded below zero)
+        redundancy = np.maximum(redundancy, similarity[best])
+
+        source = sources[best]
+        per_source[source] += 1
+        if source and max_per_source and per_source[source] >= max_per_source:
+            available &= sources != source
+    return selected
@@ -0,0 +1,96 @@
+"""
+Embedding Batcher - Concurrent query embeddings combined into one provider call
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.config.settings import settings
+from backend.services.embeddings import EmbeddingProvider
+
+class EmbeddingBatcher:
+    """Collects query embeddings for a few milliseconds (or up to max_batch) and embeds them together"""
+
+    def __init__(self, provider: EmbeddingProvider, window_ms: float = None, max_batch: int = None):
+        self.provider = provider
+        self.window = (window_ms or settings.QUERY_BATCH_WINDOW_MS) / 1000
+        self.max_batch = max_batch or settings.QUERY_BATCH_MAX_SIZE
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Start counting batches again"""
+        self._stats = {"requests": 0, "batches": 0, "failed_batches": 0, "max_batch_size": 0,
+                       "queue_seconds": 0.0, "max_queue_seconds": 0.0}
+
+    async def embed_query(self, text: str) -> List[float]:
+        """Embedding of one query, computed in a batch with its concurrent neighbours"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending queries as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._embed_batch(batch))
+        # Keep a reference until done, the event loop only holds weak ones
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        """One provider call for the batch, each caller gets its own vector"""
+        started = time.perf_counter()
+        delays = [started - enqueued for _, _, enqueued in batch]
+        self._stats["requests"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+        self._stats["queue_seconds"] += sum(delays)
+        self._stats["max_queue_seconds"] = max(self._stats["max_queue_seconds"], max(delays))
+
+        # Identical queries in the same batch are embedded once
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        try:
+            result = await self.provider.aembed(texts)
+            if len(result) != len(texts):
+                raise ValueError(f"Provider returned {len(result)} embeddings for {len(texts)} queries")
+            vectors = dict(zip(texts, result))
+            for text, future, _ in batch:
+                if not future.done():
+                    future.set_result(vectors[text])
+        except BaseException as e:
+            # No caller is left waiting on a failed or cancelled batch
+            self._stats["failed_batches"] += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch sizes and queueing delay added since the last reset"""
+        requests, batches = self._stats["requests"], self._stats["batches"]
+        return {
+            "requests": requests,
+            "batches": batches,
+            "failed_batches": self._stats["failed_batches"],
+            "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "max_batch_size": self._stats["max_batch_size"],
+            "mean_queue_ms": round(self._stats["queue_seconds"] / requests * 1000, 2) if requests else 0.0,
+            "max_queue_ms": round(self._stats["max_queue_seconds"] * 1000, 2)
+        }
@@ -0,0 +1,110 @@
+"""
+Embedding Scheduler - Token-aware batching, bounded parallelism and retries
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from backend.config.settings import settings
+from backend.services.tokens import count_tokens, truncate_to_tokens
+
+EmbedBatchFn = Callable[[List[str]], List[List[float]]]
+
+class EmbeddingScheduler:
+    """Split inputs into batches, embed them concurrently and retry failures"""
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatchFn,
+        max_batch_size: int = None,
+        max_batch_tokens: int = None,
+        max_input_tokens: int = None,
+        max_workers: int = None,
+        max_retries: int = None,
+        retry_backoff: float = None
+    ):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size or settings.MAX_EMBEDDING_BATCH
+        self.max_batch_tokens = max_batch_tokens or settings.MAX_EMBEDDING_BATCH_TOKENS
+        self.max_input_tokens = max_input_tokens or settings.MAX_EMBEDDING_INPUT_TOKENS
+        self.max_workers = max_workers or settings.EMBEDDING_WORKERS
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = settings.EMBEDDING_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.last_stats: Dict[str, int] = {}
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group input indices by count and token budget"""
+        batches = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, text in enumerate(texts):
+            tokens = min(count_tokens(text), self.max_input_tokens)
+            if current and (
+                len(current) >= self.max_batch_size or
+                current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def _run_batch(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Embed one batch, None on failure"""
+        try:
+            embeddings = self.embed_batch(texts)
+            if len(embeddings) != len(texts):
+                return None
+            return embeddings
+        except Exception:
+            return None
+
+    def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed texts, result aligned to input (None where a batch kept failing)"""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts:
+            self.last_stats = {"inputs": 0, "batches": 0, "retries": 0, "failed": 0}
+            return results
+
+        inputs = [truncate_to_tokens(text, self.max_input_tokens) for text in texts]
+        pending = self.make_batches(inputs)
+        total_batches = len(pending)
+        retries = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    # Exponential backoff with jitter before retrying failed batches only
+                    time.sleep(self.retry_backoff * (2 ** (attempt - 1)) * (1 + random.random()))
+                    retries += len(pending)
+
+                outputs = executor.map(
+                    lambda batch: self._run_batch([inputs[i] for i in batch]),
+                    pending
+                )
+
+                failed = []
+                for batch, embeddings in zip(pending, outputs):
+                    if embeddings is None:
+                        failed.append(batch)
+                        continue
+                    for index, embedding in zip(batch, embeddings):
+                        results[index] = embedding
+
+                pending = failed
+                if not pending:
+                    break
+
+        self.last_stats = {
+            "inputs": len(texts),
+            "batches": total_batches,
+            "retries": retries,
+            "failed": sum(len(batch) for batch in pending)
+        }
+        return results
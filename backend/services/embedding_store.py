@@ -0,0 +1,154 @@
+"""
+Embedding Store - float32 vectors in a memory-mapped file, SQLite index of text hash → row
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows: appends are only serialized within the process
+    fcntl = None
+
+def text_key(text: str) -> str:
+    """Key of an embedded text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def store_dir_name(description: str) -> str:
+    """Directory name of a model (vectors of different models never mix)"""
+    return re.sub(r"[^a-z0-9]+", "-", description.lower()).strip("-")
+
+class EmbeddingStore:
+    """Append-only local copy of every embedding, readable without the embedding API"""
+
+    def __init__(self, directory: Path, dimension: int, writer: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self._row_bytes = dimension * 4
+        self._vectors_path = self.directory / "vectors.f32"
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.directory / "index.db"), check_same_thread=False)
+        self._create_tables()
+        # Only the ingestor cleans up; readers skip a trailing partial row instead of cutting it under a writer
+        if writer:
+            self._truncate_partial_row()
+
+        self._map: Optional[np.memmap] = None
+        self._mapped_rows = 0
+        self.reset_stats()
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS rows (
+                    key TEXT PRIMARY KEY,
+                    row INTEGER NOT NULL
+                )
+            """)
+
+    def _truncate_partial_row(self) -> None:
+        """Drop a half written row left by an interrupted append"""
+        with open(self._vectors_path, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            self._cut_partial_row(f)
+
+    def _cut_partial_row(self, f) -> int:
+        """Truncate an append handle to whole rows, return the row count (file lock held)"""
+        size = os.fstat(f.fileno()).st_size
+        if size % self._row_bytes:
+            f.truncate(size - size % self._row_bytes)
+        return size // self._row_bytes
+
+    def _rows(self) -> int:
+        """Whole rows in vectors.f32 (a partial row being appended is not counted)"""
+        if not self._vectors_path.exists():
+            return 0
+        return self._vectors_path.stat().st_size // self._row_bytes
+
+    def _view(self, rows_needed: int) -> Optional[np.memmap]:
+        """Read-only mapping covering at least rows_needed rows (lock held)"""
+        if self._mapped_rows < rows_needed:
+            rows = self._rows()
+            self._map = np.memmap(self._vectors_path, dtype=np.float32, mode='r',
+                                  shape=(rows, self.dimension)) if rows else None
+            self._mapped_rows = rows
+        return self._map
+
+    def _lookup(self, keys: List[str]) -> Dict[str, int]:
+        """Rows of the known keys (lock held)"""
+        rows: Dict[str, int] = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self._conn.execute(
+                f"SELECT key, row FROM rows WHERE key IN ({placeholders})", batch
+            ))
+        return rows
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Stored vectors of the given keys (missing keys are left out)"""
+        keys = list(set(keys))
+        with self._lock:
+            rows = self._lookup(keys)
+            view = self._view(max(rows.values(), default=-1) + 1)
+            found = {key: view[row].tolist() for key, row in rows.items() if row < self._mapped_rows}
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, vectors: Dict[str, Sequence[float]]) -> int:
+        """Append vectors of new keys, return how many were written"""
+        with self._lock:
+            if not any(len(vector) == self.dimension for vector in vectors.values()):
+                return 0
+            with open(self._vectors_path, 'ab') as f:
+                # The API, run_ingest.py and reset_vectors.py share the store: one appender at a time,
+                # rows taken from the file size and the index written before the next appender starts
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                known = self._lookup(list(vectors))
+                new = [(key, vector) for key, vector in vectors.items()
+                       if key not in known and len(vector) == self.dimension]
+                if not new:
+                    return 0
+
+                first_row = self._cut_partial_row(f)
+                # Vectors hit the disk before the index points at them
+                f.write(np.asarray([vector for _, vector in new], dtype=np.float32).tobytes())
+                f.flush()
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO rows (key, row) VALUES (?, ?)",
+                        [(key, first_row + offset) for offset, (key, _) in enumerate(new)]
+                    )
+        return len(new)
+
+    def all_vectors(self) -> np.ndarray:
+        """Every stored vector as a read-only (rows, dimension) mapping"""
+        with self._lock:
+            view = self._view(self._rows())
+        return view if view is not None else np.empty((0, self.dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def reset_stats(self) -> None:
+        """Start counting hits and misses again"""
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Vectors stored and lookups since the last reset"""
+        return {"vectors": len(self), "hits": self._hits, "misses": self._misses}
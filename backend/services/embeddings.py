@@ -0,0 +1,137 @@
+"""
+Embedding Providers - OpenAI API, in-process CPU hashing embedder, offline stub
+"""
+
+import asyncio
+import hashlib
+import re
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+import openai
+
+from backend.config.settings import settings
+
+_WORD = re.compile(r"\w+")
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash of a feature"""
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class EmbeddingProvider(ABC):
+    """Interface shared by every embedding backend"""
+
+    name = "base"
+    # Remote providers benefit from caching and batching, local ones don't
+    remote = False
+
+    def __init__(self, dimension: int = None):
+        self.dimension = dimension or settings.VECTOR_SIZE
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts (raises on failure)"""
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self.embed([text])[0]
+    
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Embed without blocking the event loop (worker thread unless overridden)"""
+        return await asyncio.to_thread(self.embed, texts)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single query without blocking the event loop"""
+        return (await self.aembed([text]))[0]
+
+    def describe(self) -> str:
+        """Human readable backend name"""
+        return self.name
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings over HTTP"""
+
+    name = "openai"
+    remote = True
+
+    def __init__(self, dimension: int = None):
+        super().__init__(dimension)
+        self.model = settings.EMBEDDING_MODEL
+        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.async_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Single OpenAI embeddings call"""
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            timeout=settings.OPENAI_TIMEOUT
+        )
+        return [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Single OpenAI embeddings call on the async client"""
+        response = await self.async_client.embeddings.create(
+            model=self.model,
+            input=texts,
+            timeout=settings.OPENAI_TIMEOUT
+        )
+        return [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
+
+    def describe(self) -> str:
+        return f"OpenAI {self.model}"
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """In-process CPU embedder: signed feature hashing of words and word pairs"""
+
+    name = "hashing"
+
+    def _vector(self, text: str) -> np.ndarray:
+        """Hashed bag of unigrams and bigrams, sublinear and L2 normalized"""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        words = _WORD.findall(text.lower())
+        features = [(word, 1.0) for word in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        for feature, weight in features:
+            hashed = _hash64(feature)
+            sign = 1.0 if hashed >> 63 else -1.0
+            vector[hashed % self.dimension] += sign * weight
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text).tolist() for text in texts]
+
+    def describe(self) -> str:
+        return f"Hashing ({self.dimension}d, in-process)"
+
+class StubEmbeddingProvider(EmbeddingProvider):
+    """Deterministic offline vectors for tests (same text → same vector)"""
+
+    name = "stub"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.md5(text.encode('utf-8')).digest()[:8], 'big')
+            vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+    def describe(self) -> str:
+        return "Offline stub"
+
+_PROVIDERS = {
+    "openai": OpenAIEmbeddingProvider,
+    "hashing": HashingEmbeddingProvider,
+    "stub": StubEmbeddingProvider,
+}
+
+def get_embedding_provider(name: str = None) -> EmbeddingProvider:
+    """Create the provider selected in config.yaml"""
+    name = name or settings.EMBEDDING_PROVIDER
+    if name not in _PROVIDERS:
+        raise ValueError(f"Unknown embedding provider: {name} (expected one of {', '.join(_PROVIDERS)})")
+    return _PROVIDERS[name]()
@@ -1,111 +1,240 @@
 """
-Content Ingestor: JSON → OpenAI Embeddings → Qdrant
+Content Ingestor: JSON → Embeddings → Qdrant
 """
 
-import json
 import hashlib
+import shutil
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from threading import Lock
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Set, Tuple
 
 
-import openai
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    PointStruct, PointIdsList, PayloadSchemaType,
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation
+)
 
 from backend.config.settings import settings
 from backend.models.schemas import Article, Chunk
+from backend.services.boilerplate import BoilerplateFilter
+from backend.services.chunker import TokenChunker
+from backend.services.corpus_changes import CorpusChangeLog
+from backend.services.dedup import ChunkGroups, NearDuplicateIndex
+from backend.services.embedding_scheduler import EmbeddingScheduler
+from backend.services.embedding_store import EmbeddingStore, store_dir_name, text_key
+from backend.services.embeddings import get_embedding_provider
+from backend.services.lexical_index import LexicalIndex
+from backend.services.manifest import IngestManifest
+from backend.services.parallel_loader import ParallelLoader, parse_file
+from backend.services.pipeline import StreamingPipeline
+from backend.services.qdrant import (
+    create_qdrant_client, is_local_client, point_key, quantization_config, vector_params, write_served_collection
+)
+from backend.services.uploader import BulkUploader
+from backend.services.vector_index import NumpyVectorIndex
+
+# Payload fields filtered at query time
+PAYLOAD_INDEXES = {
+    "timestamp": PayloadSchemaType.DATETIME,
+    "section": PayloadSchemaType.KEYWORD,
+    "sections": PayloadSchemaType.KEYWORD,
+    "source": PayloadSchemaType.KEYWORD,
+}
+
+def section_of(file_name: str) -> str:
+    """Crawler section encoded as file name prefix (section_title_timestamp.json)"""
+    return file_name.split("_", 1)[0]
+
+@dataclass
+class FilePlan:
+    """What ingesting one file requires"""
+    name: str
+    url: str
+    file_hash: str
+    chunks: Dict[str, Chunk] = field(default_factory=dict)
+    old_ids: Set[str] = field(default_factory=set)
+    skipped: bool = False
+    alias_of: Optional[str] = None
 
 class ContentIngestor:
     """Minimal and efficient Ingestor"""
     
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.qdrant_client = QdrantClient(url=settings.QDRANT_URL)
+        self.embedder = get_embedding_provider()
+        self.qdrant_client = create_qdrant_client()
+        self.uploader = BulkUploader(self.qdrant_client)
+        self.embedding_scheduler = EmbeddingScheduler(self.embedder.embed)
+        self.embedding_store = EmbeddingStore(
+            settings.EMBEDDINGS_DIR / store_dir_name(self.embedder.describe()), self.embedder.dimension, writer=True
+        ) if settings.EMBEDDING_STORE_ENABLED else None
+        self.chunker = TokenChunker()
+        self.loader = ParallelLoader()
+        # Receives progress increments: files_total, files_done, chunks, vectors
+        self.progress_callback: Optional[Callable[..., None]] = None
+        # Changes to the served collection, read by the API to invalidate cached answers
+        self.changes = CorpusChangeLog(
+            settings.STATE_DIR / "changes.db", self.embedder.dimension
+        ) if settings.ANSWER_INVALIDATION_ENABLED else None
+        self._log_changes = True
+        # Point IDs planned by files of the run that are not committed yet, and those kept alive for them
+        self._claims: Counter = Counter()
+        self._claims_lock = Lock()
+        self._retained: Set[str] = set()
+        self.collection_name: Optional[str] = None
         self._ensure_collection()
+        self._bind(self.resolve_collection())
+        write_served_collection(self.collection_name)
     
-    def _ensure_collection(self) -> None:
-        """Create collection if not exists"""
-        try:
-            self.qdrant_client.get_collection(settings.COLLECTION_NAME)
-        except Exception:
-            self.qdrant_client.create_collection(
-                collection_name=settings.COLLECTION_NAME,
-                vectors_config=VectorParams(
-                    size=settings.VECTOR_SIZE,
-                    distance=Distance.COSINE
-                )
-            )
+    def _create_collection(self, collection_name: str) -> None:
+        """Create an empty collection (vector storage and quantization from config)"""
+        self.qdrant_client.create_collection(
+            collection_name=collection_name,
+            vectors_config=vector_params(),
+            quantization_config=quantization_config()
+        )
+        self._ensure_payload_indexes(collection_name)
     
-    def load_articles(self) -> List[Article]:
-        """Load all crawled JSONs"""
-        articles = []
-        for json_file in settings.CRAWLED_DIR.glob("*.json"):
+    def _ensure_payload_indexes(self, collection_name: str) -> None:
+        """Index filterable payload fields (no-op when they already exist)"""
+        # Embedded Qdrant scans payloads, indexes there have no effect
+        if is_local_client(self.qdrant_client):
+            return
+        for field_name, schema in PAYLOAD_INDEXES.items():
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    articles.append(Article(**data))
+                self.qdrant_client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=schema
+                )
             except Exception:
                 pass
-        return articles
     
-    def chunk_content(self, article: Article) -> List[Chunk]:
-        """Split content into optimal chunks"""
-        chunks = []
-        content = article.content
-        
-        # Split by paragraphs first
-        paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-        
-        current_chunk = ""
-        chunk_id = 0
-        
-        for paragraph in paragraphs:
-            # If the paragraph fits in the current chunk
-            if len(current_chunk) + len(paragraph) <= settings.CHUNK_SIZE:
-                current_chunk += paragraph + "\n\n"
-            else:
-                # Save current chunk if not empty
-                if current_chunk.strip():
-                    chunks.append(Chunk(
-                        text=current_chunk.strip(),
-                        source=article.url,
-                        chunk_id=chunk_id,
-                        metadata={
-                            "title": article.title,
-                            "timestamp": article.timestamp,
-                            "chunk_of": len(paragraphs)
-                        }
-                    ))
-                    chunk_id += 1
-                
-                # Start new chunk
-                current_chunk = paragraph + "\n\n"
-        
-        # Add last chunk
-        if current_chunk.strip():
-            chunks.append(Chunk(
-                text=current_chunk.strip(),
-                source=article.url,
-                chunk_id=chunk_id,
-                metadata={
-                    "title": article.title,
-                    "timestamp": article.timestamp,
-                    "chunk_of": len(paragraphs)
-                }
-            ))
+    def _ensure_collection(self) -> None:
+        """Create a first collection version behind the alias if nothing exists"""
+        try:
+            info = self.qdrant_client.get_collection(settings.COLLECTION_NAME)
+        except Exception:
+            version = self._new_version_name()
+            self._create_collection(version)
+            self._swap_alias(version)
+            return
         
-        return chunks
+        # Collections created before payload indexes existed
+        if set(PAYLOAD_INDEXES) - set(info.payload_schema or {}):
+            self._ensure_payload_indexes(self.resolve_collection())
     
-    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings with OpenAI"""
+    def resolve_collection(self) -> str:
+        """Concrete collection currently served under COLLECTION_NAME"""
         try:
-            response = self.openai_client.embeddings.create(
-                model=settings.EMBEDDING_MODEL,
-                input=texts
-            )
-            return [data.embedding for data in response.data]
+            for alias in self.qdrant_client.get_aliases().aliases:
+                if alias.alias_name == settings.COLLECTION_NAME:
+                    return alias.collection_name
+        except Exception:
+            pass
+        # Legacy deployments use a plain collection with the alias name
+        return settings.COLLECTION_NAME
+    
+    def _bind(self, collection_name: str) -> None:
+        """Point writes and local state (manifest, dedup, boilerplate, BM25, NumPy vectors) at one collection version"""
+        if collection_name == self.collection_name:
+            return
+        state_dir = settings.STATE_DIR / collection_name
+        self.collection_name = collection_name
+        self.manifest = IngestManifest(state_dir / "manifest.db")
+        self.dedup = NearDuplicateIndex(state_dir / "dedup.db")
+        self.boilerplate = BoilerplateFilter(state_dir / "boilerplate.db")
+        self.lexical = LexicalIndex(state_dir / "lexical.db")
+        self.vector_index = NumpyVectorIndex(
+            state_dir / "vectors", self.embedder.dimension, writer=True
+        ) if settings.VECTOR_BACKEND != "qdrant" else None
+    
+    def _new_version_name(self) -> str:
+        """Name for a new collection version"""
+        return f"{settings.COLLECTION_NAME}_v{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    
+    def _swap_alias(self, version: str) -> None:
+        """Atomically point COLLECTION_NAME at a collection version"""
+        alias = settings.COLLECTION_NAME
+        operations = []
+        if self.resolve_collection() != alias:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        elif self.qdrant_client.collection_exists(alias):
+            # Qdrant won't give an alias the name of a plain collection, so the one-time legacy migration
+            # can't be a single call: the API is moved to the (already filled) version first, then the
+            # legacy collection is dropped right before the alias takes its name
+            write_served_collection(version)
+            self.qdrant_client.delete_collection(alias)
+        operations.append(CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=version, alias_name=alias)
+        ))
+        self.qdrant_client.update_collection_aliases(change_aliases_operations=operations)
+        write_served_collection(version)
+        if self.changes is not None:
+            self.changes.clear()
+    
+    def _drop_version(self, collection_name: str) -> None:
+        """Delete a collection version and its local state"""
+        try:
+            self.qdrant_client.delete_collection(collection_name)
+        except Exception:
+            pass
+        shutil.rmtree(settings.STATE_DIR / collection_name, ignore_errors=True)
+    
+    def _cleanup_versions(self, current: str) -> List[str]:
+        """Delete old collection versions, keeping the newest COLLECTION_KEEP_VERSIONS"""
+        prefix = f"{settings.COLLECTION_NAME}_v"
+        try:
+            collections = self.qdrant_client.get_collections().collections
         except Exception:
             return []
+        older = sorted(c.name for c in collections if c.name.startswith(prefix) and c.name != current)
+        retain = max(settings.COLLECTION_KEEP_VERSIONS - 1, 0)
+        stale = older[:len(older) - retain]
+        for collection_name in stale:
+            self._drop_version(collection_name)
+        
+        # Local state of a legacy plain collection (the collection itself went in the alias swap)
+        legacy_dir = settings.STATE_DIR / settings.COLLECTION_NAME
+        if current != settings.COLLECTION_NAME and legacy_dir.is_dir():
+            shutil.rmtree(legacy_dir, ignore_errors=True)
+            stale.append(settings.COLLECTION_NAME)
+        return stale
+    
+    def _load_article(self, json_file: Path) -> Optional[Article]:
+        """Load and validate one crawled JSON"""
+        return parse_file(json_file)
+    
+    def load_articles(self) -> List[Article]:
+        """Load all crawled JSONs"""
+        json_files = sorted(settings.CRAWLED_DIR.glob("*.json"))
+        if self.loader.workers > 1:
+            articles = self.loader.parse(json_files)
+        else:
+            articles = map(self._load_article, json_files)
+        return [article for article in articles if article is not None]
+    
+    def chunk_content(self, article: Article) -> List[Chunk]:
+        """Split content into token-sized, overlapping chunks"""
+        return self.chunker.chunk(article)
+    
+    def create_embeddings(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Generate embeddings with the configured provider, aligned to texts (None if failed)"""
+        if self.embedding_store is None:
+            return self.embedding_scheduler.embed(texts)
+        
+        # Vectors embedded before (any collection version) come from disk
+        keys = [text_key(text) for text in texts]
+        stored = self.embedding_store.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in stored]
+        if missing:
+            embedded = self.embedding_scheduler.embed([texts[i] for i in missing])
+            new = {keys[i]: vector for i, vector in zip(missing, embedded) if vector is not None}
+            self.embedding_store.put_many(new)
+            stored.update(new)
+        return [stored.get(key) for key in keys]
     
     def _generate_point_id(self, chunk: Chunk) -> str:
         """Generate truly unique ID for the point"""
@@ -114,22 +243,20 @@ class ContentIngestor:
         unique_content = f"{chunk.source}_{chunk.chunk_id}_{content_hash}"
         return hashlib.md5(unique_content.encode('utf-8')).hexdigest()
     
-    def store_chunks(self, chunks: List[Chunk]) -> int:
-        """Store chunks in Qdrant"""
+    def _build_points(self, chunks: Dict[str, Chunk]) -> List[PointStruct]:
+        """Embed chunks and build Qdrant points under their planned IDs (skip chunks whose batch failed)"""
         if not chunks:
-            return 0
+            return []
+        self._report(chunks=len(chunks))
         
-        # Generate embeddings in batch
-        texts = [chunk.text for chunk in chunks]
+        # Generate embeddings in scheduled batches
+        texts = [chunk.text for chunk in chunks.values()]
         embeddings = self.create_embeddings(texts)
         
-        if not embeddings:
-            return 0
-        
-        # Create points for Qdrant
         points = []
-        for chunk, embedding in zip(chunks, embeddings):
-            point_id = self._generate_point_id(chunk)
+        for (point_id, chunk), embedding in zip(chunks.items(), embeddings):
+            if embedding is None:
+                continue
             points.append(PointStruct(
                 id=point_id,
                 vector=embedding,
@@ -140,78 +267,506 @@ class ContentIngestor:
                     **chunk.metadata
                 }
             ))
-        
-        # Insert in Qdrant
+        return points
+    
+    def _upsert_points(self, points: List[PointStruct]) -> Set[str]:
+        """Bulk insert points in Qdrant, return the stored IDs"""
+        stored = self.uploader.upload(self.collection_name, points)
+        self._report(vectors=len(stored))
+        texts = {point.id: point.payload["text"] for point in points if point.id in stored}
+        self.dedup.add_chunks(texts)
+        self.lexical.add_documents(texts)
+        if self.vector_index is not None:
+            self.vector_index.upsert(point for point in points if point.id in stored)
+        self._record_changes(added=[point for point in points if point.id in stored])
+        return stored
+    
+    def _store_chunks(self, chunks: Dict[str, Chunk]) -> Set[str]:
+        """Embed and upsert chunks by point ID, return the point IDs actually stored"""
+        return self._upsert_points(self._build_points(chunks))
+    
+    def store_chunks(self, chunks: List[Chunk]) -> int:
+        """Store chunks in Qdrant"""
+        return len(self._store_chunks({self._generate_point_id(chunk): chunk for chunk in chunks}))
+    
+    def _delete_points(self, point_ids: Set[str]) -> int:
+        """Delete points from Qdrant"""
+        if not point_ids:
+            return 0
         try:
-            self.qdrant_client.upsert(
-                collection_name=settings.COLLECTION_NAME,
-                points=points
+            self.qdrant_client.delete(
+                collection_name=self.collection_name,
+                points_selector=PointIdsList(points=list(point_ids))
             )
-            return len(points)
+            self.dedup.remove_chunks(point_ids)
+            self.lexical.remove_documents(point_ids)
+            if self.vector_index is not None:
+                self.vector_index.delete(point_ids)
+            self._record_changes(removed=point_ids)
+            return len(point_ids)
         except Exception:
             return 0
     
-    def process_all(self, force_refresh: bool = False) -> Dict[str, Any]:
-        """Complete ingestion pipeline"""
-        # Clear collection if it's a refresh
-        if force_refresh:
-            try:
-                self.qdrant_client.delete_collection(settings.COLLECTION_NAME)
-                self._ensure_collection()
-            except Exception:
-                pass
+    def _record_changes(self, added: Sequence[PointStruct] = (), removed: Iterable[str] = ()) -> None:
+        """Log changes of the served collection (a version being rebuilt is not served yet)"""
+        if self.changes is None or not self._log_changes:
+            return
+        try:
+            self.changes.record(added, removed)
+        except Exception:
+            pass
+    
+    def _delete_orphans(self, point_ids: Set[str]) -> int:
+        """Delete points no longer owned by any file in the manifest"""
+        orphans = point_ids - self.manifest.referenced_ids(point_ids)
+        with self._claims_lock:
+            # A file of the run not committed yet reuses it (its plan skipped the embedding)
+            claimed = {point_id for point_id in orphans if self._claims[point_id] > 0}
+            self._retained |= claimed
+        return self._delete_points(orphans - claimed)
+    
+    def _finish_run(self) -> int:
+        """Delete points kept for files of the run that ended up not using them"""
+        with self._claims_lock:
+            retained, self._retained = self._retained, set()
+        return self._delete_orphans(retained)
+    
+    def _file_hash(self, file_path: Path) -> str:
+        """Hash of the raw file content"""
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+    
+    def _prune_missing(self, present_files: Set[str]) -> int:
+        """Remove points of files that disappeared from the crawled folder"""
+        vectors_deleted = 0
+        for name in self.manifest.known_files() - present_files:
+            point_ids = self.manifest.get_point_ids(name)
+            canonical = self.dedup.canonical_of(name)
+            self.manifest.remove_file(name)
+            self.boilerplate.remove(name)
+            # Aliases of a removed article must be ingested on their own again
+            for alias in self.dedup.remove_article(name):
+                self.manifest.record_file(alias, "", None, self.manifest.get_point_ids(alias))
+            if canonical is not None:
+                # The story is no longer filed under the removed alias's section
+                self._update_aliases(canonical)
+            vectors_deleted += self._delete_orphans(point_ids)
+        return vectors_deleted
+    
+    def _plan_file(self, file_path: Path) -> Optional[FilePlan]:
+        """Hash, load and chunk one file against the manifest (None if unreadable)"""
+        try:
+            file_hash = self._file_hash(file_path)
+        except OSError:
+            return None
         
-        # Load and process articles
-        articles = self.load_articles()
-        if not articles:
-            return {"success": False, "message": "No articles found"}
+        # Unchanged since last run
+        if self.manifest.get_file_hash(file_path.name) == file_hash:
+            return FilePlan(name=file_path.name, url="", file_hash=file_hash, skipped=True)
         
-        all_chunks = []
-        for article in articles:
-            chunks = self.chunk_content(article)
-            all_chunks.extend(chunks)
+        article = self._load_article(file_path)
+        if article is None:
+            return None
+        if settings.BOILERPLATE_ENABLED:
+            article.content = self.boilerplate.clean(article.content)
+        return self._plan_article(file_path.name, file_hash, article)
+    
+    def _plan_article(self, name: str, file_hash: str, article: Article,
+                      chunks: List[Chunk] = None) -> FilePlan:
+        """Dedup a cleaned article and assign point IDs to its chunks"""
+        old_ids = self.manifest.get_point_ids(name)
         
-        # Store in Qdrant
-        vectors_created = self.store_chunks(all_chunks)
+        # Near-duplicate of an indexed article: keep it only as an alias
+        if settings.DEDUP_ENABLED:
+            canonical = self.dedup.find_duplicate(name, article.title, article.content)
+            if canonical is not None:
+                self.dedup.add_article(name, article.url, article.title, article.content, canonical=canonical)
+                return FilePlan(
+                    name=name,
+                    url=article.url,
+                    file_hash=file_hash,
+                    old_ids=old_ids,
+                    alias_of=canonical
+                )
+        self.dedup.add_article(name, article.url, article.title, article.content)
+        
+        aliases = self.dedup.alias_urls(name)
+        section = section_of(name)
+        sections = self._sections(name)
+        planned = {}
+        for chunk in (chunks if chunks is not None else self.chunk_content(article)):
+            chunk.metadata["section"] = section
+            chunk.metadata["sections"] = sections
+            if aliases:
+                chunk.metadata["aliases"] = aliases
+            point_id = self._generate_point_id(chunk)
+            # Reuse an already stored near-identical chunk instead of embedding a copy
+            if settings.DEDUP_ENABLED and point_id not in old_ids:
+                point_id = self.dedup.find_duplicate_chunk(chunk.text) or point_id
+            planned.setdefault(point_id, chunk)
+        
+        return FilePlan(
+            name=name,
+            url=article.url,
+            file_hash=file_hash,
+            chunks=planned,
+            old_ids=old_ids
+        )
+    
+    def _plan_files(self, file_paths: List[Path]) -> Iterator[FilePlan]:
+        """Plans in input order, parsing and chunking in worker processes when configured"""
+        if self.loader.workers <= 1:
+            for file_path in file_paths:
+                plan = self._plan_file(file_path)
+                self._report(files_done=1)
+                if plan is not None:
+                    yield plan
+            return
+        
+        # Hash everything first so unchanged files never reach the chunking pool
+        known = {path.name: self.manifest.get_file_hash(path.name) for path in file_paths}
+        changed = []
+        for scanned in self.loader.scan(file_paths, known, with_keys=False):
+            if scanned.file_hash is None:
+                self._report(files_done=1)
+                continue
+            if scanned.file_hash == known[scanned.path.name]:
+                self._report(files_done=1)
+                yield FilePlan(name=scanned.path.name, url="", file_hash=scanned.file_hash, skipped=True)
+            else:
+                changed.append(scanned.path)
+        
+        # Workers strip boilerplate against a snapshot taken after _observe_files
+        snapshot = self.boilerplate.boilerplate_keys() if settings.BOILERPLATE_ENABLED else None
+        for loaded in self.loader.load(changed, snapshot):
+            self._report(files_done=1)
+            if loaded is not None:
+                yield self._plan_article(loaded.path.name, loaded.file_hash, loaded.article, loaded.chunks)
+    
+    def _observe_files(self, file_paths: List[Path]) -> None:
+        """Update boilerplate statistics with new or changed files before chunking"""
+        if not settings.BOILERPLATE_ENABLED:
+            return
+        if self.loader.workers > 1:
+            known = {path.name: self.manifest.get_file_hash(path.name) for path in file_paths}
+            for scanned in self.loader.scan(file_paths, known):
+                if scanned.keys is not None:
+                    self.boilerplate.observe_keys(scanned.path.name, scanned.keys)
+            return
+        for file_path in file_paths:
+            try:
+                if self.manifest.get_file_hash(file_path.name) == self._file_hash(file_path):
+                    continue
+            except OSError:
+                continue
+            article = self._load_article(file_path)
+            if article is not None:
+                self.boilerplate.observe(file_path.name, article.content)
+    
+    def _replan_boilerplate(self, file_paths: List[Path]) -> Tuple[List[Path], Optional[Set[str]]]:
+        """Add unchanged files whose boilerplate changed since they were chunked, with the keys they will use"""
+        if not settings.BOILERPLATE_ENABLED:
+            return file_paths, None
+        stale = self.boilerplate.stale_documents() & self.manifest.known_files()
+        self.manifest.invalidate(stale)
+        listed = {path.name for path in file_paths}
+        extra = [settings.CRAWLED_DIR / name for name in sorted(stale - listed)]
+        extra = [path for path in extra if path.exists()]
+        return file_paths + extra, self.boilerplate.boilerplate_keys()
+    
+    def _new_chunks(self, plans: List[FilePlan], groups: Optional[ChunkGroups] = None) -> Dict[str, Chunk]:
+        """Chunks of the plans that are not stored yet under any file"""
+        new_chunks: Dict[str, Chunk] = {}
+        for plan in plans:
+            for point_id, chunk in plan.chunks.items():
+                if point_id not in plan.old_ids:
+                    new_chunks.setdefault(point_id, chunk)
+        if groups is not None:
+            # IDs planned by an earlier batch of the run are already being embedded
+            earlier = {pid for pid in new_chunks if groups.seen(pid)}
+            # Planning only matched stored chunks: near-duplicates within this run share one point too
+            canonical = {pid: groups.canonical(pid, chunk.text) for pid, chunk in new_chunks.items()}
+            for plan in plans:
+                chunks: Dict[str, Chunk] = {}
+                for point_id, chunk in plan.chunks.items():
+                    chunks.setdefault(canonical.get(point_id, point_id), chunk)
+                plan.chunks = chunks
+            new_chunks = {
+                pid: chunk for pid, chunk in new_chunks.items() if canonical[pid] == pid and pid not in earlier
+            }
+        with self._claims_lock:
+            for plan in plans:
+                self._claims.update(list(plan.chunks))
+        # Points already stored for another file don't need a new embedding
+        existing = self.manifest.referenced_ids(new_chunks)
+        return {pid: chunk for pid, chunk in new_chunks.items() if pid not in existing}
+    
+    def _commit_plan(self, plan: FilePlan, stored: Set[str]) -> int:
+        """Record a processed file in the manifest and delete its stale points"""
+        chunk_ids = set(plan.chunks)
+        with self._claims_lock:
+            self._claims.subtract(list(chunk_ids))
+            # Dropped by another file of the run, but kept for this one
+            missing = chunk_ids - plan.old_ids - stored - self._retained
+        # Anything not just stored must already exist under another file
+        missing -= self.manifest.referenced_ids(missing)
+        present = chunk_ids - missing
+        # Incomplete files keep no hash so the next run retries them
+        self.manifest.record_file(plan.name, plan.url, None if missing else plan.file_hash, present)
+        if plan.alias_of:
+            self._update_aliases(plan.alias_of)
+        return self._delete_orphans(plan.old_ids - chunk_ids)
+    
+    def _sections(self, name: str) -> List[str]:
+        """Section of an article plus those of its aliases (a cross-posted story is filtered under each)"""
+        return sorted({section_of(name), *(section_of(alias) for alias in self.dedup.alias_names(name))})
+    
+    def _update_aliases(self, canonical: str) -> None:
+        """Attach alias URLs and sections to the points of a canonical article"""
+        point_ids = self.manifest.get_point_ids(canonical)
+        if not point_ids:
+            return
+        payload = {"aliases": self.dedup.alias_urls(canonical), "sections": self._sections(canonical)}
+        try:
+            self.qdrant_client.set_payload(
+                collection_name=self.collection_name,
+                payload=payload,
+                points=list(point_ids)
+            )
+            if self.vector_index is not None:
+                self.vector_index.set_payload(point_ids, payload)
+        except Exception:
+            pass
+    
+    def _reset_stats(self) -> None:
+        """Start measuring a new ingestion run"""
+        with self._claims_lock:
+            self._claims.clear()
+            self._retained = set()
+        self.uploader.reset_stats()
+        if self.embedding_store is not None:
+            self.embedding_store.reset_stats()
+    
+    def _run_stats(self) -> Dict[str, Any]:
+        """Upload throughput and embedding API calls saved by the store"""
+        reused = self.embedding_store.stats()["hits"] if self.embedding_store is not None else 0
+        return {"upload": self.uploader.stats(), "embeddings_reused": reused}
+    
+    def _report(self, **counts: int) -> None:
+        """Forward progress increments to the listener, if any"""
+        if self.progress_callback is not None:
+            self.progress_callback(**counts)
+    
+    def ingest_files(self, file_paths: List[Path]) -> Dict[str, Any]:
+        """Incremental ingestion: embed only new or changed chunks, drop stale ones"""
+        self._reset_stats()
+        self._observe_files(file_paths)
+        file_paths, boilerplate = self._replan_boilerplate(file_paths)
+        self._report(files_total=len(file_paths))
+        plans = list(self._plan_files(file_paths))
+        files_skipped = sum(plan.skipped for plan in plans)
+        plans = [plan for plan in plans if not plan.skipped]
+        
+        groups = self.dedup.chunk_groups() if settings.DEDUP_ENABLED else None
+        stored = self._store_chunks(self._new_chunks(plans, groups))
+        vectors_deleted = sum(self._commit_plan(plan, stored) for plan in plans) + self._finish_run()
+        if boilerplate is not None:
+            self.boilerplate.mark_applied(boilerplate)
         
         return {
-            "success": True,
-            "files_processed": len(articles),
-            "vectors_created": vectors_created,
-            "message": f"Processed {len(articles)} articles into {vectors_created} vectors"
+            "files_processed": len(plans),
+            "files_skipped": files_skipped,
+            "vectors_created": len(stored),
+            "vectors_deleted": vectors_deleted,
+            **self._run_stats()
         }
     
+    def ingest_files_streaming(self, file_paths: List[Path]) -> Dict[str, Any]:
+        """Incremental ingestion as overlapping load → embed → upsert stages"""
+        batch_size = settings.STREAM_EMBED_BATCH
+        self._reset_stats()
+        self._observe_files(file_paths)
+        file_paths, boilerplate = self._replan_boilerplate(file_paths)
+        self._report(files_total=len(file_paths))
+        totals = {"files_processed": 0, "files_skipped": 0, "vectors_created": 0, "vectors_deleted": 0}
+        # Batches are planned before earlier ones are stored: near-duplicates are matched across the run
+        groups = self.dedup.chunk_groups() if settings.DEDUP_ENABLED else None
+        
+        def load_stage(paths):
+            yield from self._plan_files(list(paths))
+        
+        def embed_stage(plans):
+            pending: List[FilePlan] = []
+            pending_chunks = 0
+            for plan in plans:
+                if plan.skipped:
+                    totals["files_skipped"] += 1
+                    continue
+                pending.append(plan)
+                pending_chunks += len(plan.chunks)
+                if pending_chunks >= batch_size:
+                    yield pending, self._build_points(self._new_chunks(pending, groups))
+                    pending, pending_chunks = [], 0
+            if pending:
+                yield pending, self._build_points(self._new_chunks(pending, groups))
+        
+        def upsert_stage(batches):
+            for plans, points in batches:
+                stored = self._upsert_points(points)
+                totals["vectors_created"] += len(stored)
+                for plan in plans:
+                    totals["vectors_deleted"] += self._commit_plan(plan, stored)
+                    totals["files_processed"] += 1
+                yield len(stored)
+        
+        pipeline = StreamingPipeline(
+            [("load", load_stage), ("embed", embed_stage), ("upsert", upsert_stage)],
+            queue_size=settings.STREAM_QUEUE_SIZE
+        )
+        for _ in pipeline.run(file_paths):
+            pass
+        totals["vectors_deleted"] += self._finish_run()
+        if boilerplate is not None:
+            self.boilerplate.mark_applied(boilerplate)
+        
+        return {**totals, **self._run_stats(), "stages": pipeline.report()}
+    
+    def _reset_state(self) -> None:
+        """Forget local ingestion state of the bound collection"""
+        self.manifest.clear()
+        self.dedup.clear()
+        self.boilerplate.clear()
+        self.lexical.clear()
+        if self.vector_index is not None:
+            self.vector_index.clear()
+        if self.changes is not None:
+            self.changes.clear()
+    
+    def _backfill_local_indexes(self) -> None:
+        """Fill the BM25 / NumPy indexes of a collection built before they existed"""
+        fill_lexical = not len(self.lexical)
+        fill_vectors = self.vector_index is not None and not len(self.vector_index)
+        if not (fill_lexical or fill_vectors) or not self.has_vectors():
+            return
+        offset = None
+        try:
+            while True:
+                points, offset = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    limit=1000,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=fill_vectors
+                )
+                if fill_lexical:
+                    self.lexical.add_documents({
+                        point_key(point.id): point.payload.get("text", "") for point in points
+                    })
+                if fill_vectors:
+                    self.vector_index.upsert(points)
+                if offset is None:
+                    break
+        except Exception:
+            pass
+    
+    def _ingest_directory(self, stream: bool = False) -> Dict[str, Any]:
+        """Sync the bound collection with the crawled folder"""
+        file_paths = sorted(settings.CRAWLED_DIR.glob("*.json"))
+        if not file_paths:
+            return {"success": False, "message": "No articles found"}
+        
+        vectors_deleted = self._prune_missing({path.name for path in file_paths})
+        if stream:
+            result = self.ingest_files_streaming(file_paths)
+        else:
+            result = self.ingest_files(file_paths)
+        result["vectors_deleted"] += vectors_deleted
+        
+        return {"success": True, **result, "message": self._describe(result)}
+    
+    @staticmethod
+    def _describe(result: Dict[str, Any]) -> str:
+        """One-line summary of an ingestion pass"""
+        return (
+            f"Processed {result['files_processed']} articles into {result['vectors_created']} vectors "
+            f"({result['files_skipped']} unchanged, {result['vectors_deleted']} stale vectors deleted)"
+        )
+    
+    def rebuild_collection(self, stream: bool = False) -> Dict[str, Any]:
+        """Blue/green rebuild: fill a new collection version, then move the alias to it"""
+        version = self._new_version_name()
+        self._create_collection(version)
+        self._bind(version)
+        
+        # The alias swap invalidates every cached answer at once
+        self._log_changes = False
+        try:
+            result = self._ingest_directory(stream)
+            if result["success"]:
+                # Catch up with files that arrived during the rebuild
+                catch_up = self._ingest_directory()
+                if not catch_up["success"]:
+                    result = catch_up
+                else:
+                    for key in ("files_processed", "vectors_created", "vectors_deleted"):
+                        result[key] += catch_up[key]
+                    result["message"] = self._describe(result)
+        except Exception:
+            result = {"success": False, "message": "Rebuild failed"}
+        finally:
+            self._log_changes = True
+        
+        if not result["success"]:
+            # Keep serving the previous version
+            self._bind(self.resolve_collection())
+            self._drop_version(version)
+            return result
+        
+        self._swap_alias(version)
+        result["collection"] = version
+        result["versions_deleted"] = self._cleanup_versions(current=version)
+        result["message"] += f" - now serving {version}"
+        return result
+    
+    def process_all(self, force_refresh: bool = False, stream: bool = False) -> Dict[str, Any]:
+        """Complete ingestion pipeline (incremental unless force_refresh)"""
+        # Full rebuild happens in a new collection, queries keep hitting the live one
+        if force_refresh:
+            return self.rebuild_collection(stream=stream)
+        
+        self._bind(self.resolve_collection())
+        if self._collection_empty():
+            # Local state only describes the collection it was built against
+            self._reset_state()
+        self._backfill_local_indexes()
+        
+        return self._ingest_directory(stream)
+    
     def process_specific_files(self, file_paths: List[Path]) -> Dict[str, Any]:
         """Process only specific files"""
         if not file_paths:
             return {"success": False, "message": "No files provided"}
         
-        articles = []
-        for file_path in file_paths:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    articles.append(Article(**data))
-            except Exception:
-                pass
-        
-        if not articles:
+        self._bind(self.resolve_collection())
+        self._backfill_local_indexes()
+        result = self.ingest_files(file_paths)
+        if not result["files_processed"] and not result["files_skipped"]:
             return {"success": False, "message": "No valid articles found"}
         
-        all_chunks = []
-        for article in articles:
-            chunks = self.chunk_content(article)
-            all_chunks.extend(chunks)
-        
-        vectors_created = self.store_chunks(all_chunks)
-        
         return {
             "success": True,
-            "files_processed": len(articles),
-            "vectors_created": vectors_created,
-            "message": f"Processed {len(articles)} new files into {vectors_created} vectors"
+            **result,
+            "message": (
+                f"Processed {result['files_processed']} new files into {result['vectors_created']} vectors "
+                f"({result['files_skipped']} unchanged)"
+            )
         }
     
+    def _collection_empty(self) -> bool:
+        """Bound collection exists and holds no points (connection errors propagate)"""
+        if not self.qdrant_client.collection_exists(self.collection_name):
+            return False
+        return self.qdrant_client.get_collection(self.collection_name).points_count == 0
+    
     def has_vectors(self) -> bool:
         """Check if collection has any vectors"""
         try:
@@ -0,0 +1,130 @@
+"""
+Ingest Jobs - Ingestion runs in a background worker, tracked by job ID
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.ingestor import ContentIngestor
+
+class JobConflictError(Exception):
+    """A rebuild is already queued or running"""
+
+@dataclass
+class IngestJob:
+    """State and progress counters of one ingestion run"""
+    job_id: str
+    kind: str  # ingest | rebuild | files
+    status: str = "queued"  # queued | running | succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    files_total: int = 0
+    files_done: int = 0
+    chunks: int = 0
+    vectors: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def progress(self) -> Dict[str, Any]:
+        """Counters plus throughput and a rough ETA"""
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+        rate = self.vectors / elapsed if elapsed else 0.0
+        eta = None
+        if self.status == "running" and elapsed:
+            # Files are planned first, then chunks are embedded: the slower of both bounds the ETA
+            estimates = []
+            if self.files_done:
+                estimates.append((self.files_total - self.files_done) * elapsed / self.files_done)
+            if self.vectors:
+                estimates.append((self.chunks - self.vectors) / rate)
+            eta = round(max(estimates), 1) if estimates else None
+        return {
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "chunks": self.chunks,
+            "vectors": self.vectors,
+            "vectors_per_second": round(rate, 1),
+            "eta_seconds": eta
+        }
+
+class IngestJobManager:
+    """Queue of ingestion jobs executed one at a time off the event loop"""
+
+    def __init__(self, ingestor_factory: Callable[[], ContentIngestor], history: int = 50):
+        self._get_ingestor = ingestor_factory
+        self._history = history
+        # One worker: jobs share the ingestor and its bound collection, so they never overlap
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-job")
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = Lock()
+
+    def submit(self, force_refresh: bool = False, stream: bool = False,
+               files: Optional[List[Path]] = None) -> IngestJob:
+        """Queue an ingestion (rebuild if force_refresh, only the given files if any), refusing a second rebuild"""
+        kind = "rebuild" if force_refresh else "files" if files is not None else "ingest"
+        with self._lock:
+            if kind == "rebuild":
+                for job in self._jobs.values():
+                    if job.kind == "rebuild" and job.active:
+                        raise JobConflictError(f"Rebuild {job.job_id} is already {job.status}")
+            job = IngestJob(job_id=uuid.uuid4().hex, kind=kind)
+            self._jobs[job.job_id] = job
+            self._trim()
+        self._executor.submit(self._run, job, force_refresh, stream, files)
+        return job
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs (lock held)"""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(self._jobs) - self._history, 0)]:
+            del self._jobs[job_id]
+
+    def _advance(self, job: IngestJob, **counts: int) -> None:
+        """Add progress increments reported by the ingestor"""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(job, name, getattr(job, name) + value)
+
+    def _run(self, job: IngestJob, force_refresh: bool, stream: bool, files: Optional[List[Path]] = None) -> None:
+        """Execute one job in the worker thread"""
+        job.status = "running"
+        job.started_at = time.time()
+        ingestor = None
+        try:
+            ingestor = self._get_ingestor()
+            ingestor.progress_callback = lambda **counts: self._advance(job, **counts)
+            if files is not None:
+                job.result = ingestor.process_specific_files(files)
+            else:
+                job.result = ingestor.process_all(force_refresh=force_refresh, stream=stream)
+            job.status = "succeeded" if job.result["success"] else "failed"
+            if not job.result["success"]:
+                job.error = job.result["message"]
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            if ingestor is not None:
+                ingestor.progress_callback = None
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        """Job by ID (None if unknown or forgotten)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestJob]:
+        """Known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
@@ -0,0 +1,160 @@
+"""
+Lexical Index - Incremental BM25 inverted index on exact tokens (SQLite), fused with vector hits by RRF
+"""
+
+import math
+import re
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from backend.config.settings import settings
+
+# Words, tickers and numbers (3.5, 12, 2025) kept whole
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_STOPWORDS = frozenset(
+    "a an the is are was were be been being do does did has have had of in on at to for from by with "
+    "and or but not no it its this that these those as than then so if into over after before about "
+    "what who where when why how which i you he she we they me my your our their".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase tokens without stopwords"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = None) -> List[Tuple[str, float]]:
+    """Merge ranked ID lists: score = sum of 1 / (k + rank), best first"""
+    k = k or settings.HYBRID_RRF_K
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+class LexicalIndex:
+    """BM25 over chunk texts keyed by point ID, updated as points are stored and deleted"""
+
+    def __init__(self, db_path: Path, k1: float = None, b: float = None):
+        self.k1 = k1 or settings.HYBRID_BM25_K1
+        self.b = settings.HYBRID_BM25_B if b is None else b
+        self.db_path = Path(db_path)
+        if str(self.db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            # Readers (API) and the writer (ingestion) may be different connections
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Integer doc numbers and a clustered (term, doc) key keep postings compact
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    doc INTEGER PRIMARY KEY,
+                    point_id TEXT UNIQUE,
+                    length INTEGER,
+                    terms TEXT
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT,
+                    doc INTEGER,
+                    tf INTEGER,
+                    PRIMARY KEY (term, doc)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER
+                ) WITHOUT ROWID;
+            """)
+
+    def add_documents(self, texts: Dict[str, str]) -> None:
+        """Index chunk texts by point ID (already indexed IDs are skipped)"""
+        with self._lock, self._conn:
+            for point_id, text in texts.items():
+                counts = Counter(tokenize(text))
+                try:
+                    cursor = self._conn.execute(
+                        "INSERT INTO docs (point_id, length, terms) VALUES (?, ?, ?)",
+                        (point_id, sum(counts.values()), " ".join(counts))
+                    )
+                except sqlite3.IntegrityError:
+                    continue
+                doc = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                    [(term, doc, tf) for term, tf in counts.items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for term in counts]
+                )
+
+    def remove_documents(self, point_ids: Iterable[str]) -> None:
+        """Forget deleted points"""
+        with self._lock, self._conn:
+            for point_id in point_ids:
+                row = self._conn.execute(
+                    "SELECT doc, terms FROM docs WHERE point_id = ?", (point_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                doc, terms = row
+                terms = terms.split()
+                self._conn.executemany(
+                    "DELETE FROM postings WHERE term = ? AND doc = ?", [(term, doc) for term in terms]
+                )
+                self._conn.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", [(term,) for term in terms])
+                self._conn.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Point IDs ranked by BM25 score"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            total, length_sum = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+            if not total:
+                return []
+            average_length = length_sum / total or 1.0
+            scores: Dict[int, float] = {}
+            for term in terms:
+                row = self._conn.execute("SELECT df FROM terms WHERE term = ?", (term,)).fetchone()
+                if row is None:
+                    continue
+                idf = math.log(1 + (total - row[0] + 0.5) / (row[0] + 0.5))
+                postings = self._conn.execute(
+                    "SELECT p.doc, p.tf, d.length FROM postings p JOIN docs d ON d.doc = p.doc WHERE p.term = ?",
+                    (term,)
+                )
+                for doc, tf, length in postings:
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            best = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+            point_ids = dict(self._conn.execute(
+                f"SELECT doc, point_id FROM docs WHERE doc IN ({','.join('?' * len(best))})",
+                [doc for doc, _ in best]
+            ).fetchall()) if best else {}
+        return [(point_ids[doc], score) for doc, score in best]
+
+    def clear(self) -> None:
+        """Drop every document"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM terms")
+            self._conn.execute("DELETE FROM docs")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Documents and distinct terms indexed"""
+        with self._lock:
+            docs = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            terms = self._conn.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        return {"documents": docs, "terms": terms}
@@ -0,0 +1,114 @@
+"""
+Ingestion Manifest - SQLite map of source files → content hash → point IDs
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional, Set
+
+class IngestManifest:
+    """Persistent record of what has been embedded for each source file"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        if str(self.db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    name TEXT PRIMARY KEY,
+                    url TEXT,
+                    content_hash TEXT,
+                    updated_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS points (
+                    name TEXT NOT NULL,
+                    point_id TEXT NOT NULL,
+                    PRIMARY KEY (name, point_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_points_point_id ON points (point_id);
+            """)
+
+    def get_file_hash(self, name: str) -> Optional[str]:
+        """Content hash recorded for a file (None if unknown)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM files WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_point_ids(self, name: str) -> Set[str]:
+        """Point IDs currently owned by a file"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT point_id FROM points WHERE name = ?", (name,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def known_files(self) -> Set[str]:
+        """All file names in the manifest"""
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM files").fetchall()
+        return {row[0] for row in rows}
+
+    def referenced_ids(self, point_ids: Iterable[str], exclude: str = None) -> Set[str]:
+        """Subset of point_ids still owned by some file (optionally ignoring one)"""
+        point_ids = list(point_ids)
+        found: Set[str] = set()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(point_ids), 500):
+                batch = point_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                query = f"SELECT DISTINCT point_id FROM points WHERE point_id IN ({placeholders})"
+                params = list(batch)
+                if exclude is not None:
+                    query += " AND name != ?"
+                    params.append(exclude)
+                found.update(row[0] for row in self._conn.execute(query, params))
+        return found
+
+    def record_file(self, name: str, url: str, content_hash: Optional[str], point_ids: Iterable[str]) -> None:
+        """Replace the entry of a file (hash None means incomplete, retry next run)"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (name, url, content_hash, updated_at) VALUES (?, ?, ?, ?)",
+                (name, url, content_hash, time.time())
+            )
+            self._conn.execute("DELETE FROM points WHERE name = ?", (name,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO points (name, point_id) VALUES (?, ?)",
+                [(name, point_id) for point_id in point_ids]
+            )
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """Drop the content hash of files so the next run chunks them again"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE files SET content_hash = NULL WHERE name = ?", [(name,) for name in names])
+
+    def remove_file(self, name: str) -> None:
+        """Forget a file and its points"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE name = ?", (name,))
+            self._conn.execute("DELETE FROM points WHERE name = ?", (name,))
+
+    def clear(self) -> None:
+        """Forget everything (full rebuild)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM points")
+
+    def stats(self) -> Dict[str, int]:
+        """Files and points tracked"""
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            points = self._conn.execute("SELECT COUNT(DISTINCT point_id) FROM points").fetchone()[0]
+        return {"files": files, "points": points}
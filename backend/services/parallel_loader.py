@@ -0,0 +1,126 @@
+"""
+Parallel Loader - Hash, parse, validate and chunk crawled JSON in a process pool
+"""
+
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+from backend.config.settings import settings
+from backend.models.schemas import Article, Chunk
+from backend.services.boilerplate import content_keys, strip_boilerplate
+from backend.services.chunker import TokenChunker
+
+def loads(data: bytes) -> Any:
+    """Decode JSON (orjson when available)"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+@dataclass
+class ScannedFile:
+    """Hash of one file, plus its boilerplate keys when it changed"""
+    path: Path
+    file_hash: Optional[str] = None  # None if unreadable
+    keys: Optional[Set[str]] = None
+
+@dataclass
+class LoadedFile:
+    """Parsed, cleaned and chunked file"""
+    path: Path
+    file_hash: str
+    article: Article
+    chunks: List[Chunk] = field(default_factory=list)
+
+@lru_cache(maxsize=1)
+def _chunker() -> TokenChunker:
+    """One chunker per worker process"""
+    return TokenChunker()
+
+def parse_file(path: Path) -> Optional[Article]:
+    """Load and validate one crawled JSON (None if invalid)"""
+    try:
+        return Article(**loads(path.read_bytes()))
+    except Exception:
+        return None
+
+def scan_file(path: Path, known_hash: Optional[str], with_keys: bool) -> ScannedFile:
+    """Hash a file, extract boilerplate keys only if it changed"""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return ScannedFile(path=path)
+    scanned = ScannedFile(path=path, file_hash=hashlib.sha256(data).hexdigest())
+    if with_keys and scanned.file_hash != known_hash:
+        try:
+            scanned.keys = content_keys(Article(**loads(data)).content)
+        except Exception:
+            pass
+    return scanned
+
+def load_file(path: Path, boilerplate_keys: Optional[Set[str]]) -> Optional[LoadedFile]:
+    """Hash, parse, strip boilerplate and chunk one file (None if unreadable)"""
+    try:
+        data = path.read_bytes()
+        article = Article(**loads(data))
+    except Exception:
+        return None
+    if boilerplate_keys is not None:
+        article.content = strip_boilerplate(article.content, boilerplate_keys.__contains__)
+    return LoadedFile(
+        path=path,
+        file_hash=hashlib.sha256(data).hexdigest(),
+        article=article,
+        chunks=_chunker().chunk(article)
+    )
+
+def _run_batch(fn: Callable, batch: List[Tuple]) -> List[Any]:
+    """Apply fn to a batch of argument tuples (runs in a worker)"""
+    return [fn(*args) for args in batch]
+
+class ParallelLoader:
+    """Process pool for the CPU-bound front half of ingestion, results in input order"""
+
+    def __init__(self, workers: int = None, batch_size: int = None):
+        workers = settings.LOAD_WORKERS if workers is None else workers
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size or settings.LOAD_BATCH_SIZE
+
+    def _map(self, fn: Callable, items: Iterable[Tuple]) -> Iterator[Any]:
+        """Ordered map over a pool, with a bounded number of batches in flight"""
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            batch: List[Tuple] = []
+            for args in items:
+                batch.append(args)
+                if len(batch) == self.batch_size:
+                    pending.append(executor.submit(_run_batch, fn, batch))
+                    batch = []
+                    if len(pending) >= 2 * self.workers:
+                        yield from pending.popleft().result()
+            if batch:
+                pending.append(executor.submit(_run_batch, fn, batch))
+            while pending:
+                yield from pending.popleft().result()
+
+    def parse(self, paths: Iterable[Path]) -> Iterator[Optional[Article]]:
+        """Parsed articles (None for invalid files)"""
+        return self._map(parse_file, ((path,) for path in paths))
+
+    def scan(self, paths: Iterable[Path], known_hashes: Dict[str, Optional[str]],
+             with_keys: bool = True) -> Iterator[ScannedFile]:
+        """File hashes, with boilerplate keys of the changed files"""
+        return self._map(scan_file, ((path, known_hashes.get(path.name), with_keys) for path in paths))
+
+    def load(self, paths: Iterable[Path], boilerplate_keys: Optional[Set[str]]) -> Iterator[Optional[LoadedFile]]:
+        """Cleaned and chunked files (boilerplate_keys None disables stripping)"""
+        return self._map(load_file, ((path, boilerplate_keys) for path in paths))
@@ -0,0 +1,124 @@
+"""
+Streaming Pipeline - Lazy stages in threads connected by bounded queues
+"""
+
+import time
+from queue import Queue
+from threading import Thread
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+Stage = Callable[[Iterator[Any]], Iterable[Any]]
+
+_DONE = object()
+
+class StageStats:
+    """Throughput counters for one stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.elapsed_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def to_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        """Summary for reports"""
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(max(self.elapsed_seconds - self.wait_seconds, 0.0), 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "items_per_second": round(self.items_out / wall_seconds, 2) if wall_seconds else 0.0
+        }
+
+class _Failure:
+    """Exception forwarded downstream to stop the pipeline"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+class StreamingPipeline:
+    """Run generator stages concurrently with backpressure between them"""
+
+    def __init__(self, stages: List[Tuple[str, Stage]], queue_size: int = 4):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = [StageStats(name) for name, _ in stages]
+        self.wall_seconds = 0.0
+
+    def _drain(self, queue: Queue, stats: StageStats, state: Dict[str, bool]) -> Iterator[Any]:
+        """Iterate a queue until the end marker, counting wait time"""
+        while True:
+            start = time.perf_counter()
+            item = queue.get()
+            stats.wait_seconds += time.perf_counter() - start
+            if item is _DONE or isinstance(item, _Failure):
+                state["upstream_done"] = True
+                if item is _DONE:
+                    return
+                raise item.error
+            stats.items_in += 1
+            yield item
+
+    def _run_stage(self, stage: Stage, inbox: Queue, outbox: Queue, stats: StageStats) -> None:
+        """Pull from inbox, push results to outbox (blocks when outbox is full)"""
+        state = {"upstream_done": False}
+        try:
+            outputs = iter(stage(self._drain(inbox, stats, state)))
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(outputs)
+                except StopIteration:
+                    break
+                finally:
+                    stats.elapsed_seconds += time.perf_counter() - start
+                stats.items_out += 1
+                outbox.put(item)
+            outbox.put(_DONE)
+        except BaseException as error:
+            outbox.put(_Failure(error))
+            # Unblock the producer so it can finish
+            while not state["upstream_done"]:
+                item = inbox.get()
+                state["upstream_done"] = item is _DONE or isinstance(item, _Failure)
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """Feed source through every stage, yielding the last stage's output"""
+        start = time.perf_counter()
+        queues = [Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        def feed():
+            try:
+                for item in source:
+                    queues[0].put(item)
+                queues[0].put(_DONE)
+            except BaseException as error:
+                queues[0].put(_Failure(error))
+
+        threads = [Thread(target=feed, daemon=True)]
+        for index, (_, stage) in enumerate(self.stages):
+            threads.append(Thread(
+                target=self._run_stage,
+                args=(stage, queues[index], queues[index + 1], self.stats[index]),
+                daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            for thread in threads:
+                thread.join(timeout=1)
+            self.wall_seconds = time.perf_counter() - start
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage throughput of the last run"""
+        return {stats.name: stats.to_dict(self.wall_seconds) for stats in self.stats}
@@ -0,0 +1,145 @@
+"""
+Qdrant client factory - one place for transport (server or embedded), storage and quantization settings
+"""
+
+import asyncio
+import os
+from threading import Lock, RLock
+from typing import Any, Optional, Union
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.local.qdrant_local import QdrantLocal
+from qdrant_client.models import (
+    BinaryQuantization, BinaryQuantizationConfig, Distance, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, VectorParams
+)
+
+from backend.config.settings import settings
+
+class LocalQdrantClient:
+    """Embedded Qdrant shared by the whole process, one call at a time (local mode is not thread-safe)"""
+
+    def __init__(self, client: QdrantClient):
+        self._qdrant = client
+        self._lock = RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._qdrant, name)
+        if not callable(attribute):
+            return attribute
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attribute(*args, **kwargs)
+        return locked
+
+class AsyncLocalQdrantClient:
+    """Async view of the shared embedded client, calls run in a worker thread"""
+
+    def __init__(self, client: LocalQdrantClient):
+        self._local = client
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._local, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+_local_client: Optional[LocalQdrantClient] = None
+_local_client_lock = Lock()
+
+def local_qdrant_client() -> LocalQdrantClient:
+    """The process-wide embedded client (path or :memory:), opened on first use"""
+    global _local_client
+    with _local_client_lock:
+        if _local_client is None:
+            if settings.QDRANT_MODE == "memory":
+                client = QdrantClient(location=":memory:")
+            else:
+                # One process at a time: Qdrant locks the storage folder
+                settings.QDRANT_PATH.mkdir(parents=True, exist_ok=True)
+                client = QdrantClient(path=str(settings.QDRANT_PATH))
+            _local_client = LocalQdrantClient(client)
+        return _local_client
+
+def is_local_client(client: Any) -> bool:
+    """Embedded clients run in-process: parallel calls only add contention"""
+    return isinstance(client, LocalQdrantClient) or isinstance(getattr(client, "_client", None), QdrantLocal)
+
+def _embedded() -> bool:
+    """Whether config selects embedded Qdrant: server | path | memory"""
+    mode = settings.QDRANT_MODE
+    if mode not in ("server", "path", "memory"):
+        raise ValueError(f"Unknown Qdrant mode: {mode} (expected server, path or memory)")
+    return mode != "server"
+
+def create_qdrant_client() -> Union[QdrantClient, LocalQdrantClient]:
+    """Client for the configured Qdrant server (REST or gRPC), or the shared embedded one"""
+    if _embedded():
+        return local_qdrant_client()
+    return QdrantClient(
+        url=settings.QDRANT_URL,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        timeout=settings.QDRANT_TIMEOUT
+    )
+
+def create_async_qdrant_client() -> Union[AsyncQdrantClient, AsyncLocalQdrantClient]:
+    """Async client for the query path (same transport settings, same embedded storage)"""
+    if _embedded():
+        return AsyncLocalQdrantClient(local_qdrant_client())
+    return AsyncQdrantClient(
+        url=settings.QDRANT_URL,
+        grpc_port=settings.QDRANT_GRPC_PORT,
+        prefer_grpc=settings.QDRANT_PREFER_GRPC,
+        timeout=settings.QDRANT_TIMEOUT
+    )
+
+def point_key(point_id: Any) -> str:
+    """Point ID as the ingestor writes it (Qdrant returns UUIDs with dashes)"""
+    return str(point_id).replace("-", "")
+
+def write_served_collection(collection_name: str) -> None:
+    """Record the version behind the alias in STATE_DIR/current, so the API resolves it without Qdrant"""
+    settings.STATE_DIR.mkdir(parents=True, exist_ok=True)
+    pointer = settings.STATE_DIR / "current"
+    temporary = pointer.with_suffix(".tmp")
+    temporary.write_text(collection_name)
+    # Atomic: readers see the old or the new name (and a new inode tells them it changed)
+    os.replace(temporary, pointer)
+
+def vector_params(on_disk: bool = None) -> VectorParams:
+    """Vector layout of new collections (originals optionally on disk)"""
+    return VectorParams(
+        size=settings.VECTOR_SIZE,
+        distance=Distance.COSINE,
+        on_disk=settings.QUANTIZATION_ON_DISK if on_disk is None else on_disk
+    )
+
+def quantization_config(mode: str = None) -> Optional[Union[ScalarQuantization, BinaryQuantization]]:
+    """Quantization of new collections: none | scalar (int8) | binary"""
+    mode = mode or settings.QUANTIZATION_MODE
+    if mode == "scalar":
+        return ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8,
+            quantile=settings.QUANTIZATION_QUANTILE,
+            always_ram=settings.QUANTIZATION_ALWAYS_RAM
+        ))
+    if mode == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(
+            always_ram=settings.QUANTIZATION_ALWAYS_RAM
+        ))
+    if mode != "none":
+        raise ValueError(f"Unknown quantization mode: {mode} (expected none, scalar or binary)")
+    return None
+
+def search_params(mode: str = None) -> Optional[SearchParams]:
+    """Oversample quantized candidates and rescore them with the original vectors"""
+    mode = mode or settings.QUANTIZATION_MODE
+    if mode == "none":
+        return None
+    return SearchParams(quantization=QuantizationSearchParams(
+        rescore=settings.QUANTIZATION_RESCORE,
+        oversampling=settings.QUANTIZATION_OVERSAMPLING
+    ))
@@ -1,104 +1,326 @@
 """
-RAG Engine: Vector Search + Google Gemini Generation
+RAG Engine: Vector Search + Google Gemini Generation (async, no blocking I/O on the event loop)
 """
 
+import asyncio
+import os
 import time
-from typing import List, Dict, Any, Tuple
+import uuid
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 
-import openai
 import google.generativeai as genai
-from qdrant_client import QdrantClient
-
+import numpy as np
+from qdrant_client.models import DatetimeRange, FieldCondition, Filter, HasIdCondition, MatchAny, MatchValue
 from backend.config.settings import settings
+from backend.models.schemas import SearchFilters
 from backend.services.cache import cache
+from backend.services.context_packer import ContextPacker, PackedContext
+from backend.services.corpus_changes import CorpusChangeLog, answer_dependencies
+from backend.services.diversity import mmr_select
+from backend.services.embedding_batcher import EmbeddingBatcher
+from backend.services.embeddings import get_embedding_provider
+from backend.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from backend.services.qdrant import create_async_qdrant_client, point_key, search_params
+from backend.services.semantic_cache import SemanticCache, normalize_query
+from backend.services.single_flight import SingleFlight
+from backend.services.tokens import count_tokens
+from backend.services.vector_index import NumpyVectorIndex, numpy_backend_selected
 
 class RAGEngine:
-    """Optimized RAG Engine: OpenAI embeddings + Google Gemini generation"""
+    """Optimized RAG Engine: pluggable embeddings + Google Gemini generation"""
     
     def __init__(self):
-        # OpenAI for embeddings only
-        self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Embedding backend selected in config.yaml
+        self.embedder = get_embedding_provider()
+        
+        # Concurrent queries share embedding API calls
+        self.query_batcher = (
+            EmbeddingBatcher(self.embedder) if settings.QUERY_BATCH_ENABLED and self.embedder.remote else None
+        )
         
         # Google Gemini for content generation
         genai.configure(api_key=settings.GOOGLE_API_KEY)
         self.gemini_model = genai.GenerativeModel(settings.GEMINI_MODEL)
         
         # Qdrant for vector search
-        self.qdrant_client = QdrantClient(url=settings.QDRANT_URL)
+        self.qdrant_client = create_async_qdrant_client()
+        
+        # Local indexes of the served collection version: (collection name, index)
+        self._lexical: Optional[Tuple[str, LexicalIndex]] = None
+        self._vectors: Optional[Tuple[str, NumpyVectorIndex]] = None
+        # Served version and the STATE_DIR/current file it was read from: (file identity, name)
+        self._served: Optional[Tuple[Tuple[Any, ...], str]] = None
+        
+        # Answers of recent questions, matched by meaning
+        self.answer_cache = SemanticCache(self.embedder.dimension) if settings.SEMANTIC_CACHE_ENABLED else None
+        
+        # Ingestion changes since an answer was cached decide whether it is still valid
+        self.corpus_changes = CorpusChangeLog(
+            settings.STATE_DIR / "changes.db", self.embedder.dimension
+        ) if settings.ANSWER_INVALIDATION_ENABLED else None
+        
+        # Identical questions in flight wait for one answer
+        self.single_flight = SingleFlight() if settings.SINGLE_FLIGHT_ENABLED else None
+        
+        # Retrieved chunks are fitted in a token budget before generation
+        self.context_packer = ContextPacker()
     
-    def _create_query_embedding(self, query: str) -> List[float]:
+    async def _create_query_embedding(self, query: str) -> List[float]:
         """Generate embedding for the query with cache"""
+        # Local embedders are faster than a Redis round trip
+        if not self.embedder.remote:
+            try:
+                return await self.embedder.aembed_query(query)
+            except Exception:
+                return []
+        
         # Check cache first
-        cached_embedding = cache.get_cached_embedding(query)
+        cached_embedding = await cache.get_cached_embedding(query)
         if cached_embedding:
             return cached_embedding
         
         try:
-            response = self.openai_client.embeddings.create(
-                model=settings.EMBEDDING_MODEL,
-                input=[query]
-            )
-            embedding = response.data[0].embedding
+            if self.query_batcher is not None:
+                embedding = await self.query_batcher.embed_query(query)
+            else:
+                embedding = await self.embedder.aembed_query(query)
             
             # Cache the embedding
-            cache.cache_embedding(query, embedding)
+            await cache.cache_embedding(query, embedding)
             return embedding
         except Exception:
             return []
     
-    def search_similar(self, query: str, max_results: int = None) -> List[Dict[str, Any]]:
-        """Vector search for similar content"""
-        max_results = max_results or settings.MAX_SEARCH_RESULTS
+    def _build_filter(self, filters: Optional[SearchFilters]) -> Optional[Filter]:
+        """Qdrant filter on indexed payload fields (None searches everything)"""
+        if filters is None or filters.is_empty():
+            return None
         
-        # Generate query embedding
-        query_embedding = self._create_query_embedding(query)
-        if not query_embedding:
-            return []
+        conditions = []
+        if filters.date_from or filters.date_to:
+            conditions.append(FieldCondition(
+                key="timestamp",
+                range=DatetimeRange(gte=filters.date_from, lte=filters.date_to)
+            ))
+        if filters.section:
+            # A cross-posted story is stored once, with every section it was published in
+            conditions.append(Filter(should=[
+                FieldCondition(key="sections", match=MatchAny(any=[filters.section])),
+                FieldCondition(key="section", match=MatchValue(value=filters.section))
+            ]))
+        if filters.source:
+            conditions.append(FieldCondition(key="source", match=MatchValue(value=filters.source)))
+        return Filter(must=conditions)
+    
+    def _format_hit(self, point_id: Any, payload: Dict[str, Any], score: float,
+                    vector: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Search result of a stored point (its vector kept for reranking, removed before returning)"""
+        hit = {
+            "id": point_key(point_id),
+            "text": payload.get("text", ""),
+            "source": payload.get("source", ""),
+            "title": payload.get("title", ""),
+            "section": payload.get("section", ""),
+            "score": float(score),
+            "timestamp": payload.get("timestamp", "")
+        }
+        if vector is not None:
+            hit["vector"] = vector
+        return hit
+    
+    async def _served_collection(self) -> str:
+        """Concrete collection version behind COLLECTION_NAME (local indexes live in its state dir)"""
+        # The ingestor replaces STATE_DIR/current on every alias swap: a local stat, no Qdrant round trip
+        pointer = settings.STATE_DIR / "current"
+        try:
+            stat = os.stat(pointer)
+            stamp = (str(pointer), stat.st_ino, stat.st_mtime_ns)
+        except OSError:
+            stamp = (str(pointer),)
+        if self._served is not None and self._served[0] == stamp:
+            return self._served[1]
         
+        collection_name = None
+        if len(stamp) > 1:
+            try:
+                collection_name = pointer.read_text().strip() or None
+            except OSError:
+                pass
+        if collection_name is None:
+            # No ingestor has run against this state dir yet: ask Qdrant once
+            collection_name = settings.COLLECTION_NAME
+            try:
+                for alias in (await self.qdrant_client.get_aliases()).aliases:
+                    if alias.alias_name == settings.COLLECTION_NAME:
+                        collection_name = alias.collection_name
+            except Exception:
+                return collection_name
+        self._served = (stamp, collection_name)
+        return collection_name
+    
+    def _lexical_index(self, collection_name: str) -> Optional[LexicalIndex]:
+        """BM25 index of a collection version (None if never built)"""
+        if self._lexical is None or self._lexical[0] != collection_name:
+            path = settings.STATE_DIR / collection_name / "lexical.db"
+            if not path.exists():
+                return None
+            self._lexical = (collection_name, LexicalIndex(path))
+        return self._lexical[1]
+    
+    async def _vector_index(self, collection_name: str) -> Optional[NumpyVectorIndex]:
+        """NumPy index of a collection version, when config selects it for searches"""
+        if settings.VECTOR_BACKEND == "qdrant":
+            return None
+        if self._vectors is None or self._vectors[0] != collection_name:
+            directory = settings.STATE_DIR / collection_name / "vectors"
+            if not directory.exists():
+                return None
+            self._vectors = (collection_name, NumpyVectorIndex(directory, self.embedder.dimension))
+        index = self._vectors[1]
+        # Counting may reload the snapshot after an ingestion, keep it off the event loop
+        return index if numpy_backend_selected(await asyncio.to_thread(len, index)) else None
+    
+    async def _vector_search(self, query_embedding: List[float], limit: int, filters: SearchFilters = None,
+                             index: NumpyVectorIndex = None,
+                             collection_name: str = None) -> List[Dict[str, Any]]:
+        """Dense hits above SCORE_THRESHOLD, best first (in-process when a NumPy index is given)"""
         try:
-            # Search in Qdrant
-            search_result = self.qdrant_client.search(
-                collection_name=settings.COLLECTION_NAME,
+            if index is not None:
+                hits = await asyncio.to_thread(index.search, query_embedding, limit, filters, settings.SCORE_THRESHOLD)
+                return [self._format_hit(point_id, payload, score) for point_id, score, payload in hits]
+            
+            search_result = await self.qdrant_client.search(
+                collection_name=collection_name or settings.COLLECTION_NAME,
                 query_vector=query_embedding,
-                limit=max_results,
-                score_threshold=settings.SCORE_THRESHOLD
+                query_filter=self._build_filter(filters),
+                search_params=search_params(),
+                limit=limit,
+                score_threshold=settings.SCORE_THRESHOLD,
+                with_vectors=settings.MMR_ENABLED
             )
-            
-            # Format results
-            results = []
-            for point in search_result:
-                results.append({
-                    "text": point.payload.get("text", ""),
-                    "source": point.payload.get("source", ""),
-                    "title": point.payload.get("title", ""),
-                    "score": float(point.score),
-                    "timestamp": point.payload.get("timestamp", "")
-                })
-            
-            return results
-            
+            return [self._format_hit(point.id, point.payload, point.score, point.vector) for point in search_result]
         except Exception:
             return []
     
-    def _build_prompt(self, query: str, context_chunks: List[Dict[str, Any]]) -> str:
-        """Build prompt for GPT with context"""
-        if not context_chunks:
+    async def _lexical_search(self, query: str, limit: int, index: Optional[LexicalIndex]) -> List[str]:
+        """Point IDs ranked by BM25"""
+        if index is None:
+            return []
+        try:
+            return [point_id for point_id, _ in await asyncio.to_thread(index.search, query, limit)]
+        except Exception:
+            return []
+    
+    async def _fetch_hits(self, point_ids: List[str], query_embedding: List[float], filters: SearchFilters = None,
+                          index: NumpyVectorIndex = None,
+                          collection_name: str = None) -> Dict[str, Dict[str, Any]]:
+        """Lexical-only hits that pass the filters, scored by cosine similarity like vector hits"""
+        if not point_ids:
+            return {}
+        if index is not None:
+            try:
+                hits = await asyncio.to_thread(index.score, point_ids, query_embedding, filters)
+            except Exception:
+                return {}
+            return {point_id: self._format_hit(point_id, payload, score) for point_id, score, payload in hits}
+        
+        query_filter = self._build_filter(filters) or Filter(must=[])
+        query_filter.must.append(HasIdCondition(has_id=point_ids))
+        try:
+            points, _ = await self.qdrant_client.scroll(
+                collection_name=collection_name or settings.COLLECTION_NAME,
+                scroll_filter=query_filter,
+                limit=len(point_ids),
+                with_payload=True,
+                with_vectors=True
+            )
+        except Exception:
+            return {}
+        
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1.0
+        hits = {}
+        for point in points:
+            vector = np.asarray(point.vector, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            hits[point_key(point.id)] = self._format_hit(
+                point.id, point.payload, vector @ query_vector / norm if norm else 0.0, point.vector
+            )
+        return hits
+    
+    async def _diversify(self, hits: List[Dict[str, Any]], query_embedding: List[float], max_results: int,
+                         index: NumpyVectorIndex = None) -> List[Dict[str, Any]]:
+        """MMR rerank of the candidates with per-source caps, using the vectors returned with the hits"""
+        if index is not None:
+            vectors = await asyncio.to_thread(index.get_vectors, [hit["id"] for hit in hits])
+            for hit in hits:
+                hit.setdefault("vector", vectors.get(hit["id"]))
+        # Hits without a vector can't be compared, they keep their rank after the diverse ones
+        comparable = [hit for hit in hits if hit.get("vector") is not None]
+        picked = mmr_select(
+            query_embedding,
+            [hit["vector"] for hit in comparable],
+            max_results,
+            sources=[hit["source"] for hit in comparable]
+        )
+        return [comparable[i] for i in picked] + [hit for hit in hits if hit.get("vector") is None]
+    
+    async def search_similar(self, query: str, max_results: int = None, filters: SearchFilters = None,
+                             query_embedding: List[float] = None) -> List[Dict[str, Any]]:
+        """Vector (+ BM25 when hybrid) search for similar content, optionally filtered by date, section, source"""
+        max_results = max_results or settings.MAX_SEARCH_RESULTS
+        
+        # Generate query embedding (unless the caller already has it)
+        query_embedding = query_embedding or await self._create_query_embedding(query)
+        if not query_embedding:
+            return []
+        
+        # Queries name the version itself, so they never see the alias mid-migration
+        collection_name = await self._served_collection()
+        vector_index = await self._vector_index(collection_name)
+        # Diversification picks max_results out of a larger candidate pool
+        candidates = max(max_results, settings.MMR_CANDIDATES) if settings.MMR_ENABLED else max_results
+        
+        if not settings.HYBRID_ENABLED:
+            hits = await self._vector_search(query_embedding, candidates, filters, vector_index, collection_name)
+        else:
+            # Both retrievers run concurrently, then reciprocal rank fusion merges them
+            limit = max(candidates, settings.HYBRID_CANDIDATES)
+            vector_hits, lexical_ids = await asyncio.gather(
+                self._vector_search(query_embedding, limit, filters, vector_index, collection_name),
+                self._lexical_search(query, limit, self._lexical_index(collection_name))
+            )
+            by_id = {hit["id"]: hit for hit in vector_hits}
+            by_id.update(await self._fetch_hits(
+                [pid for pid in lexical_ids if pid not in by_id], query_embedding, filters, vector_index,
+                collection_name
+            ))
+            
+            fused = reciprocal_rank_fusion([
+                [hit["id"] for hit in vector_hits],
+                # Lexical hits filtered out (date, section, source) are dropped before ranking
+                [point_id for point_id in lexical_ids if point_id in by_id]
+            ])
+            hits = [by_id[point_id] for point_id, _ in fused[:candidates]]
+        
+        if settings.MMR_ENABLED:
+            hits = await self._diversify(hits, query_embedding, max_results, vector_index)
+        for hit in hits:
+            hit.pop("vector", None)
+        return hits[:max_results]
+    
+    def _build_prompt(self, query: str, context: PackedContext) -> str:
+        """Build prompt for Gemini with the packed context"""
+        if not context.chunks:
             return f"""Question: {query}
 
 No relevant context found in the knowledge base. Please respond that you don't have information about this topic."""
         
-        # Build context
-        context_text = ""
-        sources = []
-        
-        for i, chunk in enumerate(context_chunks, 1):
-            context_text += f"\n[Source {i}] {chunk['title']}\n{chunk['text']}\n"
-            sources.append(chunk['source'])
-        
         prompt = f"""You are a helpful assistant that answers questions about cryptocurrency news based on provided context.
 
 Context from recent crypto news articles:
-{context_text}
+
+{context.text}
 
 Question: {query}
 
@@ -113,22 +335,25 @@ Answer:"""
         
         return prompt
     
-    def generate_answer(self, query: str, context_chunks: List[Dict[str, Any]]) -> Tuple[str, float]:
+    def _generation_config(self) -> "genai.types.GenerationConfig":
+        """Gemini generation settings"""
+        return genai.types.GenerationConfig(
+            max_output_tokens=settings.MAX_TOKENS,
+            temperature=settings.TEMPERATURE,
+            candidate_count=1
+        )
+    
+    async def generate_answer(self, query: str, context_chunks: List[Dict[str, Any]],
+                              prompt: str = None) -> Tuple[str, float]:
         """Generate answer with Google Gemini using the context"""
-        prompt = self._build_prompt(query, context_chunks)
+        if prompt is None:
+            prompt = self._build_prompt(query, self.context_packer.pack(query, context_chunks))
         
         try:
-            # Configure generation
-            generation_config = genai.types.GenerationConfig(
-                max_output_tokens=settings.MAX_TOKENS,
-                temperature=settings.TEMPERATURE,
-                candidate_count=1
-            )
-            
             # Generate answer with Gemini
-            response = self.gemini_model.generate_content(
+            response = await self.gemini_model.generate_content_async(
                 prompt,
-                generation_config=generation_config
+                generation_config=self._generation_config()
             )
             
             # Check if there is content
@@ -159,26 +384,148 @@ Answer:"""
         
         return round(confidence, 2)
     
-    def answer_question(self, query: str, max_results: int = None) -> Dict[str, Any]:
+    def _cache_scope(self, max_results: int = None, filters: SearchFilters = None) -> str:
+        """Search options an answer depends on"""
+        scope = f"{max_results or settings.MAX_SEARCH_RESULTS}"
+        if filters is not None and not filters.is_empty():
+            scope += f"_{filters.model_dump_json(exclude_none=True)}"
+        return scope
+    
+    def _cache_key(self, query: str, max_results: int = None, filters: SearchFilters = None) -> str:
+        """Answer cache key of a normalized question and its search options"""
+        return f"{normalize_query(query)}_{self._cache_scope(max_results, filters)}"
+    
+    async def _corpus_generation(self) -> int:
+        """Current corpus generation, after loading changes logged by ingestion (off the event loop)"""
+        if self.corpus_changes is None:
+            return 0
+        try:
+            return await asyncio.to_thread(self.corpus_changes.refresh)
+        except Exception:
+            return self.corpus_changes.generation
+    
+    def _is_fresh(self, result: Dict[str, Any], query_embedding: List[float] = None) -> bool:
+        """No ingestion since the answer was built touched its chunks, sources or topic"""
+        dependencies = result.get("corpus")
+        if self.corpus_changes is None or dependencies is None:
+            return True
+        return self.corpus_changes.is_fresh(dependencies, query_embedding)
+    
+    async def _cached_answer(self, query: str, max_results: int = None,
+                             filters: SearchFilters = None) -> Tuple[Optional[Dict[str, Any]], List[float]]:
+        """Exact (normalized) then semantic cache lookup, also returns the query embedding for reuse"""
+        await self._corpus_generation()
+        query_embedding: List[float] = []
+        cached_result = await cache.get_cached_query_result(self._cache_key(query, max_results, filters))
+        if cached_result:
+            dependencies = cached_result.get("corpus")
+            # The topic check needs the question embedding, only when chunks were added since
+            if dependencies and self.corpus_changes is not None and self.corpus_changes.needs_query(dependencies):
+                query_embedding = await self._create_query_embedding(query)
+            if self._is_fresh(cached_result, query_embedding):
+                if self.answer_cache is not None:
+                    self.answer_cache.record_exact_hit()
+                cached_result["cached"] = True
+                return cached_result, query_embedding
+            if self.answer_cache is not None:
+                self.answer_cache.record_invalidation()
+        
+        query_embedding = query_embedding or await self._create_query_embedding(query)
+        if self.answer_cache is not None:
+            cached_result = self.answer_cache.lookup(
+                query_embedding, query, self._cache_scope(max_results, filters),
+                is_fresh=lambda result: self._is_fresh(result, query_embedding)
+            )
+            if cached_result:
+                cached_result["cached"] = True
+                return cached_result, query_embedding
+        return None, query_embedding
+    
+    async def _remember_answer(self, query: str, max_results: int, filters: SearchFilters,
+                               query_embedding: List[float], result: Dict[str, Any]) -> None:
+        """Store an answer under its exact key and in the semantic index"""
+        await cache.cache_query_result(self._cache_key(query, max_results, filters), result)
+        if self.answer_cache is not None:
+            self.answer_cache.add(query_embedding, query, self._cache_scope(max_results, filters), result)
+    
+    def _dependencies(self, generation: int, context: PackedContext, context_chunks: List[Dict[str, Any]],
+                      max_results: int = None) -> Optional[Dict[str, Any]]:
+        """Corpus state an answer is cached with (None when invalidation is off)"""
+        if self.corpus_changes is None:
+            return None
+        return answer_dependencies(generation, context.chunks, context_chunks,
+                                   max_results or settings.MAX_SEARCH_RESULTS)
+    
+    def _extract_sources(self, context_chunks: List[Dict[str, Any]]) -> List[str]:
+        """Unique sources, best match first"""
+        return [s for s in dict.fromkeys(chunk.get('source', '') for chunk in context_chunks) if s]
+    
+    async def answer_question(self, query: str, max_results: int = None,
+                              filters: SearchFilters = None) -> Dict[str, Any]:
         """Complete pipeline: search + generate with cache"""
         # Check cache first
-        cache_key = f"{query}_{max_results or settings.MAX_SEARCH_RESULTS}"
-        cached_result = cache.get_cached_query_result(cache_key)
+        cached_result, query_embedding = await self._cached_answer(query, max_results, filters)
         if cached_result:
-            cached_result["cached"] = True
             return cached_result
         
+        if self.single_flight is None:
+            return await self._compute_answer(query, max_results, filters, query_embedding)
+        
+        result, shared = await self.single_flight.run(
+            self._cache_key(query, max_results, filters),
+            lambda: self._locked_answer(query, max_results, filters, query_embedding)
+        )
+        return {**result, "cached": True} if shared else result
+    
+    async def _locked_answer(self, query: str, max_results: int, filters: SearchFilters,
+                             query_embedding: List[float]) -> Dict[str, Any]:
+        """Compute an answer, unless another API worker holding the Redis lock does it first"""
+        if not settings.SINGLE_FLIGHT_DISTRIBUTED:
+            return await self._compute_answer(query, max_results, filters, query_embedding)
+        
+        key, token = self._cache_key(query, max_results, filters), uuid.uuid4().hex
+        timeout = settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+        if not await cache.acquire_lock(key, token, timeout):
+            self.single_flight.record_lock_wait()
+            cached_result = await self._wait_for_answer(key, timeout, query_embedding)
+            if cached_result:
+                return cached_result
+            # Lock holder failed or is too slow: answer ourselves
+        try:
+            return await self._compute_answer(query, max_results, filters, query_embedding)
+        finally:
+            await cache.release_lock(key, token)
+    
+    async def _wait_for_answer(self, key: str, timeout: float,
+                               query_embedding: List[float] = None) -> Optional[Dict[str, Any]]:
+        """Poll the exact cache for a fresh answer being computed elsewhere"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            await asyncio.sleep(0.1)
+            cached_result = await cache.get_cached_query_result(key)
+            # The key may still hold the answer an ingest invalidated, until the lock holder overwrites it
+            if cached_result and self._is_fresh(cached_result, query_embedding):
+                cached_result["cached"] = True
+                return cached_result
+        return None
+    
+    async def _compute_answer(self, query: str, max_results: int, filters: SearchFilters,
+                              query_embedding: List[float]) -> Dict[str, Any]:
+        """Search + generate + cache, no lookups"""
         start_time = time.time()
+        # Read before searching: changes during the search make the answer look older, never newer
+        generation = await self._corpus_generation()
         
         # Vector search
-        context_chunks = self.search_similar(query, max_results)
+        context_chunks = await self.search_similar(query, max_results, filters, query_embedding)
         
-        # Answer generation
-        answer, confidence = self.generate_answer(query, context_chunks)
+        # Answer generation on the chunks that fit in the context budget
+        context = self.context_packer.pack(query, context_chunks)
+        prompt = self._build_prompt(query, context)
+        answer, confidence = await self.generate_answer(query, context.chunks, prompt)
         
         # Extract unique sources
-        sources = list(set(chunk.get('source', '') for chunk in context_chunks))
-        sources = [s for s in sources if s]
+        sources = self._extract_sources(context.chunks)
         
         response_time = round(time.time() - start_time, 2)
         
@@ -188,18 +535,85 @@ Answer:"""
             "confidence": confidence,
             "response_time": response_time,
             "chunks_found": len(context_chunks),
-            "cached": False
+            "prompt_tokens": count_tokens(prompt),
+            "cached": False,
+            "corpus": self._dependencies(generation, context, context_chunks, max_results)
         }
         
         # Cache the result
-        cache.cache_query_result(cache_key, result)
+        await self._remember_answer(query, max_results, filters, query_embedding, result)
         
         return result
     
-    def get_collection_stats(self) -> Dict[str, Any]:
+    async def stream_answer(self, query: str, max_results: int = None,
+                            filters: SearchFilters = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Search, then stream generation: ("sources", ...), ("token", ...)*, ("done", result) or ("error", ...)"""
+        cached_result, query_embedding = await self._cached_answer(query, max_results, filters)
+        if cached_result:
+            yield "sources", {
+                "sources": cached_result["sources"],
+                "confidence": cached_result["confidence"],
+                "chunks_found": cached_result.get("chunks_found", 0),
+                "prompt_tokens": cached_result.get("prompt_tokens", 0)
+            }
+            yield "token", {"text": cached_result["answer"]}
+            yield "done", {key: value for key, value in cached_result.items() if key != "corpus"}
+            return
+        
+        start_time = time.time()
+        generation = await self._corpus_generation()
+        context_chunks = await self.search_similar(query, max_results, filters, query_embedding)
+        context = self.context_packer.pack(query, context_chunks)
+        prompt = self._build_prompt(query, context)
+        sources = self._extract_sources(context.chunks)
+        confidence = self._calculate_confidence(context.chunks)
+        prompt_tokens = count_tokens(prompt)
+        yield "sources", {
+            "sources": sources,
+            "confidence": confidence,
+            "chunks_found": len(context_chunks),
+            "prompt_tokens": prompt_tokens
+        }
+        
+        parts: List[str] = []
+        try:
+            response = await self.gemini_model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(),
+                stream=True
+            )
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield "token", {"text": chunk.text}
+        except Exception:
+            yield "error", {"message": "Sorry, I encountered an error generating the response."}
+            return
+        
+        answer = "".join(parts).strip()
+        if not answer:
+            yield "error", {"message": "I couldn't generate a proper response. Please try rephrasing your question."}
+            return
+        
+        result = {
+            "answer": answer,
+            "sources": sources,
+            "confidence": confidence,
+            "response_time": round(time.time() - start_time, 2),
+            "chunks_found": len(context_chunks),
+            "prompt_tokens": prompt_tokens,
+            "cached": False,
+            "corpus": self._dependencies(generation, context, context_chunks, max_results)
+        }
+        
+        # Only complete answers are cached
+        await self._remember_answer(query, max_results, filters, query_embedding, result)
+        yield "done", {key: value for key, value in result.items() if key != "corpus"}
+    
+    async def get_collection_stats(self) -> Dict[str, Any]:
         """Get collection statistics"""
         try:
-            info = self.qdrant_client.get_collection(settings.COLLECTION_NAME)
+            info = await self.qdrant_client.get_collection(await self._served_collection())
             return {
                 "total_vectors": info.points_count,
                 "vector_size": info.config.params.vectors.size,
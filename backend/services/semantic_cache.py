@@ -0,0 +1,149 @@
+"""
+Semantic Answer Cache - Recently answered questions matched by embedding similarity
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence
+
+import numpy as np
+
+from backend.config.settings import settings
+
+_CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+    "why's": "why is", "when's": "when is", "it's": "it is", "that's": "that is",
+    "there's": "there is", "isn't": "is not", "aren't": "are not", "doesn't": "does not",
+    "don't": "do not", "didn't": "did not", "won't": "will not", "can't": "can not",
+}
+_APOSTROPHES = re.compile(r"[’‘`]")
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_ENTITY = re.compile(r"\b[A-Z][A-Za-z0-9]*\b|\b[A-Z0-9]{2,}\b")
+_NUMBER = re.compile(r"\d")
+_STOPWORDS = frozenset(
+    "a an the is are was were be been being do does did what who where when why how which "
+    "with about on in of for to at by from and or not it its this that these those there "
+    "me my i you your we our they their happening happened going latest news today now".split()
+)
+
+def normalize_query(query: str) -> str:
+    """Case, apostrophes, contractions and punctuation don't change the question"""
+    text = _APOSTROPHES.sub("'", query.lower())
+    for contraction, expanded in _CONTRACTIONS.items():
+        text = text.replace(contraction, expanded)
+    return " ".join(_WORD.findall(text))
+
+def guard_terms(query: str) -> FrozenSet[str]:
+    """Words two questions must share to share an answer: numbers, tickers, names"""
+    protected = set(settings.SEMANTIC_CACHE_PROTECTED_TERMS or [])
+    words = set(normalize_query(query).split())
+    # Capitalized words past the first one are tickers or proper nouns (XRP, Ripple, ...)
+    entities = {match.lower() for match in _ENTITY.findall(query.split(" ", 1)[-1])}
+    return frozenset(
+        word for word in words
+        if _NUMBER.search(word) or word in protected or (word in entities and word not in _STOPWORDS)
+    )
+
+@dataclass
+class _Entry:
+    """One answered question"""
+    scope: str
+    terms: FrozenSet[str]
+    result: Dict[str, Any]
+    expires_at: float
+
+class SemanticCache:
+    """Fixed-size in-process index of answered questions, oldest entries overwritten first"""
+
+    def __init__(self, dimension: int = None, max_entries: int = None,
+                 threshold: float = None, ttl: int = None):
+        self.dimension = dimension or settings.VECTOR_SIZE
+        self.max_entries = max_entries or settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.threshold = threshold or settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl or settings.CACHE_TTL
+        self._vectors = np.zeros((self.max_entries, self.dimension), dtype=np.float32)
+        self._entries: List[Optional[_Entry]] = [None] * self.max_entries
+        self._next = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Start counting lookups again"""
+        self._stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "guard_rejections": 0, "invalidated": 0}
+
+    def record_exact_hit(self) -> None:
+        """Count a hit served by the exact (normalized) key cache"""
+        self._stats["lookups"] += 1
+        self._stats["exact_hits"] += 1
+
+    def record_invalidation(self) -> None:
+        """Count a cached answer dropped because ingestion changed what it was built from"""
+        self._stats["invalidated"] += 1
+
+    def lookup(self, embedding: Sequence[float], query: str, scope: str,
+               is_fresh: Callable[[Dict[str, Any]], bool] = None) -> Optional[Dict[str, Any]]:
+        """Cached result of the most similar answered question with the same scope (stale entries are dropped)"""
+        self._stats["lookups"] += 1
+        vector = self._unit(embedding)
+        if vector is None:
+            return None
+
+        now = time.time()
+        similarities = self._vectors @ vector
+        candidates = np.flatnonzero(similarities >= self.threshold)
+        terms = guard_terms(query)
+        for index in candidates[np.argsort(-similarities[candidates])]:
+            entry = self._entries[index]
+            if entry is None or entry.scope != scope or entry.expires_at < now:
+                continue
+            # Similar wording, different ticker or number: a wrong answer is worse than a miss
+            if entry.terms != terms:
+                self._stats["guard_rejections"] += 1
+                continue
+            if is_fresh is not None and not is_fresh(entry.result):
+                self._vectors[index] = 0
+                self._entries[index] = None
+                self.record_invalidation()
+                continue
+            self._stats["semantic_hits"] += 1
+            return dict(entry.result)
+        return None
+
+    def add(self, embedding: Sequence[float], query: str, scope: str, result: Dict[str, Any]) -> None:
+        """Remember an answered question"""
+        vector = self._unit(embedding)
+        if vector is None:
+            return
+        self._vectors[self._next] = vector
+        self._entries[self._next] = _Entry(
+            scope=scope,
+            terms=guard_terms(query),
+            result=dict(result),
+            expires_at=time.time() + self.ttl
+        )
+        self._next = (self._next + 1) % self.max_entries
+
+    def clear(self) -> None:
+        """Forget every answer (e.g. after re-ingestion)"""
+        self._vectors[:] = 0
+        self._entries = [None] * self.max_entries
+        self._next = 0
+
+    def _unit(self, embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Normalized float32 vector (None if unusable)"""
+        if embedding is None or len(embedding) != self.dimension:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate of the answer cache since the last reset"""
+        hits = self._stats["exact_hits"] + self._stats["semantic_hits"]
+        lookups = self._stats["lookups"]
+        return {
+            **self._stats,
+            "misses": lookups - hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": sum(entry is not None for entry in self._entries)
+        }
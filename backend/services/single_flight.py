@@ -0,0 +1,58 @@
+"""
+Single Flight - Concurrent calls with the same key share one execution
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Per-process request coalescing: the first caller leads, the others await its result"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Start counting calls again"""
+        self._stats = {"leaders": 0, "followers": 0, "lock_waits": 0}
+
+    def record_lock_wait(self) -> None:
+        """Count a leader that waited on another worker's lock"""
+        self._stats["lock_waits"] += 1
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of fn for this key, plus whether it was shared from another caller"""
+        while key in self._inflight:
+            future = self._inflight[key]
+            try:
+                # Shielded: a follower that goes away must not cancel the leader
+                result = await asyncio.shield(future)
+                self._stats["followers"] += 1
+                return result, True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, the next caller in line takes over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._stats["leaders"] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it, nobody else needs to retrieve it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Leaders (real executions), followers (coalesced calls), lock waits and calls in flight"""
+        return {**self._stats, "in_flight": len(self._inflight)}
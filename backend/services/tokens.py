@@ -0,0 +1,47 @@
+"""
+Token counting helpers - tiktoken when available, fast estimate otherwise
+"""
+
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Rough BPE ratio for English prose (~4 chars per token)
+_CHARS_PER_TOKEN = 4
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the cl100k encoding used by OpenAI embedding models"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text (exact with tiktoken, estimated otherwise)"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Words and punctuation are at least one token each, long words are split
+    return max(len(_TOKEN_PATTERN.findall(text)), len(text) // _CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text so that it fits in max_tokens"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    # Shrink proportionally until the estimate fits
+    while text and count_tokens(text) > max_tokens:
+        text = text[:int(len(text) * max_tokens / count_tokens(text) * 0.95)]
+    return text
@@ -0,0 +1,86 @@
+"""
+Bulk Uploader - Batched, parallel Qdrant upserts with a final consistency barrier
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from backend.config.settings import settings
+from backend.services.qdrant import is_local_client
+
+class BulkUploader:
+    """Split points into batches and upsert them from several workers"""
+
+    def __init__(self, client: QdrantClient, batch_size: int = None, workers: int = None, wait: bool = None):
+        self.client = client
+        self.batch_size = batch_size or settings.UPLOAD_BATCH_SIZE
+        # Embedded Qdrant applies writes in-process and is not thread-safe: one worker, no barrier
+        self.local = is_local_client(client)
+        self.workers = 1 if self.local else workers or settings.UPLOAD_WORKERS
+        self.wait = settings.UPLOAD_WAIT if wait is None else wait
+        self._lock = Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Start a new throughput measurement"""
+        with self._lock:
+            self._points = 0
+            self._batches = 0
+            self._failed_batches = 0
+            self._seconds = 0.0
+
+    def _upsert(self, collection_name: str, batch: List[PointStruct], wait: bool) -> Optional[Set[str]]:
+        """Upsert one batch, None on failure"""
+        try:
+            self.client.upsert(collection_name=collection_name, points=batch, wait=wait)
+            return {point.id for point in batch}
+        except Exception:
+            return None
+
+    def upload(self, collection_name: str, points: List[PointStruct]) -> Set[str]:
+        """Upsert points, return the IDs of the batches that were accepted"""
+        if not points:
+            return set()
+
+        start = time.perf_counter()
+        batches = [points[i:i + self.batch_size] for i in range(0, len(points), self.batch_size)]
+        stored: Set[str] = set()
+        failed = 0
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches))) as executor:
+            results = executor.map(lambda batch: self._upsert(collection_name, batch, self.wait), batches)
+            for result in results:
+                if result is None:
+                    failed += 1
+                else:
+                    stored |= result
+
+        # Barrier: updates are applied in order, so once a final acknowledged
+        # write is applied every earlier async write is visible as well
+        if not self.wait and not self.local and stored:
+            last_batch = next(batch for batch in reversed(batches) if batch[0].id in stored)
+            if self._upsert(collection_name, last_batch, wait=True) is None:
+                stored -= {point.id for point in last_batch}
+
+        with self._lock:
+            self._points += len(stored)
+            self._batches += len(batches)
+            self._failed_batches += failed
+            self._seconds += time.perf_counter() - start
+        return stored
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput since the last reset"""
+        with self._lock:
+            return {
+                "points": self._points,
+                "batches": self._batches,
+                "failed_batches": self._failed_batches,
+                "seconds": round(self._seconds, 3),
+                "points_per_second": round(self._points / self._seconds, 1) if self._seconds else 0.0
+            }
@@ -0,0 +1,341 @@
+"""
+NumPy Vector Index - In-process search over a memory-mapped float32 matrix (single-node alternative to Qdrant)
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.models.schemas import SearchFilters
+from backend.services.qdrant import point_key
+
+# Rows scored per matrix product (bounds the temporary score buffers)
+_BLOCK_ROWS = 65536
+# Rewrite the matrix once a quarter of its rows are tombstones
+_COMPACT_RATIO = 0.25
+_COMPACT_MIN_ROWS = 256
+
+Hit = Tuple[str, float, Dict[str, Any]]
+
+def _epoch(value: Any) -> float:
+    """Seconds since epoch of a datetime or ISO string (NaN if missing, naive means UTC)"""
+    if value is None or value == "":
+        return float("nan")
+    try:
+        moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return float("nan")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def _json_default(value: Any) -> str:
+    """Payload values JSON can't encode (datetimes)"""
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    """Normalized float32 vector: cosine similarity becomes a dot product"""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _section_column(payload: Dict[str, Any]) -> str:
+    """Sections a point is filed under (canonical plus aliases), comma separated"""
+    return ",".join(payload.get("sections") or [payload.get("section", "")])
+
+def numpy_backend_selected(vectors: int) -> bool:
+    """Search the NumPy index instead of Qdrant: numpy always, auto up to NUMPY_MAX_VECTORS"""
+    backend = settings.VECTOR_BACKEND
+    if backend not in ("qdrant", "numpy", "auto"):
+        raise ValueError(f"Unknown vector backend: {backend} (expected qdrant, numpy or auto)")
+    if backend == "auto":
+        return 0 < vectors <= settings.NUMPY_MAX_VECTORS
+    return backend == "numpy"
+
+class NumpyVectorIndex:
+    """Unit vectors appended to vectors.f32, point rows and filter fields in SQLite, deletes as tombstones"""
+
+    def __init__(self, directory: Path, dimension: int = None, writer: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension or settings.VECTOR_SIZE
+        self._row_bytes = self.dimension * 4
+        self._vectors_path = self.directory / "vectors.f32"
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.directory / "points.db"), check_same_thread=False)
+        self._create_tables()
+        # Only the ingestor appends; readers skip a trailing partial row instead of cutting it under the writer
+        if writer:
+            self._truncate_partial_row()
+
+        # In-memory snapshot, reloaded when another connection (or this one) commits
+        self._version: Optional[int] = None
+        self._map: Optional[np.memmap] = None
+        self._ids: List[Optional[str]] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._sections: Dict[str, np.ndarray] = {}
+        self._sources = np.zeros(0, dtype=object)
+        self._timestamps = np.zeros(0, dtype=np.float64)
+
+    def _create_tables(self) -> None:
+        """Create schema if not exists"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS points (
+                    point_id TEXT PRIMARY KEY,
+                    row INTEGER NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    section TEXT,
+                    source TEXT,
+                    timestamp REAL,
+                    payload TEXT
+                )
+            """)
+
+    def _truncate_partial_row(self) -> None:
+        """Drop a half written row left by an interrupted append"""
+        self._vectors_path.touch(exist_ok=True)
+        size = self._vectors_path.stat().st_size
+        if size % self._row_bytes:
+            with open(self._vectors_path, 'r+b') as f:
+                f.truncate(size - size % self._row_bytes)
+
+    def _refresh(self) -> None:
+        """Reload the snapshot if the points table changed (lock held)"""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return
+        size = self._vectors_path.stat().st_size if self._vectors_path.exists() else 0
+        rows = size // self._row_bytes
+        self._map = np.memmap(self._vectors_path, dtype=np.float32, mode='r',
+                              shape=(rows, self.dimension)) if rows else None
+        self._ids = [None] * rows
+        self._live = np.zeros(rows, dtype=bool)
+        sections: Dict[str, List[int]] = {}
+        self._sources = np.full(rows, "", dtype=object)
+        self._timestamps = np.full(rows, np.nan, dtype=np.float64)
+        for point_id, row, deleted, section, source, timestamp in self._conn.execute(
+            "SELECT point_id, row, deleted, section, source, timestamp FROM points"
+        ):
+            if row >= rows:
+                continue
+            self._ids[row] = point_id
+            self._live[row] = not deleted
+            for name in (section or "").split(","):
+                sections.setdefault(name, []).append(row)
+            self._sources[row] = source
+            self._timestamps[row] = np.nan if timestamp is None else timestamp
+        # Rows per section: a point is filed under every section of a cross-posted story
+        self._sections = {name: np.asarray(section_rows) for name, section_rows in sections.items()}
+        self._version = version
+
+    def _lookup(self, point_ids: List[str]) -> Dict[str, int]:
+        """Rows of the known point IDs, tombstoned or not (lock held)"""
+        rows: Dict[str, int] = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(point_ids), 500):
+            batch = point_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self._conn.execute(
+                f"SELECT point_id, row FROM points WHERE point_id IN ({placeholders})", batch
+            ))
+        return rows
+
+    def upsert(self, points: Iterable[Any]) -> int:
+        """Store points (anything with id, vector, payload): known IDs are overwritten in place, new ones appended"""
+        latest = {point_key(point.id): point for point in points if len(point.vector) == self.dimension}
+        if not latest:
+            return 0
+        with self._lock:
+            known = self._lookup(list(latest))
+            new = [point_id for point_id in latest if point_id not in known]
+            # Vectors hit the disk before the table points at them
+            with open(self._vectors_path, 'r+b') as f:
+                for point_id, row in known.items():
+                    f.seek(row * self._row_bytes)
+                    f.write(_unit(latest[point_id].vector).tobytes())
+                f.seek(0, os.SEEK_END)
+                first_row = f.tell() // self._row_bytes
+                if new:
+                    f.write(np.stack([_unit(latest[point_id].vector) for point_id in new]).tobytes())
+            rows = {**known, **{point_id: first_row + offset for offset, point_id in enumerate(new)}}
+            with self._conn:
+                self._conn.executemany("""
+                    INSERT INTO points (point_id, row, deleted, section, source, timestamp, payload)
+                    VALUES (?, ?, 0, ?, ?, ?, ?)
+                    ON CONFLICT(point_id) DO UPDATE SET
+                        deleted = 0, section = excluded.section, source = excluded.source,
+                        timestamp = excluded.timestamp, payload = excluded.payload
+                """, [
+                    (point_id, rows[point_id], _section_column(payload), payload.get("source", ""),
+                     _epoch(payload.get("timestamp")), json.dumps(payload, default=_json_default))
+                    for point_id, payload in ((pid, latest[pid].payload or {}) for pid in latest)
+                ])
+            self._version = None
+        return len(latest)
+
+    def delete(self, point_ids: Iterable[str]) -> None:
+        """Tombstone points, compacting the matrix when tombstones pile up"""
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE points SET deleted = 1 WHERE point_id = ?",
+                    [(point_key(point_id),) for point_id in point_ids]
+                )
+            self._version = None
+            total, dead = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM points"
+            ).fetchone()
+            if total >= _COMPACT_MIN_ROWS and dead > _COMPACT_RATIO * total:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite vectors.f32 without tombstoned rows (lock held)"""
+        rows = self._conn.execute("SELECT point_id, row FROM points WHERE deleted = 0 ORDER BY row").fetchall()
+        size = self._vectors_path.stat().st_size // self._row_bytes
+        view = np.memmap(self._vectors_path, dtype=np.float32, mode='r',
+                         shape=(size, self.dimension)) if size else None
+        temporary = self._vectors_path.with_suffix(".tmp")
+        with open(temporary, 'wb') as f:
+            for start in range(0, len(rows), _BLOCK_ROWS):
+                f.write(np.ascontiguousarray(view[[row for _, row in rows[start:start + _BLOCK_ROWS]]]).tobytes())
+        # Readers keep their old mapping until the table change makes them reload
+        os.replace(temporary, self._vectors_path)
+        with self._conn:
+            self._conn.execute("DELETE FROM points WHERE deleted = 1")
+            self._conn.executemany(
+                "UPDATE points SET row = ? WHERE point_id = ?",
+                [(new_row, point_id) for new_row, (point_id, _) in enumerate(rows)]
+            )
+        self._version = None
+
+    def set_payload(self, point_ids: Iterable[str], payload: Dict[str, Any]) -> None:
+        """Merge fields into the payload of existing points"""
+        with self._lock, self._conn:
+            for point_id in point_ids:
+                row = self._conn.execute(
+                    "SELECT payload FROM points WHERE point_id = ?", (point_key(point_id),)
+                ).fetchone()
+                if row is not None:
+                    merged = {**json.loads(row[0]), **payload}
+                    self._conn.execute(
+                        "UPDATE points SET section = ?, payload = ? WHERE point_id = ?",
+                        (_section_column(merged), json.dumps(merged, default=_json_default), point_key(point_id))
+                    )
+            self._version = None
+
+    def _mask(self, filters: Optional[SearchFilters]) -> np.ndarray:
+        """Live rows matching the filters, same semantics as the Qdrant filter (lock held)"""
+        mask = self._live.copy()
+        if filters is None or filters.is_empty():
+            return mask
+        if filters.section:
+            section = np.zeros(len(mask), dtype=bool)
+            section[self._sections.get(filters.section, [])] = True
+            mask &= section
+        if filters.source:
+            mask &= self._sources == filters.source
+        # NaN (missing timestamp) never satisfies a range, like a missing payload field
+        if filters.date_from:
+            mask &= self._timestamps >= _epoch(filters.date_from)
+        if filters.date_to:
+            mask &= self._timestamps <= _epoch(filters.date_to)
+        return mask
+
+    def _payloads(self, point_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Payloads of the given points (lock held)"""
+        payloads = {}
+        for start in range(0, len(point_ids), 500):
+            batch = point_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            payloads.update(
+                (point_id, json.loads(payload)) for point_id, payload in self._conn.execute(
+                    f"SELECT point_id, payload FROM points WHERE point_id IN ({placeholders})", batch
+                )
+            )
+        return payloads
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray) -> List[Hit]:
+        """(point ID, score, payload) of scored rows (lock held)"""
+        point_ids = [self._ids[row] for row in rows]
+        payloads = self._payloads(point_ids)
+        return [(point_id, float(score), payloads.get(point_id, {})) for point_id, score in zip(point_ids, scores)]
+
+    def search(self, query_vector: Sequence[float], limit: int, filters: SearchFilters = None,
+               score_threshold: float = None) -> List[Hit]:
+        """Top cosine matches: blocked matrix-vector products, argpartition for the top-k"""
+        query = _unit(query_vector)
+        with self._lock:
+            self._refresh()
+            if self._map is None:
+                return []
+            mask = self._mask(filters)
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return []
+            if len(candidates) < len(mask) // 4:
+                # Selective filter: score only the matching rows
+                scores = np.asarray(self._map[candidates] @ query)
+            else:
+                scores = np.empty(len(mask), dtype=np.float32)
+                for start in range(0, len(mask), _BLOCK_ROWS):
+                    scores[start:start + _BLOCK_ROWS] = self._map[start:start + _BLOCK_ROWS] @ query
+                scores = scores[candidates]
+            k = min(limit, len(candidates))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            if score_threshold is not None:
+                top = top[scores[top] >= score_threshold]
+            return self._hits(candidates[top], scores[top])
+
+    def score(self, point_ids: Iterable[str], query_vector: Sequence[float],
+              filters: SearchFilters = None) -> List[Hit]:
+        """Cosine similarity of given points that are live and match the filters"""
+        query = _unit(query_vector)
+        with self._lock:
+            self._refresh()
+            rows = self._lookup([point_key(point_id) for point_id in point_ids])
+            mask = self._mask(filters)
+            candidates = np.array(sorted(row for row in rows.values() if row < len(mask) and mask[row]), dtype=np.int64)
+            if not len(candidates):
+                return []
+            return self._hits(candidates, np.asarray(self._map[candidates] @ query))
+
+    def get_vectors(self, point_ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Stored (unit) vectors of the given points"""
+        with self._lock:
+            self._refresh()
+            rows = self._lookup([point_key(point_id) for point_id in point_ids])
+            return {point_id: np.array(self._map[row]) for point_id, row in rows.items() if row < len(self._ids)}
+
+    def clear(self) -> None:
+        """Drop every point"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM points")
+            # A new empty file, truncating would break live mappings of the old one
+            temporary = self._vectors_path.with_suffix(".tmp")
+            temporary.write_bytes(b"")
+            os.replace(temporary, self._vectors_path)
+            self._version = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._live.sum())
+
+    def stats(self) -> Dict[str, int]:
+        """Live points and tombstones"""
+        with self._lock:
+            total, dead = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM points"
+            ).fetchone()
+        return {"vectors": total - dead, "tombstones": dead}
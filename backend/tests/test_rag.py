@@ -4,6 +4,7 @@ Simple tests for the RAG system
 
 import sys
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
 # Add the parent directory to the path
@@ -38,9 +39,1192 @@ def test_imports():
     from backend.services.auto_ingest import auto_ingest
     from backend.api.app import app
 
+def test_embedding_scheduler():
+    """Test batching by count/tokens and retry of failed batches only"""
+    from backend.services.embedding_scheduler import EmbeddingScheduler
+    
+    calls = []
+    
+    def flaky_embed(texts):
+        calls.append(list(texts))
+        # First call for the batch containing "boom" fails
+        if "boom" in texts and sum("boom" in c for c in calls) == 1:
+            raise RuntimeError("transient")
+        return [[float(len(t))] for t in texts]
+    
+    scheduler = EmbeddingScheduler(
+        flaky_embed, max_batch_size=2, max_batch_tokens=1000,
+        max_input_tokens=100, max_workers=2, max_retries=2, retry_backoff=0
+    )
+    texts = ["a", "bb", "boom", "dddd", "eeeee"]
+    embeddings = scheduler.embed(texts)
+    
+    assert embeddings == [[1.0], [2.0], [4.0], [4.0], [5.0]]
+    assert scheduler.last_stats["batches"] == 3
+    assert scheduler.last_stats["retries"] == 1
+    assert scheduler.last_stats["failed"] == 0
+    
+    # Token budget splits batches before the count limit
+    scheduler.max_batch_size, scheduler.max_batch_tokens = 100, 3
+    assert len(scheduler.make_batches(["one two", "three four", "five"])) == 2
+
+def test_ingest_manifest():
+    """Test manifest hashes, point ownership and shared points"""
+    import tempfile
+    from backend.services.manifest import IngestManifest
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = IngestManifest(Path(tmp) / "manifest.db")
+        manifest.record_file("a.json", "https://x/a", "hash-a", {"p1", "p2"})
+        manifest.record_file("b.json", "https://x/a", "hash-b", {"p2"})
+        
+        assert manifest.get_file_hash("a.json") == "hash-a"
+        assert manifest.get_file_hash("missing.json") is None
+        assert manifest.get_point_ids("a.json") == {"p1", "p2"}
+        # p2 is shared, so it survives removal of a.json
+        assert manifest.referenced_ids({"p1", "p2"}, exclude="a.json") == {"p2"}
+        
+        manifest.remove_file("a.json")
+        assert manifest.known_files() == {"b.json"}
+        assert manifest.stats() == {"files": 1, "points": 1}
+
+def test_streaming_pipeline():
+    """Test stage chaining, batching stages and error propagation"""
+    from backend.services.pipeline import StreamingPipeline
+    
+    def double(items):
+        for item in items:
+            yield item * 2
+    
+    def pairs(items):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) == 2:
+                yield sum(batch)
+                batch = []
+        if batch:
+            yield sum(batch)
+    
+    pipeline = StreamingPipeline([("double", double), ("pairs", pairs)], queue_size=1)
+    assert list(pipeline.run(range(5))) == [2, 10, 8]
+    assert pipeline.report()["double"]["items_out"] == 5
+    
+    def fail(items):
+        for item in items:
+            raise ValueError("bad item")
+        yield from ()
+    
+    failing = StreamingPipeline([("fail", fail), ("double", double)], queue_size=1)
+    try:
+        list(failing.run(range(100)))
+        assert False, "error was not propagated"
+    except ValueError:
+        pass
+
+def test_token_chunker():
+    """Test token limits, overlap and small tail merging"""
+    from backend.services.chunker import TokenChunker
+    from backend.services.tokens import count_tokens
+    
+    sentences = [f"Sentence number {i} talks about bitcoin markets today." for i in range(40)]
+    content = "\n".join(" ".join(sentences[i:i + 4]) for i in range(0, 40, 4))
+    
+    chunker = TokenChunker(chunk_size=50, chunk_overlap=15, min_chunk_size=20)
+    chunks = chunker.chunk_text(content)
+    
+    def overlap(previous, current):
+        previous, current = previous.split(), current.split()
+        return max((n for n in range(1, min(len(previous), len(current)) + 1) if previous[-n:] == current[:n]),
+                   default=0)
+    
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    # Consecutive chunks share their boundary sentence
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous.split("\n")[-1].split(". ")[-1] in current
+    
+    # Whole chunks are only re-measured near the limit, not once per added sentence
+    measured = []
+    joined_tokens = chunker._tokens
+    chunker._tokens = lambda units: measured.append(len(units)) or joined_tokens(units)
+    assert chunker.chunk_text(content) == chunks
+    del chunker._tokens
+    assert len(measured) <= 2 * len(chunks)
+    
+    # Sentences longer than the overlap are carried over word by word
+    long_sentences = " ".join(f"Sentence {i} is a long one about bitcoin, ether, solana, "
+                              f"stablecoins and the regulators watching them." for i in range(20))
+    chunks = chunker.chunk_text(long_sentences)
+    assert len(chunks) > 1 and all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert all(0 < count_tokens(" ".join(previous.split()[-overlap(previous, current):])) <= 15
+               for previous, current in zip(chunks, chunks[1:]))
+    
+    # A short tail is merged into the previous chunk, unless that would exceed chunk_size
+    merged = TokenChunker(chunk_size=50, chunk_overlap=0, min_chunk_size=20).chunk_text(
+        " ".join(sentences[:3]) + " Tail."
+    )
+    assert len(merged) == 1 and merged[-1].endswith("Tail.")
+    capped = TokenChunker(chunk_size=50, chunk_overlap=0, min_chunk_size=20).chunk_text(
+        " ".join(sentences[:4]) + " Tail."
+    )
+    assert len(capped) == 2 and all(count_tokens(chunk) <= 50 for chunk in capped)
+
+def test_near_duplicate_index():
+    """Test article aliases and near-duplicate chunk lookup"""
+    import tempfile
+    from backend.services.dedup import NearDuplicateIndex
+    
+    story = " ".join(f"Bitcoin treasury firm adds {i} coins to its balance sheet." for i in range(30))
+    other = " ".join(f"Ripple drops its cross appeal number {i} against the regulator." for i in range(30))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(Path(tmp) / "dedup.db", num_perm=64, bands=16, threshold=0.8,
+                                   title_threshold=0.5, shingle_size=5, chunk_max_distance=3)
+        index.add_article("latest_a.json", "https://x/a", "bitcoin-treasury-firm-adds", story)
+        
+        # Same story from another section (small edit) is an alias
+        copy = story.replace("29 coins", "29 BTC")
+        assert index.find_duplicate("markets_a.json", "bitcoin-treasury-firm-adds", copy) == "latest_a.json"
+        assert index.find_duplicate("markets_b.json", "ripple-drops-appeal", other) is None
+        
+        index.add_article("markets_a.json", "https://y/a", "bitcoin-treasury-firm-adds", copy,
+                          canonical="latest_a.json")
+        assert index.alias_urls("latest_a.json") == ["https://y/a"]
+        assert index.remove_article("latest_a.json") == ["markets_a.json"]
+        
+        index.add_chunks({"p1": story})
+        assert index.find_duplicate_chunk(story + " Extra") == "p1"
+        assert index.find_duplicate_chunk(other) is None
+
+def test_boilerplate_filter():
+    """Test that lines repeated across documents are learned and stripped"""
+    import tempfile
+    from backend.services.boilerplate import BoilerplateFilter
+    
+    banner = "We and our 909 partners store and access personal data."
+    with tempfile.TemporaryDirectory() as tmp:
+        bp = BoilerplateFilter(Path(tmp) / "boilerplate.db", min_docs=3, min_ratio=0.5)
+        for i in range(4):
+            bp.observe(f"doc{i}.json", f"Story {i} headline about token {i}x\n{banner}")
+        
+        cleaned = bp.clean(f"Unique XRP story text.\n{banner.replace('909', '912')}")
+        assert cleaned == "Unique XRP story text."
+        
+        # Frequencies are persisted and updated incrementally
+        reloaded = BoilerplateFilter(Path(tmp) / "boilerplate.db", min_docs=3, min_ratio=0.5)
+        assert reloaded.stats()["documents"] == 4
+        # Documents cleaned before the banner was learned are stale until marked
+        assert reloaded.stale_documents() == {f"doc{i}.json" for i in range(4)}
+        reloaded.mark_applied(reloaded.boilerplate_keys())
+        assert not reloaded.stale_documents()
+        for i in range(2):
+            reloaded.remove(f"doc{i}.json")
+        assert reloaded.clean(banner) == banner
+        assert reloaded.stale_documents() == {"doc2.json", "doc3.json"}
+
+def test_embedding_providers():
+    """Test offline providers: deterministic, normalized and similarity preserving"""
+    import time
+    import numpy as np
+    from backend.services.embeddings import EmbeddingProvider, get_embedding_provider
+    
+    # The base class is an interface: a provider must implement embed
+    try:
+        EmbeddingProvider()
+        assert False, "abstract provider instantiated"
+    except TypeError:
+        pass
+    
+    stub = get_embedding_provider("stub")
+    first, second = stub.embed(["bitcoin", "bitcoin"])
+    assert first == second
+    assert len(first) == settings.VECTOR_SIZE
+    
+    hashing = get_embedding_provider("hashing")
+    query, close, far = (np.array(v) for v in hashing.embed([
+        "why is XRP up today",
+        "XRP is up today on three catalysts",
+        "Nasdaq hits a record while gold stays flat"
+    ]))
+    assert abs(np.linalg.norm(query) - 1.0) < 1e-5
+    assert query @ close > query @ far
+    
+    start = time.perf_counter()
+    hashing.embed_query("what is happening with the bitcoin price")
+    assert time.perf_counter() - start < 0.05
+
+def test_bulk_uploader():
+    """Test batched parallel upserts: every point lands, failed batches are reported"""
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from backend.services.uploader import BulkUploader
+    
+    client = QdrantClient(":memory:")
+    client.create_collection("bulk", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    points = [PointStruct(id=i, vector=[1.0, i, 0.0, 1.0], payload={"n": i}) for i in range(1, 101)]
+    
+    uploader = BulkUploader(client, batch_size=16, workers=4, wait=False)
+    # The embedded client is not thread-safe, uploads to it are serialized
+    assert uploader.workers == 1
+    stored = uploader.upload("bulk", points)
+    assert stored == set(range(1, 101))
+    assert client.count("bulk").count == 100
+    stats = uploader.stats()
+    assert stats["points"] == 100 and stats["batches"] == 7 and stats["failed_batches"] == 0
+    
+    assert uploader.upload("missing", points[:10]) == set()
+    assert uploader.stats()["failed_batches"] == 1
+
+def _append_embeddings(directory: str, worker: int) -> None:
+    """Fill a shared embedding store from a worker process"""
+    from backend.services.embedding_store import EmbeddingStore, text_key
+    
+    store = EmbeddingStore(Path(directory), dimension=3)
+    for i in range(50):
+        store.put_many({text_key(f"{worker}-{i}-{j}"): [worker, i, j] for j in range(4)})
+
+def test_embedding_store():
+    """Test memory-mapped embedding store: lookups, growth, persistence across reopen"""
+    import tempfile
+    from backend.services.embedding_store import EmbeddingStore, text_key
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmbeddingStore(Path(tmp), dimension=3)
+        assert store.put_many({text_key("a"): [1.0, 0.0, 0.0], text_key("b"): [0.0, 1.0, 0.0]}) == 2
+        assert store.put_many({text_key("a"): [9.0, 9.0, 9.0], text_key("c"): [0.0, 0.0, 1.0]}) == 1
+        assert store.get_many([text_key("a"), text_key("c"), text_key("x")]) == {
+            text_key("a"): [1.0, 0.0, 0.0], text_key("c"): [0.0, 0.0, 1.0]
+        }
+        assert store.stats() == {"vectors": 3, "hits": 2, "misses": 1}
+        
+        # Readers skip a row still being appended and leave it to the writer
+        vectors_path = Path(tmp) / "vectors.f32"
+        with open(vectors_path, 'ab') as f:
+            f.write(b"\0" * 5)
+        reopened = EmbeddingStore(Path(tmp), dimension=3)
+        assert reopened.get_many([text_key("b")]) == {text_key("b"): [0.0, 1.0, 0.0]}
+        assert len(reopened.all_vectors()) == 3 and vectors_path.stat().st_size == 3 * 12 + 5
+        EmbeddingStore(Path(tmp), dimension=3, writer=True)
+        assert vectors_path.stat().st_size == 3 * 12
+    
+    # Processes appending to one store concurrently never share rows
+    from concurrent.futures import ProcessPoolExecutor
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(_append_embeddings, [tmp] * 4, range(4)))
+        keys = {text_key(f"{worker}-{i}-{j}"): [float(worker), float(i), float(j)]
+                for worker in range(4) for i in range(50) for j in range(4)}
+        assert EmbeddingStore(Path(tmp), dimension=3).get_many(keys) == keys
+
+def test_search_filters():
+    """Test payload filters: date window, section and source narrow the search"""
+    from datetime import datetime
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from backend.models.schemas import SearchFilters
+    from backend.services.ingestor import section_of
+    from backend.services.rag_engine import RAGEngine
+    
+    assert section_of("latest-crypto-news_xrp_up_20250628_182000.json") == "latest-crypto-news"
+    
+    client = QdrantClient(":memory:")
+    client.create_collection("filters", vectors_config=VectorParams(size=2, distance=Distance.COSINE))
+    client.upsert("filters", [
+        PointStruct(id=1, vector=[1.0, 0.0], payload={"timestamp": "2025-06-01T10:00:00", "section": "markets", "source": "a"}),
+        PointStruct(id=2, vector=[1.0, 0.1], payload={"timestamp": "2025-06-28T10:00:00", "section": "markets", "source": "b"}),
+        PointStruct(id=3, vector=[1.0, 0.2], payload={"timestamp": "2025-06-28T12:00:00", "section": "policy", "source": "c"}),
+    ])
+    
+    def search(filters):
+        query_filter = RAGEngine._build_filter(None, filters)
+        return {hit.id for hit in client.search("filters", [1.0, 0.0], query_filter=query_filter, limit=10)}
+    
+    assert RAGEngine._build_filter(None, SearchFilters()) is None
+    assert search(SearchFilters(date_from=datetime(2025, 6, 28))) == {2, 3}
+    assert search(SearchFilters(date_from=datetime(2025, 6, 28), section="markets")) == {2}
+    assert search(SearchFilters(source="a")) == {1}
+
+def test_parallel_loader():
+    """Test process-pool loading: input order kept, boilerplate stripped, same chunks as in-process"""
+    import json
+    import tempfile
+    from backend.models.schemas import Article
+    from backend.services.boilerplate import content_keys
+    from backend.services.chunker import TokenChunker
+    from backend.services.parallel_loader import ParallelLoader
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(7):
+            path = Path(tmp) / f"markets_article_{i}.json"
+            content = f"Subscribe to our newsletter.\nBitcoin moved {i} percent as traders rotated into ETH."
+            path.write_text(json.dumps({"title": f"t{i}", "url": f"u{i}", "content": content, "timestamp": "2025-06-28T10:00:00"}))
+            paths.append(path)
+        broken = Path(tmp) / "markets_broken.json"
+        broken.write_text("{not json")
+        paths.insert(3, broken)
+        
+        loader = ParallelLoader(workers=2, batch_size=2)
+        assert [a.title if a else None for a in loader.parse(paths)] == ["t0", "t1", "t2", None, "t3", "t4", "t5", "t6"]
+        
+        scanned = list(loader.scan(paths, {paths[0].name: "stale"}))
+        assert scanned[0].keys == content_keys(json.loads(paths[0].read_text())["content"])
+        assert scanned[3].file_hash and scanned[3].keys is None
+        
+        boilerplate = {key for key in content_keys("Subscribe to our newsletter.")}
+        loaded = list(loader.load(paths, boilerplate))
+        assert loaded[3] is None
+        assert [f.path for f in loaded if f] == [p for p in paths if p != broken]
+        assert all("Subscribe" not in f.article.content for f in loaded if f)
+        article = Article(**json.loads(paths[1].read_text()))
+        article.content = loaded[1].article.content
+        assert [c.text for c in loaded[1].chunks] == [c.text for c in TokenChunker().chunk(article)]
+
+def test_ingest_jobs():
+    """Test job queue: progress counters, result, refusal of overlapping rebuilds"""
+    import threading
+    from backend.services.jobs import IngestJobManager, JobConflictError
+    
+    release = threading.Event()
+    
+    class SlowIngestor:
+        progress_callback = None
+        
+        def process_all(self, force_refresh=False, stream=False):
+            self.progress_callback(files_total=4)
+            self.progress_callback(files_done=4, chunks=10)
+            release.wait(5)
+            self.progress_callback(vectors=10)
+            return {"success": True, "message": "done", "vectors_created": 10}
+        
+        def process_specific_files(self, file_paths):
+            return {"success": True, "message": f"{len(file_paths)} files", "vectors_created": 1}
+    
+    manager = IngestJobManager(SlowIngestor)
+    rebuild = manager.submit(force_refresh=True)
+    incremental = manager.submit()
+    try:
+        manager.submit(force_refresh=True)
+        assert False, "second rebuild accepted"
+    except JobConflictError:
+        pass
+    assert incremental.status == "queued"
+    
+    release.set()
+    manager._executor.shutdown(wait=True)
+    assert rebuild.status == "succeeded" and incremental.status == "succeeded"
+    progress = rebuild.progress()
+    assert (progress["files_done"], progress["chunks"], progress["vectors"]) == (4, 10, 10)
+    assert manager.get(rebuild.job_id) is rebuild
+    assert manager.list() == [incremental, rebuild]
+    
+    # The file watcher queues new files on the same manager instead of ingesting on its own
+    from backend.services.auto_ingest import AutoIngest
+    watched = IngestJobManager(SlowIngestor)
+    watcher = AutoIngest(lambda: watched)
+    watcher._process_new_files([Path("a.json"), Path("b.json")])
+    watched._executor.shutdown(wait=True)
+    job = watched.get(watcher.last_job_id)
+    assert job.kind == "files" and job.status == "succeeded" and job.result["message"] == "2 files"
+
+def _offline_rag_engine(gemini_model):
+    """RAG engine on an in-memory Qdrant, hashing embeddings and a fake Gemini"""
+    from qdrant_client import AsyncQdrantClient
+    from backend.services.rag_engine import RAGEngine
+    
+    provider = settings.EMBEDDING_PROVIDER
+    settings.EMBEDDING_PROVIDER = "hashing"
+    try:
+        engine = RAGEngine()
+    finally:
+        settings.EMBEDDING_PROVIDER = provider
+    engine.qdrant_client = AsyncQdrantClient(":memory:")
+    engine.gemini_model = gemini_model
+    return engine
+
+async def _seed_collection(engine, texts):
+    """Store texts in the engine's collection"""
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    
+    await engine.qdrant_client.create_collection(
+        settings.COLLECTION_NAME,
+        vectors_config=VectorParams(size=settings.VECTOR_SIZE, distance=Distance.COSINE)
+    )
+    await engine.qdrant_client.upsert(settings.COLLECTION_NAME, [
+        PointStruct(id=i, vector=vector, payload={"text": text, "source": f"https://example.com/{i}"})
+        for i, (text, vector) in enumerate(zip(texts, engine.embedder.embed(texts)))
+    ])
+
+@contextmanager
+def _offline_ingestor(files: int = 6, boilerplate: bool = True, vector_backend: str = "qdrant"):
+    """ContentIngestor on a fresh in-memory Qdrant with stub embeddings, over copies of a few crawled articles"""
+    import shutil
+    import tempfile
+    from backend.services import qdrant
+    from backend.services.ingestor import ContentIngestor
+    
+    names = ("EMBEDDING_PROVIDER", "QDRANT_MODE", "STATE_DIR", "EMBEDDINGS_DIR", "CRAWLED_DIR",
+             "EMBEDDING_STORE_ENABLED", "LOAD_WORKERS", "VECTOR_BACKEND", "BOILERPLATE_ENABLED")
+    original = [getattr(settings, name) for name in names] + [qdrant._local_client]
+    sources = sorted(settings.CRAWLED_DIR.glob("*.json"))[:files]
+    with tempfile.TemporaryDirectory() as tmp:
+        crawled = Path(tmp) / "crawled"
+        crawled.mkdir()
+        for source in sources:
+            shutil.copy(source, crawled)
+        overrides = ("stub", "memory", Path(tmp) / "index", Path(tmp) / "embeddings", crawled, False, 1,
+                     vector_backend, boilerplate)
+        for name, value in zip(names, overrides):
+            setattr(settings, name, value)
+        qdrant._local_client = None
+        try:
+            ingestor = ContentIngestor()
+            # Texts sent to the embedding provider, per call
+            ingestor.embedded = []
+            create_embeddings = ingestor.create_embeddings
+            
+            def counting(texts):
+                ingestor.embedded.append(len(texts))
+                return create_embeddings(texts)
+            
+            ingestor.create_embeddings = counting
+            yield ingestor
+        finally:
+            for name, value in zip(names, original):
+                setattr(settings, name, value)
+            qdrant._local_client = original[-1]
+
+def test_incremental_ingest():
+    """Test incremental ingestion: unchanged files cost no embeddings, edits and deletions drop stale points"""
+    import json
+    
+    def stored_ids(ingestor):
+        from backend.services.qdrant import point_key
+        points, _ = ingestor.qdrant_client.scroll(settings.COLLECTION_NAME, limit=10000)
+        return {point_key(point.id) for point in points}
+    
+    def manifest_ids(ingestor):
+        return set().union(*(ingestor.manifest.get_point_ids(name) for name in ingestor.manifest.known_files()))
+    
+    # Without boilerplate learning: an edit or deletion could otherwise re-plan unchanged files too
+    with _offline_ingestor(boilerplate=False) as ingestor:
+        first = ingestor.process_all()
+        assert first["vectors_created"] and sum(ingestor.embedded) == first["vectors_created"]
+        assert stored_ids(ingestor) == manifest_ids(ingestor)
+        
+        ingestor.embedded.clear()
+        rerun = ingestor.process_all()
+        assert ingestor.embedded == [] and rerun["vectors_created"] == 0
+        assert rerun["files_skipped"] == len(ingestor.manifest.known_files())
+        
+        files = sorted(settings.CRAWLED_DIR.glob("*.json"))
+        edited, before = files[0], stored_ids(ingestor)
+        old_ids = ingestor.manifest.get_point_ids(edited.name)
+        article = json.loads(edited.read_text())
+        article["content"] = "Stablecoin issuers face a new reserve audit rule from regulators."
+        edited.write_text(json.dumps(article))
+        changed = ingestor.process_all()
+        new_ids = ingestor.manifest.get_point_ids(edited.name)
+        # Only the rewritten article is embedded again, its chunks no other file shares are gone
+        assert sum(ingestor.embedded) == changed["vectors_created"] == len(new_ids - before) > 0
+        stale = old_ids - manifest_ids(ingestor)
+        assert changed["vectors_deleted"] == len(stale) > 0 and not stale & stored_ids(ingestor)
+        assert stored_ids(ingestor) == manifest_ids(ingestor)
+        
+        removed = files[1]
+        removed_ids = ingestor.manifest.get_point_ids(removed.name)
+        removed.unlink()
+        pruned = ingestor.process_all()
+        assert removed.name not in ingestor.manifest.known_files()
+        stale = removed_ids - manifest_ids(ingestor)
+        assert pruned["vectors_deleted"] == len(stale) > 0 and not stale & stored_ids(ingestor)
+        assert stored_ids(ingestor) == manifest_ids(ingestor)
+        
+        # An edit drops a chunk that a new file of the same run reuses instead of embedding it
+        edited = files[2]
+        reused = next(iter(ingestor.manifest.get_point_ids(edited.name)))
+        point = ingestor.qdrant_client.retrieve(settings.COLLECTION_NAME, [reused], with_payload=True)[0]
+        article = json.loads(edited.read_text())
+        copied = {**article, "title": "Reserve audits, a reader's digest", "content": point.payload["text"]}
+        (settings.CRAWLED_DIR / f"zz_{edited.name}").write_text(json.dumps(copied))
+        article["content"] = "Miners sell less of their output as hashprice recovers after the halving."
+        edited.write_text(json.dumps(article))
+        ingestor.embedded.clear()
+        ingestor.process_all()
+        assert reused in ingestor.manifest.get_point_ids(f"zz_{edited.name}")
+        assert reused not in ingestor.manifest.get_point_ids(edited.name)
+        assert ingestor.manifest.get_file_hash(f"zz_{edited.name}") is not None
+        assert stored_ids(ingestor) == manifest_ids(ingestor)
+
+def test_boilerplate_replan():
+    """Test that unchanged files are chunked again once a line they contain becomes boilerplate"""
+    import json
+    
+    banner = "Sign up for the Daily Digest newsletter to get the top crypto stories every morning."
+    
+    def add_banner(path):
+        article = json.loads(path.read_text())
+        article["content"] += f"\n{banner}"
+        path.write_text(json.dumps(article))
+    
+    def stored_texts(ingestor):
+        points, _ = ingestor.qdrant_client.scroll(settings.COLLECTION_NAME, limit=10000, with_payload=True)
+        return [point.payload["text"] for point in points]
+    
+    with _offline_ingestor() as ingestor:
+        files = sorted(settings.CRAWLED_DIR.glob("*.json"))
+        for path in files[:2]:
+            add_banner(path)
+        ingestor.process_all()
+        # Below min_docs: still regular content
+        assert any(banner in text for text in stored_texts(ingestor))
+        
+        for path in files[2:settings.BOILERPLATE_MIN_DOCS]:
+            add_banner(path)
+        result = ingestor.process_all()
+        assert result["files_processed"] == settings.BOILERPLATE_MIN_DOCS
+        assert not any(banner in text for text in stored_texts(ingestor))
+        assert not ingestor.boilerplate.stale_documents()
+        
+        assert ingestor.process_all()["files_processed"] == 0
+
+def test_alias_sections():
+    """Test that a story cross-posted in another section is found under both, on Qdrant and NumPy"""
+    import shutil
+    from backend.models.schemas import SearchFilters
+    from backend.services.qdrant import point_key
+    
+    engine = _offline_rag_engine(None)
+    with _offline_ingestor(files=3, vector_backend="numpy") as ingestor:
+        original = sorted(settings.CRAWLED_DIR.glob("*.json"))[0]
+        assert original.name.startswith("latest-crypto-news_")
+        cross_posted = settings.CRAWLED_DIR / original.name.replace("latest-crypto-news_", "markets_", 1)
+        shutil.copy(original, cross_posted)
+        ingestor.process_all()
+        assert ingestor.dedup.canonical_of(cross_posted.name) == original.name
+        
+        def matching(section):
+            points, _ = ingestor.qdrant_client.scroll(
+                settings.COLLECTION_NAME, limit=1000,
+                scroll_filter=engine._build_filter(SearchFilters(section=section))
+            )
+            return {point_key(point.id) for point in points}
+        
+        def numpy_matching(section):
+            query = ingestor.embedder.embed(["anything"])[0]
+            hits = ingestor.vector_index.search(query, 1000, SearchFilters(section=section))
+            return {point_id for point_id, _, _ in hits}
+        
+        canonical_ids = ingestor.manifest.get_point_ids(original.name)
+        assert canonical_ids and matching("markets") == canonical_ids == numpy_matching("markets")
+        assert canonical_ids <= matching("latest-crypto-news") and canonical_ids <= numpy_matching("latest-crypto-news")
+        
+        # Once the cross-post is gone the story is only in its own section again
+        cross_posted.unlink()
+        ingestor.process_all()
+        assert not matching("markets") and not numpy_matching("markets")
+
+def test_streaming_ingest():
+    """Test streaming ingestion: same points and manifest as the batch path"""
+    from backend.services.qdrant import point_key
+    
+    def snapshot(stream):
+        with _offline_ingestor() as ingestor:
+            result = ingestor.process_all(stream=stream)
+            points, _ = ingestor.qdrant_client.scroll(settings.COLLECTION_NAME, limit=10000, with_payload=True)
+            manifest = {
+                name: (ingestor.manifest.get_file_hash(name), ingestor.manifest.get_point_ids(name))
+                for name in ingestor.manifest.known_files()
+            }
+            return result, {point_key(point.id): point.payload["text"] for point in points}, manifest
+    
+    original = settings.STREAM_EMBED_BATCH
+    # Small batches: several embed → upsert rounds
+    settings.STREAM_EMBED_BATCH = 4
+    try:
+        streamed, streamed_points, streamed_manifest = snapshot(stream=True)
+    finally:
+        settings.STREAM_EMBED_BATCH = original
+    batch, batch_points, batch_manifest = snapshot(stream=False)
+    
+    assert streamed["success"] and streamed["vectors_created"] == batch["vectors_created"] > 0
+    assert streamed["files_processed"] == batch["files_processed"]
+    assert streamed_points == batch_points
+    assert streamed_manifest == batch_manifest
+    assert all(file_hash for file_hash, _ in streamed_manifest.values())
+    assert streamed["stages"]["upsert"]["items_out"] > 1
+
+def test_blue_green_rebuild():
+    """Test rebuilds: alias moves to the new version, old ones are pruned, failures keep the live version"""
+    import json
+    
+    with _offline_ingestor() as ingestor:
+        client = ingestor.qdrant_client
+        assert ingestor.process_all()["success"]
+        first = ingestor.resolve_collection()
+        assert first != settings.COLLECTION_NAME
+        
+        passes = []
+        ingest_directory = ingestor._ingest_directory
+        edited = sorted(settings.CRAWLED_DIR.glob("*.json"))[0]
+        
+        def counting_pass(stream=False):
+            result = ingest_directory(stream)
+            passes.append((ingestor.collection_name, dict(result)))
+            if len(passes) == 1:
+                # An article edited while the full pass runs
+                article = json.loads(edited.read_text())
+                article["content"] = "Stablecoin issuers face a new reserve audit rule from regulators."
+                edited.write_text(json.dumps(article))
+            return result
+        
+        ingestor._ingest_directory = counting_pass
+        second = ingestor.process_all(force_refresh=True)
+        # Full pass plus the catch-up pass, both into the new version, both counted
+        assert second["success"] and [name for name, _ in passes] == [second["collection"]] * 2
+        full, catch_up = passes[0][1], passes[1][1]
+        assert catch_up["files_processed"] and catch_up["vectors_created"]
+        assert second["files_processed"] == full["files_processed"] + catch_up["files_processed"]
+        assert second["vectors_created"] == full["vectors_created"] + catch_up["vectors_created"]
+        assert ingestor.resolve_collection() == second["collection"] != first
+        assert client.count(settings.COLLECTION_NAME).count == second["vectors_created"] - second["vectors_deleted"]
+        
+        third = ingestor.process_all(force_refresh=True)
+        versions = {c.name for c in client.get_collections().collections}
+        # keep_versions: the live version and the previous one
+        assert versions == {second["collection"], third["collection"]}
+        assert third["versions_deleted"] == [first] and not (settings.STATE_DIR / first).exists()
+        
+        def failing_pass(stream=False):
+            raise RuntimeError("embedding API down")
+        
+        ingestor._ingest_directory = failing_pass
+        failed = ingestor.process_all(force_refresh=True)
+        assert not failed["success"]
+        assert ingestor.resolve_collection() == third["collection"] == ingestor.collection_name
+        assert {c.name for c in client.get_collections().collections} == versions
+        
+        def failing_catch_up(stream=False):
+            if ingestor.collection_name in passes:
+                return {"success": False, "message": "No articles found"}
+            passes.append(ingestor.collection_name)
+            return ingest_directory(stream)
+        
+        # A failed catch-up pass aborts the swap like a failed full pass
+        passes.clear()
+        ingestor._ingest_directory = failing_catch_up
+        assert not ingestor.process_all(force_refresh=True)["success"]
+        assert ingestor.resolve_collection() == third["collection"] == ingestor.collection_name
+        assert {c.name for c in client.get_collections().collections} == versions
+        
+        # An unreachable Qdrant must not look like an empty collection and wipe local state
+        ingestor._ingest_directory = ingest_directory
+        known = ingestor.manifest.known_files()
+        
+        def unreachable(*args, **kwargs):
+            raise ConnectionError("Qdrant unreachable")
+        
+        client.collection_exists = unreachable
+        try:
+            ingestor.process_all()
+            assert False, "connection error swallowed"
+        except ConnectionError:
+            pass
+        finally:
+            del client.collection_exists
+        assert known and ingestor.manifest.known_files() == known
+
+def test_legacy_collection_migration():
+    """Test the first rebuild of a plain (non-aliased) collection: the API moves before the collection goes"""
+    from qdrant_client.models import DeleteAlias, DeleteAliasOperation
+    
+    with _offline_ingestor() as ingestor:
+        client = ingestor.qdrant_client
+        pointer = settings.STATE_DIR / "current"
+        # Deployment from before collection versions: a plain collection and its state dir
+        client.update_collection_aliases(change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=settings.COLLECTION_NAME))
+        ])
+        client.delete_collection(ingestor.collection_name)
+        pointer.unlink()
+        ingestor._create_collection(settings.COLLECTION_NAME)
+        assert ingestor.process_all()["success"]
+        assert ingestor.collection_name == settings.COLLECTION_NAME
+        assert (settings.STATE_DIR / settings.COLLECTION_NAME).is_dir()
+        
+        served_at_drop = []
+        delete_collection = client.delete_collection
+        
+        def recording_delete(collection_name, *args, **kwargs):
+            served_at_drop.append((collection_name, pointer.read_text()))
+            return delete_collection(collection_name, *args, **kwargs)
+        
+        client.delete_collection = recording_delete
+        try:
+            rebuilt = ingestor.process_all(force_refresh=True)
+        finally:
+            del client.delete_collection
+        assert rebuilt["success"] and ingestor.resolve_collection() == rebuilt["collection"]
+        # Queries already named the new version when the legacy collection was dropped
+        assert served_at_drop == [(settings.COLLECTION_NAME, rebuilt["collection"])]
+        assert rebuilt["versions_deleted"] == [settings.COLLECTION_NAME]
+        assert not (settings.STATE_DIR / settings.COLLECTION_NAME).exists()
+
+def test_async_rag_engine():
+    """Test async query path: concurrent questions overlap instead of queuing"""
+    import asyncio
+    import time
+    
+    class SlowGemini:
+        async def generate_content_async(self, prompt, generation_config=None):
+            await asyncio.sleep(0.3)
+            return type("Response", (), {"text": "XRP is up on ETF flows"})()
+    
+    engine = _offline_rag_engine(SlowGemini())
+    texts = ["XRP is up today on ETF flows", "Gold stays flat"]
+    
+    async def run():
+        await _seed_collection(engine, texts)
+        hits = await engine.search_similar("why is XRP up today", 1)
+        assert hits and hits[0]["text"] == texts[0]
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*[engine.answer_question(f"why is XRP up? ({i})") for i in range(10)])
+        assert time.perf_counter() - start < 2.0
+        assert all(result["answer"] == "XRP is up on ETF flows" for result in results)
+    
+    asyncio.run(run())
+
+def test_stream_answer():
+    """Test streamed answers: sources first, then tokens, then the full result"""
+    import asyncio
+    
+    class StreamingGemini:
+        async def generate_content_async(self, prompt, generation_config=None, stream=False):
+            async def tokens():
+                for text in ["XRP ", "is ", "up."]:
+                    await asyncio.sleep(0.01)
+                    yield type("Chunk", (), {"text": text})()
+            return tokens()
+    
+    engine = _offline_rag_engine(StreamingGemini())
+    
+    async def run():
+        await _seed_collection(engine, ["XRP is up today on ETF flows", "Gold stays flat"])
+        return [event async for event in engine.stream_answer("why is XRP up today")]
+    
+    events = asyncio.run(run())
+    assert [name for name, _ in events] == ["sources", "token", "token", "token", "done"]
+    assert events[0][1]["sources"] == ["https://example.com/0"]
+    assert events[-1][1]["answer"] == "XRP is up."
+
+def test_semantic_cache():
+    """Test semantic answer cache: paraphrases hit, other tickers or numbers never do"""
+    from backend.services.semantic_cache import SemanticCache, normalize_query
+    
+    assert normalize_query("What's happening with XRP?") == normalize_query("what is happening with xrp")
+    
+    answer_cache = SemanticCache(dimension=3, max_entries=4, threshold=0.9, ttl=60)
+    answer_cache.add([1.0, 0.0, 0.0], "What's happening with XRP?", "5", {"answer": "XRP rallies"})
+    
+    assert answer_cache.lookup([0.99, 0.1, 0.0], "what is going on with xrp", "5") == {"answer": "XRP rallies"}
+    assert answer_cache.lookup([0.99, 0.1, 0.0], "what is going on with SOL", "5") is None
+    assert answer_cache.lookup([0.99, 0.1, 0.0], "XRP price above 3 dollars?", "5") is None
+    assert answer_cache.lookup([0.99, 0.1, 0.0], "what is going on with xrp", "10") is None
+    assert answer_cache.lookup([0.0, 1.0, 0.0], "what is going on with xrp", "5") is None
+    
+    stats = answer_cache.stats()
+    assert stats["lookups"] == 5 and stats["semantic_hits"] == 1 and stats["guard_rejections"] == 2
+    assert stats["hit_rate"] == 0.2
+    
+    for i in range(4):
+        answer_cache.add([0.0, 1.0, 0.0], f"question {i}", "5", {"answer": str(i)})
+    assert answer_cache.lookup([1.0, 0.0, 0.0], "What's happening with XRP?", "5") is None
+
+def test_single_flight():
+    """Test request coalescing: identical questions in flight share one generation"""
+    import asyncio
+    
+    class CountingGemini:
+        calls = 0
+        
+        async def generate_content_async(self, prompt, generation_config=None):
+            CountingGemini.calls += 1
+            await asyncio.sleep(0.2)
+            return type("Response", (), {"text": "XRP is up on ETF flows"})()
+    
+    engine = _offline_rag_engine(CountingGemini())
+    
+    async def run():
+        await _seed_collection(engine, ["XRP is up today on ETF flows", "Gold stays flat"])
+        questions = ["Why is XRP up?"] * 5 + ["why is xrp up", "Is gold flat?"]
+        return await asyncio.gather(*[engine.answer_question(question) for question in questions])
+    
+    results = asyncio.run(run())
+    assert CountingGemini.calls == 2
+    assert all(result["answer"] == "XRP is up on ETF flows" for result in results)
+    assert sum(not result["cached"] for result in results) == 2
+    
+    stats = engine.single_flight.stats()
+    assert stats["leaders"] == 2 and stats["followers"] == 5 and stats["in_flight"] == 0
+
+def test_embedding_batcher():
+    """Test query micro-batching: concurrent queries share provider calls, each gets its own vector"""
+    import asyncio
+    from backend.services.embedding_batcher import EmbeddingBatcher
+    from backend.services.embeddings import StubEmbeddingProvider
+    
+    class CountingProvider(StubEmbeddingProvider):
+        batches = []
+        
+        async def aembed(self, texts):
+            CountingProvider.batches.append(len(texts))
+            await asyncio.sleep(0.01)
+            return self.embed(texts)
+    
+    provider = CountingProvider(dimension=8)
+    batcher = EmbeddingBatcher(provider, window_ms=20, max_batch=4)
+    queries = ["query 0", "query 1", "query 0"] + [f"query {i}" for i in range(2, 6)]
+    
+    async def run():
+        return await asyncio.gather(*[batcher.embed_query(query) for query in queries])
+    
+    vectors = asyncio.run(run())
+    assert vectors == provider.embed(queries)
+    assert CountingProvider.batches == [3, 3]
+    
+    stats = batcher.stats()
+    assert stats["requests"] == 7 and stats["batches"] == 2 and stats["max_batch_size"] == 4
+    assert stats["max_queue_ms"] >= 15
+    
+    # A provider returning too few vectors fails every caller of the batch instead of leaving them waiting
+    class ShortProvider(StubEmbeddingProvider):
+        async def aembed(self, texts):
+            return self.embed(texts)[:-1]
+    
+    short = EmbeddingBatcher(ShortProvider(dimension=8), window_ms=5, max_batch=4)
+    
+    async def run_short():
+        return await asyncio.wait_for(
+            asyncio.gather(*[short.embed_query(f"query {i}") for i in range(3)], return_exceptions=True), 1
+        )
+    
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run_short()))
+    assert short.stats()["failed_batches"] == 1
+
+def test_hybrid_search():
+    """Test BM25 + vector fusion: exact tickers are found even below the vector score threshold"""
+    import asyncio
+    import hashlib
+    import tempfile
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from backend.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
+    
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60)[0][0] == "b"
+    
+    texts = ["AVAX jumps 12% after the Avalanche upgrade", "Bitcoin ETF inflows continue",
+             "Ethereum gas fees fall to a yearly low", "Markets wait for the Fed decision"]
+    point_ids = [hashlib.md5(text.encode()).hexdigest() for text in texts]
+    engine = _offline_rag_engine(None)
+    
+    with tempfile.TemporaryDirectory() as state_dir:
+        index = LexicalIndex(Path(state_dir) / settings.COLLECTION_NAME / "lexical.db")
+        index.add_documents(dict(zip(point_ids, texts)))
+        assert index.search("AVAX upgrade", 2)[0][0] == point_ids[0]
+        index.remove_documents([point_ids[0]])
+        assert not index.search("AVAX")
+        index.add_documents({point_ids[0]: texts[0]})
+        assert index.stats()["documents"] == 4
+        
+        async def run():
+            await engine.qdrant_client.create_collection(
+                settings.COLLECTION_NAME,
+                vectors_config=VectorParams(size=settings.VECTOR_SIZE, distance=Distance.COSINE)
+            )
+            await engine.qdrant_client.upsert(settings.COLLECTION_NAME, [
+                PointStruct(id=point_id, vector=vector, payload={"text": text, "source": f"https://example.com/{i}"})
+                for i, (point_id, text, vector) in enumerate(zip(point_ids, texts, engine.embedder.embed(texts)))
+            ])
+            return await engine.search_similar("AVAX", 2)
+        
+        original = (settings.STATE_DIR, settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED)
+        settings.STATE_DIR, settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED = Path(state_dir), 0.99, True
+        try:
+            results = asyncio.run(run())
+        finally:
+            settings.STATE_DIR, settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED = original
+    
+    assert [result["id"] for result in results] == [point_ids[0]]
+    assert results[0]["text"] == texts[0] and 0 < results[0]["score"] < 0.99
+
+def test_numpy_vector_index():
+    """Test NumPy backend: exact top-k with filters, tombstones, compaction, persistence, engine routing"""
+    import asyncio
+    import tempfile
+    import numpy as np
+    from qdrant_client.models import PointStruct
+    from backend.models.schemas import SearchFilters
+    from backend.services.qdrant import write_served_collection
+    from backend.services.vector_index import NumpyVectorIndex
+    
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, settings.VECTOR_SIZE)).astype(np.float32)
+    points = [
+        PointStruct(id=f"{i:032x}", vector=vector.tolist(), payload={
+            "text": f"chunk {i}", "section": "markets" if i % 2 else "policy",
+            "timestamp": f"2025-01-{i % 28 + 1:02d}T00:00:00"
+        })
+        for i, vector in enumerate(vectors)
+    ]
+    units = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = rng.standard_normal(settings.VECTOR_SIZE)
+    exact = np.argsort(-(units @ (query / np.linalg.norm(query))))
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NumpyVectorIndex(Path(tmp) / "vectors", writer=True)
+        assert index.upsert(points) == 300 and len(index) == 300
+        
+        hits = index.search(query, 5)
+        assert [int(point_id, 16) for point_id, _, _ in hits] == exact[:5].tolist()
+        assert hits[0][2]["text"] == f"chunk {exact[0]}"
+        
+        filtered = index.search(query, 300, SearchFilters(section="markets", date_to="2025-01-10T00:00:00"))
+        assert filtered and all(int(point_id, 16) % 2 and int(point_id, 16) % 28 < 10 for point_id, _, _ in filtered)
+        
+        index.delete([hits[0][0]])
+        assert index.search(query, 1)[0][0] == hits[1][0]
+        # Past a quarter of tombstones the matrix is rewritten without them
+        index.delete([point.id for point in points[:100]])
+        assert index.stats() == {"vectors": 200 - (exact[0] >= 100), "tombstones": 0}
+        
+        # A reader skips a half written row left by the writer and leaves it in place
+        vectors_path = Path(tmp) / "vectors" / "vectors.f32"
+        with open(vectors_path, 'ab') as f:
+            f.write(b"\0" * 6)
+        size = vectors_path.stat().st_size
+        reopened = NumpyVectorIndex(Path(tmp) / "vectors")
+        expected = [f"{i:032x}" for i in exact[1:] if i >= 100][:3]
+        assert [point_id for point_id, _, _ in reopened.search(query, 3)] == expected
+        assert vectors_path.stat().st_size == size
+        NumpyVectorIndex(Path(tmp) / "vectors", writer=True)
+        assert vectors_path.stat().st_size == size - 6
+        
+        # The engine searches the local index of the served collection instead of Qdrant
+        engine = _offline_rag_engine(None)
+        local = NumpyVectorIndex(Path(tmp) / settings.COLLECTION_NAME / "vectors", writer=True)
+        local.upsert(points)
+        original = (settings.STATE_DIR, settings.VECTOR_BACKEND, settings.SCORE_THRESHOLD,
+                    settings.HYBRID_ENABLED, settings.MMR_ENABLED)
+        (settings.STATE_DIR, settings.VECTOR_BACKEND, settings.SCORE_THRESHOLD,
+         settings.HYBRID_ENABLED, settings.MMR_ENABLED) = (Path(tmp), "numpy", 0.0, False, False)
+        alias_lookups = []
+        get_aliases = engine.qdrant_client.get_aliases
+        
+        async def counting_get_aliases():
+            alias_lookups.append(1)
+            return await get_aliases()
+        
+        def search():
+            return asyncio.run(engine.search_similar("anything", 3, query_embedding=query.tolist()))
+        
+        engine.qdrant_client.get_aliases = counting_get_aliases
+        try:
+            results = search()
+            assert search() == results
+            # A blue/green swap moves STATE_DIR/current: followed without asking Qdrant
+            NumpyVectorIndex(Path(tmp) / "crypto_articles_v2" / "vectors", writer=True).upsert(points[:1])
+            write_served_collection("crypto_articles_v2")
+            swapped = search()
+        finally:
+            (settings.STATE_DIR, settings.VECTOR_BACKEND, settings.SCORE_THRESHOLD,
+             settings.HYBRID_ENABLED, settings.MMR_ENABLED) = original
+        assert [result["id"] for result in results] == [f"{i:032x}" for i in exact[:3]]
+        assert [result["id"] for result in swapped] == [f"{0:032x}"]
+        assert len(alias_lookups) == 1
+
+def test_embedded_qdrant():
+    """Test embedded Qdrant: one shared client for sync and async callers, safe across threads"""
+    import asyncio
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from backend.services import qdrant
+    
+    original = (settings.QDRANT_MODE, settings.QDRANT_PATH, qdrant._local_client)
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.QDRANT_MODE, settings.QDRANT_PATH, qdrant._local_client = "path", Path(tmp) / "qdrant", None
+        try:
+            client = qdrant.create_qdrant_client()
+            assert qdrant.create_qdrant_client() is client and qdrant.is_local_client(client)
+            client.create_collection("embedded", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+            
+            # Concurrent writers (ingest workers, watcher) are serialized by the shared client
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda i: client.upsert("embedded", [
+                    PointStruct(id=i * 10 + j, vector=[1.0, i, j, 1.0]) for j in range(10)
+                ]), range(8)))
+            assert client.count("embedded").count == 80
+            
+            async def search():
+                return await qdrant.create_async_qdrant_client().search("embedded", [1.0, 0.0, 0.0, 1.0], limit=1)
+            assert asyncio.run(search())[0].id == 0
+            client.close()
+        finally:
+            settings.QDRANT_MODE, settings.QDRANT_PATH, qdrant._local_client = original
+
+def test_mmr_diversity():
+    """Test MMR reranking: near-duplicate chunks give way to distinct evidence, sources are capped"""
+    import asyncio
+    from backend.services.diversity import mmr_select
+    
+    query = [1.0, 0.3, 0.0]
+    vectors = [[1.0, 0.2, 0.0], [1.0, 0.22, 0.02], [0.8, 0.6, 0.3], [0.9, 0.0, 0.5]]
+    assert mmr_select(query, vectors, 3, diversity_lambda=1.0, max_per_source=0) == [1, 0, 2]
+    # The near-duplicate of the first pick drops behind distinct evidence
+    assert mmr_select(query, vectors, 3, diversity_lambda=0.5, max_per_source=0) == [1, 2, 0]
+    assert mmr_select(query, vectors, 3, diversity_lambda=1.0,
+                      sources=["a", "a", "a", "b"], max_per_source=2) == [1, 0, 3]
+    
+    texts = ["Bitcoin ETF inflows hit a record high this week",
+             "Bitcoin ETF inflows hit a record high this week again",
+             "Bitcoin miners sell reserves as ETF inflows slow"]
+    engine = _offline_rag_engine(None)
+    
+    async def run():
+        await _seed_collection(engine, texts)
+        return await engine.search_similar("bitcoin ETF inflows record high", 2)
+    
+    original = (settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED, settings.MMR_ENABLED)
+    settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED, settings.MMR_ENABLED = 0.0, False, True
+    try:
+        results = asyncio.run(run())
+    finally:
+        settings.SCORE_THRESHOLD, settings.HYBRID_ENABLED, settings.MMR_ENABLED = original
+    
+    assert {result["text"] for result in results} == {texts[0], texts[2]} or \
+        {result["text"] for result in results} == {texts[1], texts[2]}
+    assert all("vector" not in result for result in results)
+
+def test_context_packer():
+    """Test context packing: budget respected, relevant sentences kept, duplicate sentences dropped"""
+    from backend.services.context_packer import ContextPacker
+    from backend.services.tokens import count_tokens
+    
+    filler = " ".join(f"Analysts discussed market topic number {i} at length." for i in range(40))
+    chunks = [
+        {"title": "Long", "text": f"{filler} Solana fees dropped after the upgrade.", "score": 0.5},
+        {"title": "Copy", "text": "Solana fees dropped after the upgrade. Validators welcomed it.", "score": 0.6},
+        {"title": "Other", "text": "Gold stays flat.", "score": 0.2},
+    ]
+    
+    packed = ContextPacker(max_tokens=60, max_chunk_tokens=30, query_weight=0.5).pack("solana fees upgrade", chunks)
+    assert packed.tokens <= 60 and packed.tokens == count_tokens(packed.text)
+    assert packed.chunks[0]["title"] == "Copy"
+    # The long chunk keeps its relevant sentence only, and it was already cited
+    assert packed.text.count("Solana fees dropped") == 1
+    assert "topic number 39" not in packed.text
+    assert packed.duplicates >= 1
+    
+    unlimited = ContextPacker(max_tokens=0, max_chunk_tokens=0).pack("solana fees", chunks)
+    assert len(unlimited.chunks) == 3 and "topic number 39" in unlimited.text
+
+def test_answer_invalidation():
+    """Test cache invalidation: ingests drop answers whose chunks, sources or topic changed, and keep the rest"""
+    import asyncio
+    import tempfile
+    from qdrant_client.models import PointStruct
+    from backend.services.corpus_changes import CorpusChangeLog
+    
+    class CountingGemini:
+        calls = 0
+        
+        async def generate_content_async(self, prompt, generation_config=None):
+            CountingGemini.calls += 1
+            return type("Response", (), {"text": "XRP is up on ETF flows"})()
+    
+    texts = ["XRP is up today on ETF flows", "Gold stays flat"]
+    engine = _offline_rag_engine(CountingGemini())
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        changes = CorpusChangeLog(Path(tmp) / "changes.db", engine.embedder.dimension)
+        engine.corpus_changes = changes
+        
+        def point(point_id, text, source):
+            vector = engine.embedder.embed([text])[0]
+            return PointStruct(id=point_id, vector=vector, payload={"text": text, "source": source})
+        
+        async def ask():
+            return await engine.answer_question("Why is XRP up today?")
+        
+        async def run():
+            await _seed_collection(engine, texts)
+            first = await ask()
+            assert first["corpus"]["sources"] and not first["cached"]
+            
+            # Unrelated article: the answer stays cached
+            changes.record(added=[point(10, "Dogecoin miners upgrade rigs", "https://example.com/doge")])
+            assert (await ask())["cached"]
+            # New chunk on the same topic
+            changes.record(added=[point(11, "XRP is up today on ETF flows and a court ruling", "https://example.com/new")])
+            assert not (await ask())["cached"]
+            assert (await ask())["cached"]
+            # A cited chunk is deleted
+            changes.record(removed=[(await ask())["corpus"]["chunks"][0]])
+            assert not (await ask())["cached"]
+            # Rebuild: everything before is stale
+            changes.clear()
+            assert not (await ask())["cached"]
+        
+        original = settings.SCORE_THRESHOLD
+        settings.SCORE_THRESHOLD = 0.2
+        try:
+            asyncio.run(run())
+        finally:
+            settings.SCORE_THRESHOLD = original
+    
+    assert CountingGemini.calls == 4
+    assert engine.answer_cache.stats()["invalidated"] == 3
+    
+    # Waiters on another worker's lock skip the stale answer still under the key
+    from backend.services import rag_engine as rag_engine_module
+    
+    class PolledCache:
+        def __init__(self, results):
+            self.results = results
+        
+        async def get_cached_query_result(self, key):
+            return dict(self.results.pop(0)) if self.results else None
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine.corpus_changes = CorpusChangeLog(Path(tmp) / "changes.db", engine.embedder.dimension)
+        engine.corpus_changes.clear()
+        engine.corpus_changes.refresh()
+        stale = {"answer": "old", "corpus": {"generation": 0, "chunks": [], "sources": [], "min_score": 0.0}}
+        fresh = {"answer": "new", "corpus": {**stale["corpus"], "generation": engine.corpus_changes.generation}}
+        original_cache = rag_engine_module.cache
+        rag_engine_module.cache = PolledCache([stale, fresh])
+        try:
+            waited = asyncio.run(engine._wait_for_answer("key", 1.0))
+        finally:
+            rag_engine_module.cache = original_cache
+    assert waited["answer"] == "new" and waited["cached"]
+
 def main():
     """Run all tests"""
-    tests = [test_configuration, test_data_availability, test_imports]
+    tests = [test_configuration, test_data_availability, test_imports, test_embedding_scheduler,
+             test_ingest_manifest, test_streaming_pipeline,
+             test_token_chunker, test_near_duplicate_index,
+             test_boilerplate_filter, test_embedding_providers,
+             test_bulk_uploader, test_embedding_store,
+             test_search_filters, test_parallel_loader, test_ingest_jobs,
+             test_incremental_ingest, test_boilerplate_replan, test_alias_sections,
+             test_streaming_ingest, test_blue_green_rebuild, test_legacy_collection_migration,
+             test_async_rag_engine, test_stream_answer, test_semantic_cache,
+             test_single_flight, test_embedding_batcher,
+             test_hybrid_search, test_numpy_vector_index,
+             test_embedded_qdrant, test_mmr_diversity, test_context_packer,
+             test_answer_invalidation]
     
     for test in tests:
         test()